@@ -0,0 +1,268 @@
+# api/bulk.py
+"""
+Bulk write paths (career-fair apply, historical CSV imports, offer onboarding).
+
+Rows are processed in chunks of settings.BULK_BATCH_SIZE: each chunk resolves
+its users/offers with a constant number of queries, is scored from the
+feature store with a single model call and written with one bulk_create
+inside its own transaction.
+"""
+import csv
+import json
+from datetime import date
+from itertools import islice
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+from api.feature_store import ScoringContext, refresh_offer_features
+from api.ml_utils import predict_fit_many, scored_version
+from api.models import Application, Offer, Profile
+from api.offer_search import index_offers
+from api.offer_stats import company_offers_changed
+from api.serializers import OfferImportSerializer
+from api.skills import skill_key, upsert_skills
+
+BULK_APPLY_MAX_OFFERS = 200
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def keyset_chunks(queryset, size):
+    """Yield lists of rows ordered by pk, paginating on pk instead of OFFSET."""
+    queryset = queryset.order_by("pk")
+    last_pk = 0
+    while chunk := list(queryset.filter(pk__gt=last_pk)[:size]):
+        last_pk = chunk[-1].pk
+        yield chunk
+
+
+def offer_rejection(offer, today):
+    """Why an offer can't take applications today, or None if it can."""
+    if offer.is_closed:
+        return "closed"
+    if offer.is_expired(today):
+        return "expired"
+    return None
+
+
+def _scoring_profiles(**filters):
+    return (
+        Profile.objects
+        .filter(**filters)
+        .select_related("user")
+    )
+
+
+def _scoring_offers(offer_ids):
+    return Offer.objects.filter(id__in=offer_ids)
+
+
+def _write_applications(rows):
+    """rows: [(profile, offer, status)] → upsert on (user, offer)."""
+    context = ScoringContext()
+    fits = predict_fit_many([(profile, offer) for profile, offer, _ in rows], context)
+    version = scored_version(context)
+    apps = [
+        Application(user_id=profile.user_id, offer=offer, status=status, predicted_fit=fit, model_version=version)
+        for (profile, offer, status), fit in zip(rows, fits)
+    ]
+    with transaction.atomic():
+        Application.objects.bulk_create(
+            apps,
+            update_conflicts=True,
+            unique_fields=["user", "offer"],
+            update_fields=["predicted_fit", "model_version", "status", "updated_at"],
+        )
+        company_offers_changed({offer.company_id for _, offer, _ in rows})
+    return apps
+
+
+# =========================
+# 📩 BULK APPLY (one student, many offers)
+# =========================
+def bulk_apply(user, offer_ids):
+    today = date.today()
+    offer_ids = list(dict.fromkeys(int(i) for i in offer_ids))
+
+    offers = {o.id: o for o in _scoring_offers(offer_ids)}
+    rejected = {}
+    accepted = []
+    for offer_id in offer_ids:
+        offer = offers.get(offer_id)
+        reason = "not_found" if offer is None else offer_rejection(offer, today)
+        if reason:
+            rejected[offer_id] = reason
+        else:
+            accepted.append(offer)
+
+    profile = _scoring_profiles(user=user).first()
+    already_applied = set(
+        Application.objects.filter(user=user, offer__in=accepted).values_list("offer_id", flat=True)
+    )
+
+    results = []
+    for chunk in chunked(accepted, settings.BULK_BATCH_SIZE):
+        apps = _write_applications([(profile, offer, "pending") for offer in chunk])
+        results += [
+            {"offer_id": a.offer_id, "predicted_fit": a.predicted_fit, "created": a.offer_id not in already_applied}
+            for a in apps
+        ]
+
+    return {"applied": results, "rejected": rejected}
+
+
+# =========================
+# 📥 CSV IMPORT (historical applications)
+# =========================
+def import_applications(stream, university=None):
+    """
+    Import applications from a CSV text stream with columns
+    email, offer_id[, status]. Deadlines are not enforced (historical data).
+    When `university` is given, only its students are imported.
+    """
+    valid_statuses = {choice for choice, _ in Application.STATUS_CHOICES}
+    written = 0
+    skipped = []
+
+    reader = csv.DictReader(stream)
+    for line_offset, chunk in enumerate(chunked(reader, settings.BULK_BATCH_SIZE)):
+        emails = {(row.get("email") or "").strip() for row in chunk}
+        offer_ids = {(row.get("offer_id") or "").strip() for row in chunk}
+        offer_ids = {i for i in offer_ids if i.isdigit()}
+
+        filters = {"user__email__in": emails}
+        if university is not None:
+            filters["university"] = university
+        profiles = {p.user.email: p for p in _scoring_profiles(**filters)}
+        offers = {str(o.id): o for o in _scoring_offers(offer_ids)}
+
+        rows = {}
+        for i, row in enumerate(chunk):
+            line = line_offset * settings.BULK_BATCH_SIZE + i + 2  # header is line 1
+            profile = profiles.get((row.get("email") or "").strip())
+            offer = offers.get((row.get("offer_id") or "").strip())
+            status = (row.get("status") or "pending").strip().lower()
+            if profile is None or offer is None or status not in valid_statuses:
+                skipped.append(line)
+                continue
+            # last row wins for duplicates inside a chunk
+            rows[(profile.user_id, offer.id)] = (profile, offer, status)
+
+        if rows:
+            written += len(_write_applications(list(rows.values())))
+
+    return {"written": written, "skipped_lines": skipped}
+
+
+# =========================
+# 💼 BULK OFFERS
+# =========================
+def offer_broadcast_payload(offer, skill_names):
+    """Offer as pushed to the "offers" websocket group."""
+    return {
+        "id": offer.id,
+        "title": offer.title,
+        "description": offer.description,
+        "field_required": offer.field_required,
+        "level_required": offer.level_required,
+        "location": offer.location,
+        "company": offer.company.name,
+        "company_id": offer.company_id,
+        "is_closed": offer.is_closed,
+        "deadline": offer.deadline.isoformat() if offer.deadline else None,
+        "created_at": offer.created_at.isoformat() if offer.created_at else None,
+        "required_skills": list(skill_names),
+    }
+
+
+def read_offer_rows(lines, fmt):
+    """Yield offer dicts from CSV (skills separated by ';') or JSONL lines."""
+    if fmt == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+        return
+    for row in csv.DictReader(lines):
+        row = {k: v for k, v in row.items() if v not in ("", None)}  # empty cell = not provided
+        row["required_skills"] = [s for s in row.get("required_skills", "").split(";") if s.strip()]
+        yield row
+
+
+def _until_parse_error(rows, parse_errors):
+    """Rows of a lazy reader up to the first one it cannot parse, which is recorded as a row error."""
+    iterator = iter(rows)
+    row = 0
+    while True:
+        try:
+            data = next(iterator)
+        except StopIteration:
+            return
+        except (ValueError, csv.Error) as exc:
+            parse_errors.append({"row": row + 1, "errors": {"file": [f"Could not parse file: {exc}"]}})
+            return
+        row += 1
+        yield data
+
+
+def create_offers(company, created_by, rows):
+    """
+    Validate and insert offers in chunks: one skill upsert, one offer
+    bulk_create and one through-table bulk_create per chunk, then a single
+    websocket notification for the whole import. A parse error stops the
+    import there; the chunks before it stay created and are broadcast.
+    """
+    created = []
+    errors = []
+    parse_errors = []
+    rows = _until_parse_error(rows, parse_errors)
+    for chunk_index, chunk in enumerate(chunked(rows, settings.BULK_BATCH_SIZE)):
+        valid = []
+        for i, row in enumerate(chunk):
+            serializer = OfferImportSerializer(data=row)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({"row": chunk_index * settings.BULK_BATCH_SIZE + i + 1, "errors": serializer.errors})
+        if not valid:
+            continue
+
+        with transaction.atomic():
+            skills = upsert_skills(name for data in valid for name in data.get("required_skills", []))
+            offers = Offer.objects.bulk_create([
+                Offer(
+                    company=company,
+                    created_by=created_by,
+                    # bulk_create bypasses Offer.save()
+                    effective_deadline=Offer.compute_effective_deadline(data.get("deadline"), data.get("extended_deadline")),
+                    **{k: v for k, v in data.items() if k != "required_skills"},
+                )
+                for data in valid
+            ])
+            links = []
+            for offer, data in zip(offers, valid):
+                offer_skills = {skill_key(name): skills[skill_key(name)] for name in data.get("required_skills", [])}
+                links += [
+                    Offer.required_skills.through(offer_id=offer.id, skill_id=skill.id)
+                    for skill in offer_skills.values()
+                ]
+                created.append(offer_broadcast_payload(offer, [s.name for s in offer_skills.values()]))
+            Offer.required_skills.through.objects.bulk_create(links, ignore_conflicts=True)
+            # bulk_create skips the signals that maintain the feature store and search index
+            refresh_offer_features([offer.id for offer in offers])
+            index_offers([offer.id for offer in offers])
+            company_offers_changed([company.id])
+
+    errors += parse_errors
+    if created:
+        async_to_sync(get_channel_layer().group_send)(
+            "offers",
+            {"type": "send_new_offers", "offers": created},
+        )
+    return {"created": created, "errors": errors}
@@ -15,3 +15,32 @@ class OfferConsumer(AsyncWebsocketConsumer):
             "type": "new_offer",
             "offer": event["offer"],
         }))
+
+    async def send_new_offers(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "new_offers",
+            "offers": event["offers"],
+        }))
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """Per-student events (e.g. promoted from the waiting list), on group user_<id>."""
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+        self.group_name = f"user_{user.id}"
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def application_promoted(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "application_promoted",
+            "application": event["application"],
+            "offer": event["offer"],
+        }))
@@ -0,0 +1,130 @@
+# api/corpus_rescoring.py
+"""
+Rescoring every application after a retrain (python manage.py rescore_applications).
+
+Applications are read in pk order, a chunk at a time, skipping those already
+scored by the loaded model: Application.model_version is the checkpoint, so
+an interrupted run simply carries on with what is left. Feature rows are read
+in this process, the model calls run on a process pool a few chunks ahead of
+the writer, and fits are written with bulk_update in BULK_BATCH_SIZE
+transactions, so rows are never locked for long. Once every fit moved, the
+final_rank frozen on closed offers is recomputed from the new fits (rank
+points already paid are left alone).
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef
+
+from api.bulk import chunked, keyset_chunks
+from api.feature_store import ScoringContext
+from api.gamification import ranked_applications
+from api.ml_utils import model_version, score_features
+from api.models import Application, Company, Offer
+from api.offer_stats import company_offers_changed
+from api.rescoring import SCORE_FIELDS, scoring_rows
+
+
+# =========================
+# 🧮 WORKERS
+# =========================
+def _init_worker():
+    django.setup()  # no-op when forked, needed under spawn / forkserver
+
+
+def _score_chunk(features):
+    return model_version(), score_features(features)
+
+
+def _executor(workers):
+    if workers == 1:
+        return ThreadPoolExecutor(max_workers=1)
+    connections.close_all()  # forked workers must not share the parent's connection
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    # workers are forked on the first submit: do it now, not once the first chunk has reopened a connection
+    pool.submit(os.getpid).result()
+    return pool
+
+
+# =========================
+# 🔁 RESCORING
+# =========================
+def stale_applications(version):
+    """Applications not scored by `version` yet, annotated with profile_id."""
+    return scoring_rows().exclude(model_version=version)
+
+
+def _feature_chunks(version, chunk_size):
+    for chunk in keyset_chunks(stale_applications(version), chunk_size):
+        apps = [app for app in chunk if app.profile_id is not None]
+        # a context per chunk keeps memory flat however large the corpus
+        features = ScoringContext().features_for_ids([(app.profile_id, app.offer_id) for app in apps])
+        yield apps, features
+
+
+def _write(apps, future, version):
+    worker_version, fits = future.result()
+    if worker_version != version:
+        raise RuntimeError(f"Workers loaded model {worker_version!r}, expected {version!r}: was it retrained mid-run?")
+    for app, fit in zip(apps, fits):
+        app.predicted_fit, app.model_version = fit, version
+    for batch in chunked(apps, settings.BULK_BATCH_SIZE):
+        with transaction.atomic():
+            Application.objects.bulk_update(batch, SCORE_FIELDS)
+    return len(apps)
+
+
+def refresh_final_ranks(batch_size=None):
+    """Re-rank the applications of closed offers by their current fit; returns how many ranks moved."""
+    batch_size = batch_size or settings.OFFER_LIFECYCLE_BATCH_SIZE
+    ranked_offers = Offer.objects.filter(
+        Exists(Application.objects.filter(offer=OuterRef("pk"), final_rank__isnull=False))
+    ).only("id")
+    moved = 0
+    for offers in keyset_chunks(ranked_offers, batch_size):
+        changed = []
+        for apps in ranked_applications([offer.pk for offer in offers]).values():
+            for rank, app in enumerate(apps, start=1):
+                if app.final_rank != rank:
+                    app.final_rank = rank
+                    changed.append(app)
+        with transaction.atomic():
+            Application.objects.bulk_update(changed, ["final_rank"], batch_size=settings.BULK_BATCH_SIZE)
+        moved += len(changed)
+    return moved
+
+
+def rescore_corpus(workers=None, chunk_size=None, log=print):
+    """
+    Rescore every application not yet scored by the loaded model, then
+    refresh final ranks. Returns {"model_version", "rescored", "final_ranks"},
+    or None when no model is loaded.
+    """
+    version = model_version()
+    if not version:
+        log("❌ No model loaded: train one first (python manage.py retrain_model).")
+        return None
+    workers = workers or settings.CORPUS_RESCORE_WORKERS or os.cpu_count() or 1
+    chunk_size = chunk_size or settings.CORPUS_RESCORE_CHUNK_SIZE
+
+    total = stale_applications(version).count()
+    log(f"🔁 Rescoring {total} applications with model {version} on {workers} workers")
+    rescored = 0
+    with _executor(workers) as pool:
+        in_flight = deque()
+        for apps, features in _feature_chunks(version, chunk_size):
+            in_flight.append((apps, pool.submit(_score_chunk, features)))
+            if len(in_flight) > workers * 2:  # bounded read-ahead
+                rescored += _write(*in_flight.popleft(), version)
+                log(f"  {rescored}/{total}")
+        while in_flight:
+            rescored += _write(*in_flight.popleft(), version)
+            log(f"  {rescored}/{total}")
+
+    final_ranks = refresh_final_ranks()
+    company_offers_changed(Company.objects.values_list("pk", flat=True))
+    return {"model_version": version, "rescored": rescored, "final_ranks": final_ranks}
@@ -1,37 +1,150 @@
-import pandas as pd
+import csv
+
+from django.conf import settings
+
+from api.bulk import keyset_chunks
 from api.models import Application
 
-def export_dataset():
-    data = []
-
-    # Get all applications, with related user and offer data
-    applications = Application.objects.select_related("user", "offer")
-
-    for app in applications:
-        user = app.user
-        profile = user.profile
-        offer = app.offer
-
-        # count overlapping skills between student and offer
-        skill_overlap = profile.skills.filter(id__in=offer.required_skills.all()).count()
-        total_skills = profile.skills.count() or 1  # avoid zero division
-        skill_match_ratio = skill_overlap / total_skills
-
-        data.append({
-            "user_id": user.id,
-            "username": user.username,
-            "offer_id": offer.id,
-            "offer_title": offer.title,
-            "gpa": float(profile.gpa or 0),
-            "score": profile.score,
-            "field_of_study": profile.field_of_study,
-            "field_required": offer.field_required,
-            "skill_match_ratio": round(skill_match_ratio, 2),
-            "status": 1 if app.status == "accepted" else 0
-        })
-
-    df = pd.DataFrame(data)
-    df.to_csv("training_dataset.csv", index=False)
-    print(f"✅ Exported {len(df)} rows to training_dataset.csv")
-
-    return df
+COLUMNS = [
+    "user_id",
+    "email",
+    "offer_id",
+    "offer_title",
+    "gpa",
+    "score",
+    "field_of_study",
+    "field_required",
+    "skill_match_ratio",
+    "status",
+]
+
+
+def iter_dataset_chunks(chunk_size=None):
+    """
+    Yield lists of dataset rows, chunk_size applications at a time.
+    Keyset pagination on pk + prefetching keeps queries constant per chunk
+    and memory bounded by one chunk, whatever the table size.
+    """
+    queryset = (
+        Application.objects
+        .select_related("user__profile", "offer")
+        .prefetch_related("user__profile__skills", "offer__required_skills")
+    )
+    for apps in keyset_chunks(queryset, chunk_size or settings.BULK_BATCH_SIZE):
+        rows = []
+        for app in apps:
+            user = app.user
+            profile = getattr(user, "profile", None)
+            offer = app.offer
+            if profile is None:
+                continue
+
+            # count overlapping skills between student and offer
+            profile_skills = {s.id for s in profile.skills.all()}
+            offer_skills = {s.id for s in offer.required_skills.all()}
+            total_skills = len(profile_skills) or 1  # avoid zero division
+            skill_match_ratio = len(profile_skills & offer_skills) / total_skills
+
+            rows.append({
+                "user_id": user.id,
+                "email": user.email,
+                "offer_id": offer.id,
+                "offer_title": offer.title,
+                "gpa": float(profile.gpa or 0),
+                "score": profile.score,
+                "field_of_study": profile.field_of_study,
+                "field_required": offer.field_required,
+                "skill_match_ratio": round(skill_match_ratio, 2),
+                "status": 1 if app.status == "accepted" else 0
+            })
+        yield rows
+
+
+class _Echo:
+    """File-like object whose write() hands the data back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(chunks=None):
+    """Yield the dataset as CSV text, one chunk of rows at a time."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for rows in chunks if chunks is not None else iter_dataset_chunks():
+        yield "".join(writer.writerow([row[c] for c in COLUMNS]) for row in rows)
+
+
+class _Drain:
+    """Binary sink for pyarrow that buffers only until the next drain()."""
+
+    def __init__(self):
+        self.closed = False
+        self._parts = []
+        self._position = 0
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_parquet(chunks=None):
+    """Yield the dataset as Parquet bytes, one row group per chunk (needs pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("user_id", pa.int64()),
+        ("email", pa.string()),
+        ("offer_id", pa.int64()),
+        ("offer_title", pa.string()),
+        ("gpa", pa.float64()),
+        ("score", pa.int64()),
+        ("field_of_study", pa.string()),
+        ("field_required", pa.string()),
+        ("skill_match_ratio", pa.float64()),
+        ("status", pa.int8()),
+    ])
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in chunks if chunks is not None else iter_dataset_chunks():
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def export_dataset(path="training_dataset.csv", fmt="csv", chunk_size=None):
+    """Write the dataset to disk incrementally; returns the number of rows."""
+    count = 0
+
+    def counted_chunks():
+        nonlocal count
+        for rows in iter_dataset_chunks(chunk_size):
+            count += len(rows)
+            yield rows
+
+    if fmt == "parquet":
+        stream, open_kwargs = stream_parquet(counted_chunks()), {"mode": "wb"}
+    else:
+        stream, open_kwargs = stream_csv(counted_chunks()), {"mode": "w", "newline": "", "encoding": "utf-8"}
+    with open(path, **open_kwargs) as f:
+        for part in stream:
+            f.write(part)
+
+    print(f"✅ Exported {count} rows to {path}")
+    return count
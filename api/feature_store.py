@@ -0,0 +1,216 @@
+# api/feature_store.py
+"""
+Materialized scoring inputs for profiles and offers.
+
+ProfileFeatures / OfferFeatures hold everything predict_fit needs, so scoring a
+pair costs two primary-key lookups (or one query per side for a batch) instead
+of walking skills and certifications every time. Rows are refreshed by the
+signals in api/signals.py whenever a source row changes; rows that are missing
+or carry an older FEATURE_STORE_VERSION are rebuilt on read.
+"""
+import time
+
+from django.utils import timezone
+
+from api.models import Offer, OfferFeatures, Profile, ProfileFeatures
+
+# Bump whenever the computation below changes: older rows get rebuilt on read.
+FEATURE_STORE_VERSION = 1
+
+
+# =========================
+# 🧮 COMPUTATION
+# =========================
+# Profile fields (and m2m relations) each stored feature is computed from;
+# saving a profile only touches the features whose sources changed.
+PROFILE_FEATURE_SOURCES = {
+    "gpa": {"gpa"},
+    "score": {"score"},
+    "field_of_study": {"field_of_study"},
+    "city": {"university"},
+    "skill_ids": {"skills"},
+    "cert_skill_ids": {"certifications"},
+}
+
+
+def profile_features_affected(changed_fields):
+    """Stored features that depend on any of these Profile fields."""
+    return {feature for feature, sources in PROFILE_FEATURE_SOURCES.items() if sources & set(changed_fields)}
+
+
+# Same for offers: editing only the title or description leaves every fit alone.
+OFFER_FEATURE_SOURCES = {
+    "field_required": {"field_required"},
+    "location": {"location"},
+    "deadline": {"deadline"},
+    "skill_ids": {"required_skills"},
+}
+
+
+def offer_features_affected(changed_fields):
+    """Stored features that depend on any of these Offer fields."""
+    return {feature for feature, sources in OFFER_FEATURE_SOURCES.items() if sources & set(changed_fields)}
+
+
+def compute_profile_features(profile):
+    university = profile.university
+    return ProfileFeatures(
+        profile_id=profile.pk,
+        gpa=float(profile.gpa or 0),
+        score=profile.score or 0,
+        field_of_study=(profile.field_of_study or "").strip(),
+        city=university.city.strip().lower() if university else None,
+        skill_ids=sorted(s.id for s in profile.skills.all()),
+        cert_skill_ids=[sorted(s.id for s in cert.skills.all()) for cert in profile.certifications.all()],
+        version=FEATURE_STORE_VERSION,
+    )
+
+
+def compute_offer_features(offer):
+    return OfferFeatures(
+        offer_id=offer.pk,
+        field_required=(offer.field_required or "").strip(),
+        location=(offer.location or "").strip().lower(),
+        deadline=offer.deadline,
+        skill_ids=sorted(s.id for s in offer.required_skills.all()),
+        version=FEATURE_STORE_VERSION,
+    )
+
+
+def combine_features(profile_features, offer_features, today=None):
+    """Rule-engine features of a pair, same keys as ml_utils.extract_features."""
+    today = today or timezone.now().date()
+    offer_skills = set(offer_features.skill_ids)
+
+    if offer_skills:
+        skill_match = len(offer_skills.intersection(profile_features.skill_ids)) / len(offer_skills)
+    else:
+        skill_match = 1.0
+
+    cert_sets = profile_features.cert_skill_ids
+    matching_certs = sum(1 for cert_skills in cert_sets if offer_skills.intersection(cert_skills))
+
+    location_match = int(
+        bool(offer_features.location)
+        and profile_features.city is not None
+        and profile_features.city == offer_features.location
+    )
+
+    return {
+        "gpa": profile_features.gpa,
+        "score": float(profile_features.score),
+        "skill_match": skill_match,
+        "field_match": int(profile_features.field_of_study == offer_features.field_required),
+        "cert_ratio": matching_certs / max(len(cert_sets), 1),
+        "cert_count": len(cert_sets),
+        "location_match": location_match,
+        "deadline_passed": 1 if offer_features.deadline and offer_features.deadline < today else 0,
+    }
+
+
+# =========================
+# 💾 REFRESH (write path)
+# =========================
+def _upsert(model, rows, pk_field):
+    if rows:
+        update_fields = [f.name for f in model._meta.concrete_fields if f.name != pk_field]
+        model.objects.bulk_create(rows, update_conflicts=True, unique_fields=[pk_field], update_fields=update_fields)
+    return {getattr(row, f"{pk_field}_id"): row for row in rows}
+
+
+def refresh_profile_features(profile_ids):
+    profiles = (
+        Profile.objects
+        .filter(pk__in=list(profile_ids))
+        .select_related("university")
+        .prefetch_related("skills", "certifications__skills")
+    )
+    return _upsert(ProfileFeatures, [compute_profile_features(p) for p in profiles], "profile")
+
+
+def update_profile_features(profile, features):
+    """
+    Refresh only `features` of a saved profile's row. Columns read straight
+    off the profile are written with one UPDATE; anything else (city,
+    skills, certifications) or a missing row falls back to a full refresh.
+    """
+    if not features:
+        return
+    direct = {
+        "gpa": float(profile.gpa or 0),
+        "score": profile.score or 0,
+        "field_of_study": (profile.field_of_study or "").strip(),
+    }
+    if set(features) <= direct.keys():
+        updated = ProfileFeatures.objects.filter(profile_id=profile.pk, version=FEATURE_STORE_VERSION).update(
+            updated_at=timezone.now(), **{name: direct[name] for name in features}
+        )
+        if updated:
+            return
+    refresh_profile_features([profile.pk])
+
+
+def refresh_offer_features(offer_ids):
+    offers = Offer.objects.filter(pk__in=list(offer_ids)).prefetch_related("required_skills")
+    return _upsert(OfferFeatures, [compute_offer_features(o) for o in offers], "offer")
+
+
+# =========================
+# 📖 READ PATH
+# =========================
+def _load(model, ids, refresh):
+    ids = set(ids)
+    rows = model.objects.in_bulk(ids)
+    stale = {pk for pk in ids if pk not in rows or rows[pk].version != FEATURE_STORE_VERSION}
+    if stale:
+        rows.update(refresh(stale))
+    return rows
+
+
+def get_profile_features(profile_ids):
+    """{profile_id: ProfileFeatures}, rebuilding missing or stale rows."""
+    return _load(ProfileFeatures, profile_ids, refresh_profile_features)
+
+
+def get_offer_features(offer_ids):
+    """{offer_id: OfferFeatures}, rebuilding missing or stale rows."""
+    return _load(OfferFeatures, offer_ids, refresh_offer_features)
+
+
+class ScoringContext:
+    """
+    Memo of feature rows for one request or batch: each profile and offer is
+    read at most once, however many pairs it takes part in. Create a new
+    context per request; rows are not invalidated while it lives.
+
+    With `budget_ms`, model calls that would end past the budget give way to
+    rules-only estimates (ml_utils.score_features), and `estimated` is set.
+    """
+
+    def __init__(self, today=None, budget_ms=None):
+        self.today = today or timezone.now().date()
+        self.deadline = time.monotonic() + budget_ms / 1000 if budget_ms else None
+        self.estimated = False
+        self._profiles = {}
+        self._offers = {}
+
+    def remaining(self):
+        """Seconds left of the budget, None without one."""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    @staticmethod
+    def _fetch(cache, ids, load):
+        missing = set(ids) - cache.keys()
+        if missing:
+            cache.update(load(missing))
+        return cache
+
+    def features(self, pairs):
+        """Rule-engine features of (profile, offer) pairs, in order."""
+        return self.features_for_ids([(profile.pk, offer.pk) for profile, offer in pairs])
+
+    def features_for_ids(self, id_pairs):
+        """Same as features(), from (profile_id, offer_id) pairs."""
+        profiles = self._fetch(self._profiles, {profile_id for profile_id, _ in id_pairs}, get_profile_features)
+        offers = self._fetch(self._offers, {offer_id for _, offer_id in id_pairs}, get_offer_features)
+        return [combine_features(profiles[p], offers[o], self.today) for p, o in id_pairs]
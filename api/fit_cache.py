@@ -0,0 +1,66 @@
+# api/fit_cache.py
+"""
+Bounded LRU + TTL memo of model probabilities (api.ml_utils.cached_probabilities).
+
+The model's six inputs are low-cardinality (two-decimal GPA, integer score,
+ratios over small skill sets, binary flags), so many (profile, offer) pairs
+share one quantized input vector and the forest only needs to see it once.
+Keys carry the model version, and ml_utils.load_model() clears the cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class FitCache:
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """{key: value} of the keys cached and not expired."""
+        now = self.clock()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def set_many(self, items):
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+        }
@@ -1,49 +1,42 @@
 # api/gamification.py
 
-from api.models import Application, ScoreHistory
-from api.ml_utils import compute_skill_match_ratio
+from collections import defaultdict
 
-def update_profile_score(profile):
-    """Auto compute and save profile score based on GPA, skills, certs."""
-    profile.score = compute_skill_match_ratio(profile)
-    profile.save(update_fields=["score"])
-    return profile.score
+from django.db.models import F
 
+from api.models import Application
+from api.score_ledger import award_points
 
-def distribute_rank_points(offer):
-    """Distribute extra gamification points to top candidates after deadline."""
+
+def rank_bonus(rank):
+    """Points for finishing at `rank` once an offer's deadline has passed."""
+    if rank == 1:
+        return 100
+    elif rank == 2:
+        return 70
+    elif rank == 3:
+        return 50
+    elif rank <= 10:
+        return 20
+    return 5
+
+
+def ranked_applications(offer_ids):
+    """{offer_id: its applications, best predicted fit first}, in one query."""
+    ranked = defaultdict(list)
     apps = (
         Application.objects
-        .filter(offer=offer)
-        .select_related("user__profile")
-        .order_by("-predicted_fit")
+        .filter(offer_id__in=offer_ids)
+        .order_by("offer_id", F("predicted_fit").desc(nulls_last=True), "pk")
+        .only("id", "user_id", "offer_id", "status", "is_fake", "predicted_fit", "final_rank")
     )
+    for app in apps:
+        ranked[app.offer_id].append(app)
+    return ranked
 
-    if not apps.exists():
-        return 0
-
-    for i, app in enumerate(apps, start=1):
-        profile = app.user.profile
-        bonus = 0
-
-        if i == 1:
-            bonus = 100
-        elif i == 2:
-            bonus = 70
-        elif i == 3:
-            bonus = 50
-        elif i <= 10:
-            bonus = 20
-        else:
-            bonus = 5
-
-        profile.score += bonus
-        profile.save(update_fields=["score"])
-
-        ScoreHistory.objects.create(
-            user=app.user,
-            reason=f"Rank {i} in {offer.title}",
-            points=bonus
-        )
 
+def distribute_rank_points(offer):
+    """Distribute extra gamification points to top candidates after deadline."""
+    apps = ranked_applications([offer.id])[offer.id]
+    award_points([(app.user_id, rank_bonus(i), f"Rank {i} in {offer.title}") for i, app in enumerate(apps, start=1)])
     return len(apps)
@@ -0,0 +1,40 @@
+# api/hashers.py
+"""
+Password hashers whose cost is read from settings.
+
+They keep Django's algorithm names, so hashes created with the stock hashers
+still verify, and any hash whose parameters differ from the configured cost
+is upgraded transparently on the next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+)
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ARGON2_PARALLELISM
+
+
+class TunableBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return settings.BCRYPT_ROUNDS
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PBKDF2_ITERATIONS
@@ -0,0 +1,235 @@
+# api/leaderboard.py
+"""
+Student leaderboards by Profile.score, per scope: "global",
+"university:<id>" and "field:<field of study, lowercased>".
+
+Scores live in ordered structures: Redis sorted sets when
+LEADERBOARD_REDIS_URL is set (shared by every process), otherwise
+sortedcontainers lists in this process (rebuilt after
+LEADERBOARD_MEMORY_MAX_AGE seconds to catch writes made by other processes).
+Ranks are competition ranks (1 + students with a strictly higher score),
+answered in O(log n); pages of the top N cost O(log n + N).
+
+Writes never sort anything: after a score change (ScoreHistory row,
+score_ledger.award_points, Profile save) the touched profiles are re-read
+and moved in their scopes, once the transaction commits.
+"""
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from sortedcontainers import SortedList
+
+from api.models import Profile
+
+GLOBAL = "global"
+
+
+def scopes_for(university_id, field_of_study):
+    scopes = [GLOBAL]
+    if university_id:
+        scopes.append(f"university:{university_id}")
+    field = (field_of_study or "").strip().lower()
+    if field:
+        scopes.append(f"field:{field}")
+    return tuple(scopes)
+
+
+# =========================
+# 🗄️ BACKENDS
+# =========================
+class MemoryBackend:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._boards = defaultdict(SortedList)  # scope -> [(-score, profile_id)]
+            self._scores = defaultdict(dict)  # scope -> {profile_id: score}
+            self._memberships = {}  # profile_id -> scopes
+            self.built_at = None
+
+    def is_built(self):
+        return self.built_at is not None and time.monotonic() - self.built_at < settings.LEADERBOARD_MEMORY_MAX_AGE
+
+    def mark_built(self):
+        self.built_at = time.monotonic()
+
+    def memberships(self, profile_ids):
+        with self._lock:
+            return {pk: self._memberships.get(pk, ()) for pk in profile_ids}
+
+    def apply(self, removals, sets, memberships):
+        with self._lock:
+            for scope, pk in removals:
+                score = self._scores[scope].pop(pk, None)
+                if score is not None:
+                    self._boards[scope].remove((-score, pk))
+            for scope, pk, score in sets:
+                old = self._scores[scope].get(pk)
+                if old is not None:
+                    self._boards[scope].remove((-old, pk))
+                self._scores[scope][pk] = score
+                self._boards[scope].add((-score, pk))
+            self._memberships.update(memberships)
+
+    def count(self, scope):
+        with self._lock:
+            return len(self._boards.get(scope, ()))
+
+    def score(self, scope, pk):
+        with self._lock:
+            return self._scores.get(scope, {}).get(pk)
+
+    def count_above(self, scope, score):
+        with self._lock:
+            board = self._boards.get(scope)
+            return board.bisect_left((-score, float("-inf"))) if board else 0
+
+    def top(self, scope, offset, limit):
+        with self._lock:
+            board = self._boards.get(scope)
+            if not board:
+                return []
+            return [(pk, -neg) for neg, pk in board.islice(offset, offset + limit)]
+
+
+class RedisBackend:
+    def __init__(self, url, prefix):
+        import redis
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, scope):
+        return f"{self.prefix}:board:{scope}"
+
+    def clear(self):
+        keys = list(self.redis.scan_iter(f"{self.prefix}:*"))
+        for start in range(0, len(keys), 500):
+            self.redis.delete(*keys[start:start + 500])
+
+    def is_built(self):
+        return bool(self.redis.exists(f"{self.prefix}:built"))
+
+    def mark_built(self):
+        self.redis.set(f"{self.prefix}:built", "1")
+
+    def memberships(self, profile_ids):
+        profile_ids = list(profile_ids)
+        values = self.redis.hmget(f"{self.prefix}:memberships", profile_ids) if profile_ids else []
+        return {pk: tuple(v.split("|")) if v else () for pk, v in zip(profile_ids, values)}
+
+    def apply(self, removals, sets, memberships):
+        pipe = self.redis.pipeline(transaction=False)
+        for scope, pk in removals:
+            pipe.zrem(self._key(scope), pk)
+        for scope, pk, score in sets:
+            pipe.zadd(self._key(scope), {pk: score})
+        if memberships:
+            pipe.hset(f"{self.prefix}:memberships", mapping={pk: "|".join(s) for pk, s in memberships.items()})
+        pipe.execute()
+
+    def count(self, scope):
+        return self.redis.zcard(self._key(scope))
+
+    def score(self, scope, pk):
+        score = self.redis.zscore(self._key(scope), pk)
+        return None if score is None else int(score)
+
+    def count_above(self, scope, score):
+        return self.redis.zcount(self._key(scope), f"({score}", "+inf")
+
+    def top(self, scope, offset, limit):
+        entries = self.redis.zrevrange(self._key(scope), offset, offset + limit - 1, withscores=True)
+        return [(int(pk), int(score)) for pk, score in entries]
+
+
+# =========================
+# 🏆 SERVICE
+# =========================
+class Leaderboard:
+    def __init__(self, backend):
+        self.backend = backend
+        self._build_lock = threading.Lock()
+
+    def _update(self, rows, removed=()):
+        """rows: (profile_id, score, university_id, field_of_study) of current students."""
+        rows = list(rows)
+        ids = [row[0] for row in rows] + list(removed)
+        previous = self.backend.memberships(ids)
+        removals, sets, memberships = [], [], {}
+        for pk, score, university_id, field in rows:
+            scopes = scopes_for(university_id, field)
+            removals += [(scope, pk) for scope in previous[pk] if scope not in scopes]
+            sets += [(scope, pk, score) for scope in scopes]
+            memberships[pk] = scopes
+        for pk in removed:
+            removals += [(scope, pk) for scope in previous[pk]]
+            memberships[pk] = ()
+        self.backend.apply(removals, sets, memberships)
+
+    @staticmethod
+    def _student_rows(queryset):
+        return queryset.filter(role="student").values_list("pk", "score", "university_id", "field_of_study")
+
+    def rebuild(self):
+        with self._build_lock:
+            self.backend.clear()
+            last_pk = 0
+            while rows := list(self._student_rows(Profile.objects.filter(pk__gt=last_pk).order_by("pk"))[:5000]):
+                self._update(rows)
+                last_pk = rows[-1][0]
+            self.backend.mark_built()
+
+    def ensure_built(self):
+        if not self.backend.is_built():
+            self.rebuild()
+
+    def refresh_profiles(self, profile_ids):
+        """Re-read these profiles and move them in their scopes (drops non-students)."""
+        if not self.backend.is_built():
+            return  # the next read rebuilds everything anyway
+        profile_ids = set(profile_ids)
+        rows = list(self._student_rows(Profile.objects.filter(pk__in=profile_ids)))
+        self._update(rows, removed=profile_ids - {row[0] for row in rows})
+
+    def refresh_users(self, user_ids):
+        self.refresh_profiles(Profile.objects.filter(user_id__in=list(user_ids)).values_list("pk", flat=True))
+
+    def rank(self, scope, profile_id):
+        """(rank, score) of a student in a scope, or None if not on that board."""
+        self.ensure_built()
+        score = self.backend.score(scope, profile_id)
+        if score is None:
+            return None
+        return self.backend.count_above(scope, score) + 1, score
+
+    def page(self, scope, offset, limit):
+        """(total, [(rank, profile_id, score)]) for one page of the board."""
+        self.ensure_built()
+        entries = self.backend.top(scope, offset, limit)
+        ranks = {}
+        for _, score in entries:
+            if score not in ranks:
+                ranks[score] = self.backend.count_above(scope, score) + 1
+        return self.backend.count(scope), [(ranks[score], pk, score) for pk, score in entries]
+
+
+def _make_backend():
+    if settings.LEADERBOARD_REDIS_URL:
+        return RedisBackend(settings.LEADERBOARD_REDIS_URL, settings.LEADERBOARD_REDIS_PREFIX)
+    return MemoryBackend()
+
+
+leaderboard = Leaderboard(_make_backend())
+
+
+def scores_changed(user_ids):
+    """Refresh the leaderboards for these users once the current transaction commits."""
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: leaderboard.refresh_users(user_ids))
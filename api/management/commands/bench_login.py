@@ -0,0 +1,37 @@
+import time
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hashers
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Benchmark password verification (logins/sec/core) for the legacy and configured hashers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Verifications per hasher")
+        parser.add_argument("--password", default="correct horse battery staple")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        password = options["password"]
+
+        # Stock Django PBKDF2 = what every existing account was hashed with
+        candidates = [("legacy pbkdf2_sha256 (django default)", PBKDF2PasswordHasher())]
+        for i, hasher in enumerate(get_hashers()):
+            label = f"{hasher.algorithm} [{type(hasher).__name__}]"
+            candidates.append((label + (" (preferred)" if i == 0 else ""), hasher))
+
+        self.stdout.write(f"🔐 {iterations} verifications per hasher, single thread\n")
+        for label, hasher in candidates:
+            encoded = hasher.encode(password, hasher.salt())
+            hasher.verify(password, encoded)  # warm-up
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                hasher.verify(password, encoded)
+            elapsed = time.perf_counter() - start
+
+            self.stdout.write(
+                f"{label:<60} {elapsed / iterations * 1000:8.2f} ms/login  "
+                f"{iterations / elapsed:8.1f} logins/sec/core"
+            )
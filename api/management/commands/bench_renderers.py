@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.models import Offer, Profile, User
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+
+RENDERERS = [
+    ("drf json", JSONRenderer()),
+    ("orjson", ORJSONRenderer()),
+    ("msgpack", MessagePackRenderer()),
+]
+
+
+class Command(BaseCommand):
+    help = "Benchmark DRF's JSONRenderer against the orjson / msgpack renderers on the largest API payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Renders per payload and renderer")
+
+    def payloads(self):
+        """(label, response data) of the biggest list endpoints, fetched as their usual users."""
+        client = APIClient()
+        staff = User.objects.filter(is_staff=True).first() or User.objects.first()
+        student = Profile.objects.filter(role="student").select_related("user").first()
+        offer = Offer.objects.annotate(n=Count("applications")).order_by("-n").first()
+        if staff is None or offer is None:
+            return []
+
+        client.force_authenticate(staff)
+        urls = [
+            ("applications", "/api/applications/"),
+            ("offers", "/api/offers/"),
+            ("ranked_candidates", f"/api/offers/{offer.id}/ranked_candidates/"),
+        ]
+        payloads = [(label, client.get(url).data) for label, url in urls]
+        if student is not None:
+            client.force_authenticate(student.user)
+            payloads.append(("recommended", client.get("/api/offers/recommended/").data))
+        return payloads
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        payloads = self.payloads()
+        if not payloads:
+            self.stdout.write(self.style.WARNING("⚠️ No data to render: seed the database first"))
+            return
+
+        self.stdout.write(f"🧾 {iterations} renders per payload\n")
+        for label, data in payloads:
+            baseline = None
+            for name, renderer in RENDERERS:
+                renderer.render(data)  # warm-up
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    body = renderer.render(data)
+                elapsed = (time.perf_counter() - start) / iterations
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f"{label:<18} {name:<9} {elapsed * 1000:9.2f} ms  {len(body) / 1024:9.1f} KiB  "
+                    f"{baseline / elapsed:5.1f}x"
+                )
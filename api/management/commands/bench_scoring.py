@@ -0,0 +1,86 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.ml_utils import base_probabilities
+from api.scoring_batcher import MicroBatcher
+
+
+def random_features(rng):
+    return {
+        "gpa": round(rng.uniform(0, 4), 2),
+        "score": float(rng.randint(0, 400)),
+        "skill_match": rng.choice([0, 0.25, 0.5, 0.75, 1.0]),
+        "field_match": rng.randint(0, 1),
+        "cert_ratio": rng.choice([0, 0.5, 1.0]),
+        "cert_count": rng.randint(0, 5),
+        "location_match": rng.randint(0, 1),
+        "deadline_passed": 0,
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark single-row scoring against the micro-batcher with many concurrent clients."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", default="50,100,250,500", help="Comma-separated concurrency levels")
+        parser.add_argument("--requests", type=int, default=4, help="Single-row requests per client")
+
+    def run(self, clients, requests, score_one):
+        rng = random.Random(0)
+        rows = [[random_features(rng) for _ in range(requests)] for _ in range(clients)]
+        latencies = []
+        start_line = threading.Barrier(clients + 1)
+
+        def client(own_rows):
+            start_line.wait()
+            for row in own_rows:
+                started = time.perf_counter()
+                score_one(row)
+                latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=client, args=(own,)) for own in rows]
+        for thread in threads:
+            thread.start()
+        start_line.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "rows/s": len(latencies) / elapsed,
+            "p50 ms": latencies[len(latencies) // 2] * 1000,
+            "p99 ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        }
+
+    def handle(self, *args, **options):
+        requests = options["requests"]
+        base_probabilities([random_features(random.Random(0))])  # warm-up
+        self.stdout.write(
+            f"🌲 {requests} single-row requests per client, batches of up to {settings.SCORING_MICROBATCH_MAX_ROWS} "
+            f"rows / {settings.SCORING_MICROBATCH_MAX_WAIT_MS} ms\n"
+        )
+        for clients in [int(n) for n in options["clients"].split(",")]:
+            per_row = self.run(clients, requests, lambda row: base_probabilities([row]))
+
+            batcher = MicroBatcher(
+                base_probabilities,
+                max_batch_size=settings.SCORING_MICROBATCH_MAX_ROWS,
+                max_wait=settings.SCORING_MICROBATCH_MAX_WAIT_MS / 1000,
+            )
+            batched = self.run(clients, requests, lambda row: batcher.submit([row]).result())
+            batcher.close()
+
+            for label, result in (("per-row", per_row), ("batched", batched)):
+                self.stdout.write(
+                    f"{clients:>4} clients {label:<8} {result['rows/s']:9.1f} rows/s  "
+                    f"p50 {result['p50 ms']:8.2f} ms  p99 {result['p99 ms']:8.2f} ms"
+                )
+            self.stdout.write(
+                f"{'':>12} {batched['rows/s'] / per_row['rows/s']:.1f}x throughput, "
+                f"mean batch {batcher.stats()['mean_batch']:.1f} rows"
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.scheduler import run_job
+
+
+class Command(BaseCommand):
+    help = "Close offers past their effective deadline and distribute their rewards now."
+
+    def handle(self, *args, **options):
+        result = run_job("offer_lifecycle", force=True)
+        if result is None:
+            self.stdout.write(self.style.WARNING("⏳ The offer lifecycle job is running on another replica"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ Closed {result['closed_offers']} expired offers"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.export_data import export_dataset
+
+
+class Command(BaseCommand):
+    help = "Export the training dataset incrementally to CSV or Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+        parser.add_argument("--output", help="Defaults to training_dataset.<format>")
+        parser.add_argument("--chunk-size", type=int, help="Applications per chunk")
+
+    def handle(self, *args, **options):
+        fmt = options["format"]
+        export_dataset(
+            path=options["output"] or f"training_dataset.{fmt}",
+            fmt=fmt,
+            chunk_size=options["chunk_size"],
+        )
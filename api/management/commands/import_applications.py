@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bulk import import_applications
+from api.models import University
+
+
+class Command(BaseCommand):
+    help = "Import historical applications from a CSV file (columns: email, offer_id[, status])."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file, or - for stdin")
+        parser.add_argument("--university", type=int, help="Only import students of this university id")
+
+    def handle(self, *args, **options):
+        university = None
+        if options["university"]:
+            try:
+                university = University.objects.get(pk=options["university"])
+            except University.DoesNotExist:
+                raise CommandError(f"University {options['university']} not found")
+
+        if options["path"] == "-":
+            result = import_applications(sys.stdin, university=university)
+        else:
+            with open(options["path"], newline="", encoding="utf-8-sig") as f:
+                result = import_applications(f, university=university)
+
+        self.stdout.write(f"✅ {result['written']} applications written")
+        if result["skipped_lines"]:
+            self.stdout.write(f"⚠️ Skipped {len(result['skipped_lines'])} lines: {result['skipped_lines'][:20]}")
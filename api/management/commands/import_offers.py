@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.bulk import create_offers, read_offer_rows
+from api.models import Company
+
+
+class Command(BaseCommand):
+    help = "Bulk-create offers for a company from a CSV (skills separated by ';') or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--company", type=int, required=True, help="Company id")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+
+    def handle(self, *args, **options):
+        try:
+            company = Company.objects.get(pk=options["company"])
+        except Company.DoesNotExist:
+            raise CommandError(f"Company {options['company']} not found")
+
+        fmt = options["format"] or ("jsonl" if options["path"].lower().endswith(".jsonl") else "csv")
+        with open(options["path"], newline="", encoding="utf-8-sig") as f:
+            result = create_offers(company, None, read_offer_rows(f, fmt))
+
+        self.stdout.write(f"✅ {len(result['created'])} offers created for {company.name}")
+        for error in result["errors"][:20]:
+            self.stdout.write(f"⚠️ Row {error['row']}: {error['errors']}")
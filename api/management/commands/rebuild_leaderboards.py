@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.leaderboard import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Rebuild every leaderboard from Profile.score (e.g. after a Redis flush or a bulk import)."
+
+    def handle(self, *args, **options):
+        leaderboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ Ranked {leaderboard.backend.count('global')} students"))
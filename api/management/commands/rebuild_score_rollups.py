@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from api.score_analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the day / week / month score rollups from ScoreHistory."
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f"✅ Wrote {rebuild_rollups()} rollup rows"))
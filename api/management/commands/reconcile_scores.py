@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from api.score_ledger import compact_ledger, reconcile_scores
+
+
+class Command(BaseCommand):
+    help = "Check every Profile.score against its ScoreHistory ledger (optionally repairing drift)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix", choices=["profile", "ledger"],
+            help="profile: reset drifted scores to the ledger total; ledger: record an adjustment row instead",
+        )
+        parser.add_argument("--compact", action="store_true", help="Fold the ledger into snapshots first")
+
+    def handle(self, *args, **options):
+        if options["compact"]:
+            self.stdout.write(f"🗜️ Compacted {compact_ledger()} snapshots")
+        mismatches = reconcile_scores(fix=options["fix"])
+        for user_id, score, total in mismatches[:20]:
+            self.stdout.write(f"  user {user_id}: score {score}, ledger {total}")
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("✅ Every score matches its ledger"))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"✅ Repaired {len(mismatches)} scores ({options['fix']})"))
+        else:
+            self.stdout.write(self.style.WARNING(f"⚠️ {len(mismatches)} scores drifted from their ledger"))
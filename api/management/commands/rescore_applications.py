@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.corpus_rescoring import rescore_corpus
+
+
+class Command(BaseCommand):
+    help = "Rescore every application with the current model (after a retrain) and refresh final ranks. Resumable."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, help="Scoring processes (default: one per CPU)")
+        parser.add_argument("--chunk-size", type=int, help="Applications per model call")
+
+    def handle(self, *args, **options):
+        result = rescore_corpus(workers=options["workers"], chunk_size=options["chunk_size"], log=self.stdout.write)
+        if result is not None:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {result['rescored']} applications scored by model {result['model_version']}, "
+                f"{result['final_ranks']} final ranks moved"
+            ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.retraining import retrain
+
+
+class Command(BaseCommand):
+    help = "Retrain the fit model incrementally from applications changed since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Re-extract everything and rebuild the forest")
+
+    def handle(self, *args, **options):
+        retrain(full=options["full"], log=self.stdout.write)
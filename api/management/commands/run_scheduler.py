@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.scheduler import JOBS, run_forever, run_job, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run periodic background jobs (offer lifecycle, ...). Safe to start on every replica."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run due jobs once and exit")
+        parser.add_argument("--job", choices=sorted(JOBS), help="Run only this job now, even if not due")
+
+    def handle(self, *args, **options):
+        if options["job"]:
+            result = run_job(options["job"], force=True)
+            if result is None:
+                self.stdout.write(self.style.WARNING(f"⏳ {options['job']} is running on another replica"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ {options['job']}: {result}"))
+        elif options["once"]:
+            for name, result in run_pending().items():
+                self.stdout.write(self.style.SUCCESS(f"✅ {name}: {result}"))
+        else:
+            run_forever(log=self.stdout.write)
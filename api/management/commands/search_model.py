@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.model_search import search
+
+
+class Command(BaseCommand):
+    help = "Parallel hyperparameter search over forest / boosting models; publishes the best accuracy/latency trade-off."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sample", type=int, help="Evaluate a random subset of this many candidates")
+        parser.add_argument("--max-latency-ms", type=float, help="Single-row inference budget")
+        parser.add_argument("--jobs", type=int, default=-1, help="Worker processes (default: all cores)")
+        parser.add_argument("--dry-run", action="store_true", help="Report only, don't publish")
+
+    def handle(self, *args, **options):
+        search(
+            sample=options["sample"],
+            max_latency_ms=options["max_latency_ms"],
+            n_jobs=options["jobs"],
+            publish=not options["dry_run"],
+            log=self.stdout.write,
+        )
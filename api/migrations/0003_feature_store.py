@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_application_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferFeatures',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='api.offer')),
+                ('field_required', models.CharField(blank=True, max_length=150)),
+                ('location', models.CharField(blank=True, max_length=150)),
+                ('deadline', models.DateField(blank=True, null=True)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('version', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProfileFeatures',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='features', serialize=False, to='api.profile')),
+                ('gpa', models.FloatField(default=0)),
+                ('score', models.IntegerField(default=0)),
+                ('field_of_study', models.CharField(blank=True, max_length=150)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('skill_ids', models.JSONField(default=list)),
+                ('cert_skill_ids', models.JSONField(default=list)),
+                ('version', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:38
+
+import api.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE api_offer_fts USING fts5(
+        title, description, field_required, location, skills,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    # bm25 column weights: title, description, field_required, location, skills
+    "INSERT INTO api_offer_fts (api_offer_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 4.0, 2.0, 6.0)')",
+]
+
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE TABLE api_offer_fts (
+        rowid bigint PRIMARY KEY REFERENCES api_offer (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        title text NOT NULL,
+        description text NOT NULL,
+        field_required text NOT NULL,
+        location text NOT NULL,
+        skills text NOT NULL,
+        api_offer_fts tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', title), 'A')
+            || setweight(to_tsvector('simple', skills), 'A')
+            || setweight(to_tsvector('simple', field_required), 'B')
+            || setweight(to_tsvector('simple', location), 'C')
+            || setweight(to_tsvector('simple', description), 'D')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX api_offer_fts_document ON api_offer_fts USING GIN (api_offer_fts)",
+    "CREATE INDEX api_offer_fts_title_trgm ON api_offer_fts USING GIN (title gin_trgm_ops)",
+]
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ("sqlite", "postgresql"):
+        return
+    for statement in SQLITE_CREATE if vendor == "sqlite" else POSTGRES_CREATE:
+        schema_editor.execute(statement)
+
+    Offer = apps.get_model("api", "Offer")
+    rows = [
+        (
+            offer.id, offer.title, offer.description, offer.field_required, offer.location,
+            " ".join(skill.name for skill in offer.required_skills.all()),
+        )
+        for offer in Offer.objects.prefetch_related("required_skills").iterator(chunk_size=1000)
+    ]
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO api_offer_fts (rowid, title, description, field_required, location, skills) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS api_offer_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_feature_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSearchEntry',
+            fields=[
+                ('offer', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='api.offer')),
+                ('title', models.TextField()),
+                ('description', models.TextField()),
+                ('field_required', models.TextField()),
+                ('location', models.TextField()),
+                ('skills', models.TextField()),
+                ('document', api.models.FullTextField(db_column='api_offer_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'api_offer_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
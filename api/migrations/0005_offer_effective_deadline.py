@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:40
+
+from django.db import migrations, models
+from django.db.models import Case, F, Q, When
+
+
+def backfill_effective_deadline(apps, schema_editor):
+    Offer = apps.get_model("api", "Offer")
+    Offer.objects.filter(deadline__isnull=False).update(effective_deadline=Case(
+        When(Q(extended_deadline__gt=F("deadline")), then=F("extended_deadline")),
+        default=F("deadline"),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_offer_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='effective_deadline',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['is_closed', 'effective_deadline'], name='offer_open_idx'),
+        ),
+        migrations.RunPython(backfill_effective_deadline, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_offer_effective_deadline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobLease',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('owner', models.CharField(blank=True, max_length=200)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_job_lease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreSnapshot',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score_snapshot', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.IntegerField(default=0)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('taken_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+
+def backfill_rollups(apps, schema_editor):
+    ScoreHistory = apps.get_model("api", "ScoreHistory")
+    ScoreRollup = apps.get_model("api", "ScoreRollup")
+    for period, trunc in (("day", TruncDay), ("week", TruncWeek), ("month", TruncMonth)):
+        buckets = (
+            ScoreHistory.objects.annotate(bucket=trunc("created_at", output_field=DateField()))
+            .values("user_id", "bucket").annotate(points=Sum("points"), events=Count("pk"))
+        )
+        ScoreRollup.objects.bulk_create(
+            [ScoreRollup(period=period, **row) for row in buckets],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_score_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('events', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scorehistory',
+            index=models.Index(fields=['user', 'created_at', 'points'], name='scorehistory_user_time_idx'),
+        ),
+        migrations.AddField(
+            model_name='scorerollup',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_rollups', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='scorerollup',
+            constraint=models.UniqueConstraint(fields=('user', 'period', 'bucket'), name='score_rollup_unique'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
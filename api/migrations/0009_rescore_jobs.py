@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_score_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RescoreJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('done', models.PositiveIntegerField(default=0)),
+                ('last_application_id', models.BigIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rescore_jobs', to='api.offer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='rescore_job_queue_idx')],
+            },
+        ),
+    ]
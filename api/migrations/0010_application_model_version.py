@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_rescore_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='model_version',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+    ]
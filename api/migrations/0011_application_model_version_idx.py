@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_application_model_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['model_version'], name='application_model_version_idx'),
+        ),
+    ]
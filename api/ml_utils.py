@@ -1,44 +1,89 @@
 import joblib
+import json
 import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
 import numpy as np
 from django.conf import settings
 from django.utils import timezone
 
+from api.feature_store import ScoringContext
+from api.fit_cache import FitCache
+from api.scoring_batcher import MicroBatcher
+
 # ==========================
 # Load ML model & scaler
 # ==========================
 MODEL_PATH = os.path.join(settings.BASE_DIR, "ml_model.pkl")
 SCALER_PATH = os.path.join(settings.BASE_DIR, "scaler.pkl")
+MODEL_META_PATH = os.path.join(settings.BASE_DIR, "ml_model.json")  # written by api.retraining
 
 model = None
 scaler = None
+model_meta = {}
+
+
+def read_model_meta():
+    """Metadata of the published model (version, trained_at, ...); {} when none was written."""
+    try:
+        with open(MODEL_META_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def model_version():
+    """Version of the model loaded in this process, stored with every score it produces."""
+    if model is None:
+        return ""
+    return model_meta.get("version") or "unversioned"
+
+
+# base probabilities by quantized model inputs; flushed whenever the model is (re)loaded
+probability_cache = FitCache(settings.FIT_CACHE_SIZE, settings.FIT_CACHE_TTL)
 
-if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
-    import joblib
-    model = joblib.load(MODEL_PATH)
-    scaler = joblib.load(SCALER_PATH)
-else:
-    print("⚠️ Model not found yet — training required.")
+
+def load_model():
+    """(Re)load the published model, scaler and metadata from disk."""
+    global model, scaler, model_meta
+    if os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH):
+        model = joblib.load(MODEL_PATH)
+        scaler = joblib.load(SCALER_PATH)
+        model_meta = read_model_meta()
+    else:
+        model, scaler, model_meta = None, None, {}
+        print("⚠️ Model not found yet — training required.")
+    probability_cache.clear()
+
+
+load_model()
 
 # ==========================
 #  Feature extraction helpers
 # ==========================
+def skill_names(manager):
+    """Names of a skills relation; served from the prefetch cache when present."""
+    return {skill.name for skill in manager.all()}
+
 def compute_skill_match_ratio(profile, offer):
     """Calculate the % of required skills the candidate has."""
-    profile_skills = set(profile.skills.values_list("name", flat=True))
-    offer_skills = set(offer.required_skills.values_list("name", flat=True))
+    profile_skills = skill_names(profile.skills)
+    offer_skills = skill_names(offer.required_skills)
     if not offer_skills:
         return 1.0
     return len(profile_skills & offer_skills) / len(offer_skills)
 
 def compute_certification_match_ratio(profile, offer):
     """How many certifications match required skills."""
-    offer_skills = set(offer.required_skills.values_list("name", flat=True))
+    offer_skills = skill_names(offer.required_skills)
     matching_certs = 0
-    total_certs = profile.certifications.count()
+    certs = profile.certifications.all()
+    total_certs = len(certs)
 
-    for cert in profile.certifications.all():
-        cert_skills = set(cert.skills.values_list("name", flat=True))
+    for cert in certs:
+        cert_skills = skill_names(cert.skills)
         if cert_skills & offer_skills:
             matching_certs += 1
 
@@ -57,21 +102,6 @@ FEATURE_NAMES = [
     "location_match"
 ]
 import pandas as pd
-def build_feature_vector(profile, offer):
-    gpa = np.clip(float(profile.gpa or 0) / 4.0, 0, 1)
-    score = np.clip(float(profile.score or 0) / 400.0, 0, 1)
-    skill_match = compute_skill_match_ratio(profile, offer)
-    field_match = int((profile.field_of_study or "").strip() == (offer.field_required or "").strip())
-    matching_certs, cert_ratio, _ = compute_certification_match_ratio(profile, offer)
-
-    location_match = 0
-    if profile.university and offer.location:
-        if profile.university.city.strip().lower() == offer.location.strip().lower():
-            location_match = 1
-
-    data = [[gpa, score, skill_match, field_match, cert_ratio, location_match]]
-    X = pd.DataFrame(data, columns=FEATURE_NAMES)
-    return X
 
 # ==========================
 #  Extract features (for rule engine)
@@ -101,15 +131,6 @@ def extract_features(profile, offer):
         "deadline_passed": deadline_passed
     }
 
-# ==========================
-#  Base ML Prediction
-# ==========================
-def compute_base_fit(profile, offer):
-    X = build_feature_vector(profile, offer)
-    X_scaled = scaler.transform(X)
-    prob = model.predict_proba(X_scaled)[0][1]
-    return prob
-
 # ==========================
 #  Rule Engine
 # ==========================
@@ -158,8 +179,225 @@ def apply_rules(features, base_prob):
 # ==========================
 #  Final fit calculation
 # ==========================
-def predict_fit(profile, offer):
-    features = extract_features(profile, offer)
-    base_prob = compute_base_fit(profile, offer)
-    final_prob = apply_rules(features, base_prob)
-    return round(final_prob, 3)
+def predict_fit(profile, offer, context=None):
+    if profile.pk and offer.pk:
+        return predict_fit_many([(profile, offer)], context)[0]
+    # unsaved objects (e.g. behaviour tests) are not in the feature store
+    return score_features([extract_features(profile, offer)])[0]
+
+
+def model_inputs(features):
+    """Map rule-engine features to the model's normalized input row."""
+    return [
+        np.clip(features["gpa"] / 4.0, 0, 1),
+        np.clip(features["score"] / 400.0, 0, 1),
+        features["skill_match"],
+        features["field_match"],
+        features["cert_ratio"],
+        features["location_match"],
+    ]
+
+
+# Moving average of one predict_proba call per size bucket (row count's bit length), to tell whether
+# a call fits a budget: large background batches must not make single-row requests look slow.
+_call_seconds = {}
+_stats_lock = threading.Lock()
+SKIPPED_CALL_DECAY = 0.8  # a skipped call counts as a fast one, so a slow spell (e.g. a GC pause) wears off
+
+
+def _timing_bucket(n_rows):
+    """The bucket timing `n_rows`: its own, else the closest smaller one with a timing (None: none yet)."""
+    known = [b for b in _call_seconds if b <= n_rows.bit_length()]
+    return max(known) if known else None
+
+
+def expected_call_seconds(n_rows):
+    """Expected predict_proba time for `n_rows`: its bucket's average, else the closest smaller bucket's."""
+    with _stats_lock:
+        bucket = _timing_bucket(n_rows)
+        return 0.0 if bucket is None else _call_seconds[bucket]
+
+
+def _fits_budget(n_rows, timeout):
+    """
+    Whether a call on `n_rows` is expected to take at most `timeout` seconds.
+    Each "no" decays the average, so that once the model is fast again a
+    call gets through, is timed and resets the average.
+    """
+    with _stats_lock:
+        bucket = _timing_bucket(n_rows)
+        if bucket is None or _call_seconds[bucket] <= timeout:
+            return True
+        _call_seconds[bucket] *= SKIPPED_CALL_DECAY
+        return False
+
+
+def base_probabilities(features):
+    """Model probability of each feature dict, with a single predict_proba call."""
+    started = time.perf_counter()
+    X = pd.DataFrame([model_inputs(f) for f in features], columns=FEATURE_NAMES)
+    probs = model.predict_proba(scaler.transform(X))[:, 1]
+    elapsed = time.perf_counter() - started
+    bucket = len(features).bit_length()
+    with _stats_lock:
+        previous = _call_seconds.get(bucket)
+        _call_seconds[bucket] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+    return probs
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def microbatcher():
+    """The process-wide MicroBatcher in front of base_probabilities (SCORING_MICROBATCH)."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(
+                base_probabilities,
+                max_batch_size=settings.SCORING_MICROBATCH_MAX_ROWS,
+                max_wait=settings.SCORING_MICROBATCH_MAX_WAIT_MS / 1000,
+            )
+    return _batcher
+
+
+def model_probabilities(features, timeout=None):
+    """
+    base_probabilities(), merged with concurrent callers' rows when
+    micro-batching is on. None when it cannot be done within `timeout` seconds.
+    """
+    if timeout is not None and timeout <= 0:
+        return None
+    if settings.SCORING_MICROBATCH and len(features) < settings.SCORING_MICROBATCH_MAX_ROWS:
+        try:
+            return microbatcher().submit(features).result(timeout)
+        except FutureTimeout:
+            return None
+    if timeout is not None and not _fits_budget(len(features), timeout):
+        return None
+    return base_probabilities(features)
+
+
+def feature_key(features):
+    """Quantized model inputs: feature dicts with the same key get the same base probability."""
+    return (
+        round(features["gpa"], 2),
+        int(features["score"]),
+        round(features["skill_match"], 3),
+        int(features["field_match"]),
+        round(features["cert_ratio"], 3),
+        int(features["location_match"]),
+    )
+
+
+def cached_probabilities(features, timeout=None):
+    """
+    model_probabilities() through probability_cache: the model only sees
+    unseen input vectors, once each. None when those miss the timeout.
+    """
+    if not settings.FIT_CACHE_SIZE:
+        return model_probabilities(features, timeout)
+    version = model_version()
+    keys = [(version, feature_key(f)) for f in features]
+    known = probability_cache.get_many(set(keys))
+    missing = {}  # key -> first feature dict with it
+    for key, f in zip(keys, features):
+        if key not in known:
+            missing.setdefault(key, f)
+    if missing:
+        probs = model_probabilities(list(missing.values()), timeout)
+        if probs is None:
+            return None
+        computed = dict(zip(missing, (float(p) for p in probs)))
+        probability_cache.set_many(computed)
+        known.update(computed)
+    probability_cache.record(hits=len(keys) - len(missing), misses=len(missing))
+    return [known[key] for key in keys]
+
+
+def score_features(features, context=None):
+    """
+    Final fit of each feature dict, with a single model call for the inputs
+    not cached yet. Without a model, or past the context's budget, the fits
+    are rules-only estimates and the context is marked as `estimated`.
+    """
+    if not features:
+        return []
+    probs = None
+    if model is not None:
+        probs = cached_probabilities(features, context.remaining() if context is not None else None)
+    if probs is None:
+        if context is not None:
+            context.estimated = True
+        return estimate_fits(features)
+    return [round(float(apply_rules(f, p)), 3) for f, p in zip(features, probs)]
+
+
+def predict_fit_many(pairs, context=None):
+    """
+    Score many saved (profile, offer) pairs: two feature-store reads, one model
+    call. Pass a ScoringContext to reuse rows already read in this request.
+    """
+    if not pairs:
+        return []
+    context = context or ScoringContext()
+    return score_features(context.features(pairs), context)
+
+
+def predict_fit_ids(id_pairs, context=None):
+    """predict_fit_many() for (profile_id, offer_id) pairs, without loading either row."""
+    if not id_pairs:
+        return []
+    context = context or ScoringContext()
+    return score_features(context.features_for_ids(id_pairs), context)
+
+
+# ==========================
+#  Degraded scoring
+# ==========================
+# Stored as Application.model_version for estimated fits, which the
+# fit_estimates scheduler job recomputes once the model answers again.
+ESTIMATE_VERSION = "rules-estimate"
+
+# Linear stand-in for the forest over model_inputs(), least-squares fitted to
+# its probabilities: the forest mostly follows the skill match.
+PROXY_WEIGHTS = np.array([0.0, 0.0, 0.19, 0.0, 0.0, 0.0])
+PROXY_BIAS = 0.36
+
+estimated_rows = 0
+
+
+def apply_rules_many(columns, probs):
+    """apply_rules() over arrays: `columns` maps each feature name to an array."""
+    gpa, skill_match, cert_count = columns["gpa"], columns["skill_match"], columns["cert_count"]
+    prob = probs + np.select([gpa >= 3.5, gpa >= 3.0], [0.1, 0.05], 0.0)
+    prob += np.select([skill_match == 1.0, skill_match >= 0.7], [0.15, 0.1], 0.0)
+    prob += columns["score"] / 400.0 * 0.15
+    prob += np.where(columns["field_match"] != 0, 0.20, 0.0)
+    prob += np.where(columns["location_match"] != 0, 0.05, 0.0)
+    prob += np.select([cert_count >= 5, cert_count >= 3, cert_count >= 1], [0.04, 0.02, 0.01], 0.0)
+    prob = np.where(columns["deadline_passed"] != 0, 0.0, prob)
+    return np.clip(prob, 0.05, 0.98)
+
+
+def estimate_fits(features):
+    """Rules-only fits: apply_rules over the linear proxy, vectorized, no model needed."""
+    global estimated_rows
+    with _stats_lock:
+        estimated_rows += len(features)
+    columns = {name: np.array([f[name] for f in features], dtype=float) for name in features[0]}
+    X = np.column_stack([
+        np.clip(columns["gpa"] / 4.0, 0, 1),
+        np.clip(columns["score"] / 400.0, 0, 1),
+        columns["skill_match"],
+        columns["field_match"],
+        columns["cert_ratio"],
+        columns["location_match"],
+    ])
+    return [round(float(p), 3) for p in apply_rules_many(columns, X @ PROXY_WEIGHTS + PROXY_BIAS)]
+
+
+def scored_version(context):
+    """What to store as Application.model_version for fits computed in this context."""
+    return ESTIMATE_VERSION if context.estimated else model_version()
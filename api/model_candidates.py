@@ -0,0 +1,50 @@
+# api/model_candidates.py
+"""
+Search space for api.model_search. Kept free of Django imports: joblib worker
+processes import this module to run fit_and_score.
+"""
+import itertools
+import random
+import time
+
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+# Every candidate supports warm_start + n_estimators, so retrain_model can keep growing it.
+SEARCH_SPACE = {
+    "random_forest": (
+        RandomForestClassifier(random_state=42, class_weight="balanced_subsample", n_jobs=1),
+        {"n_estimators": [50, 100, 200], "max_depth": [5, 8, None], "min_samples_leaf": [1, 5]},
+    ),
+    "extra_trees": (
+        ExtraTreesClassifier(random_state=42, class_weight="balanced_subsample", n_jobs=1),
+        {"n_estimators": [100, 200], "max_depth": [5, 8, None], "min_samples_leaf": [1, 5]},
+    ),
+    "gradient_boosting": (
+        GradientBoostingClassifier(random_state=42),
+        {"n_estimators": [50, 100, 200], "max_depth": [2, 3], "learning_rate": [0.05, 0.1]},
+    ),
+}
+
+
+def candidates(sample=None, seed=42):
+    """Grid of (family, params); a random subset of `sample` candidates when given."""
+    grid = []
+    for family, (_, space) in SEARCH_SPACE.items():
+        keys = list(space)
+        for values in itertools.product(*(space[k] for k in keys)):
+            grid.append((family, dict(zip(keys, values))))
+    if sample and sample < len(grid):
+        grid = random.Random(seed).sample(grid, sample)
+    return grid
+
+
+def fit_and_score(family, params, X_train, y_train, X_test, y_test):
+    """Fit one candidate and return (model, holdout ROC-AUC, fit seconds)."""
+    model = clone(SEARCH_SPACE[family][0]).set_params(**params)
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    auc = float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]))
+    return model, auc, fit_seconds
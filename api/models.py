@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
@@ -82,10 +83,58 @@ class University(models.Model):
         return self.name
 
 
+# =========================================================
+# CHANGE TRACKING
+# =========================================================
+class ChangeTrackingMixin:
+    """
+    Field-level change tracking: the values loaded from the database are kept,
+    and save() records which fields it actually changed in `saved_changes`
+    (all of them for a new row), for the post_save receivers to look at.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded = dict(zip(field_names, values))
+        return instance
+
+    def changed_fields(self):
+        loaded = getattr(self, "_loaded", None)
+        fields = self._meta.concrete_fields
+        if loaded is None or self._state.adding:
+            return {f.name for f in fields}
+        # deferred fields were never read, so they are not knowingly changed
+        return {f.name for f in fields if f.attname in loaded and self._python_value(f) != loaded[f.attname]}
+
+    def _python_value(self, field):
+        value = getattr(self, field.attname)
+        try:
+            return field.to_python(value)  # "3.50" and Decimal("3.5") are the same GPA
+        except ValidationError:
+            return value
+
+    def _mark_loaded(self, fields):
+        self._loaded = {**getattr(self, "_loaded", {}), **{f.attname: self._python_value(f) for f in fields}}
+
+    def save(self, *args, update_fields=None, **kwargs):
+        fields = self._meta.concrete_fields
+        if update_fields is not None:
+            fields = [self._meta.get_field(name) for name in update_fields]
+        self.saved_changes = self.changed_fields() & {f.name for f in fields}
+        super().save(*args, update_fields=update_fields, **kwargs)
+        self._mark_loaded(fields)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._mark_loaded([f for f in self._meta.concrete_fields if f.attname not in deferred])
+
+
 # =========================================================
 # PROFILE
 # =========================================================
-class Profile(models.Model):
+class Profile(ChangeTrackingMixin, models.Model):
     ROLE_CHOICES = [
         ('student', 'Student'),
         ('recruiter', 'Recruiter'),
@@ -104,6 +153,7 @@ class Profile(models.Model):
     skills = models.ManyToManyField(Skill, blank=True, related_name='profiles')
     certifications = models.ManyToManyField(Certification, blank=True, related_name='profiles')
     company = models.ForeignKey("api.Company", on_delete=models.SET_NULL, null=True, blank=True,related_name='employees')
+
     def __str__(self):
         return f"{self.user.email} ({self.role})"
 
@@ -122,7 +172,21 @@ class Company(models.Model):
 # =========================================================
 # OFFER
 # =========================================================
-class Offer(models.Model):
+class OfferQuerySet(models.QuerySet):
+    def open(self, today=None):
+        """Offers still accepting applications, filtered in SQL on effective_deadline."""
+        today = today or timezone.now().date()
+        return self.filter(is_closed=False).filter(
+            models.Q(effective_deadline__isnull=True) | models.Q(effective_deadline__gte=today)
+        )
+
+    def expired(self, today=None):
+        """Offers past their effective deadline that are not closed yet."""
+        today = today or timezone.now().date()
+        return self.filter(is_closed=False, effective_deadline__lt=today)
+
+
+class Offer(ChangeTrackingMixin, models.Model):
     LEVEL_CHOICES = [
         ('intern', 'Internship'),
         ('junior', 'Junior'),
@@ -140,13 +204,37 @@ class Offer(models.Model):
     is_closed = models.BooleanField(default=False)
     closed_at = models.DateTimeField(null=True, blank=True)
     extended_deadline = models.DateField(null=True, blank=True)
+    # last day applications are accepted: the later of deadline and extended_deadline, null = never expires
+    effective_deadline = models.DateField(null=True, blank=True, editable=False)
     created_by = models.ForeignKey("api.User", on_delete=models.SET_NULL, null=True, related_name="offers_created")
     verified_by_university = models.ForeignKey("api.University", on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = OfferQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["is_closed", "effective_deadline"], name="offer_open_idx")]
+
     def __str__(self):
         return f"{self.title} @ {self.company.name}"
 
+    @staticmethod
+    def compute_effective_deadline(deadline, extended_deadline):
+        if deadline is None:
+            return None
+        return max(deadline, extended_deadline) if extended_deadline else deadline
+
+    def save(self, *args, **kwargs):
+        self.effective_deadline = self.compute_effective_deadline(self.deadline, self.extended_deadline)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"deadline", "extended_deadline"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "effective_deadline"}
+        super().save(*args, **kwargs)
+
+    def is_expired(self, today=None):
+        today = today or timezone.now().date()
+        return self.effective_deadline is not None and self.effective_deadline < today
+
 
 # =========================================================
 # APPLICATION
@@ -162,13 +250,18 @@ class Application(models.Model):
     offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name="applications")
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     predicted_fit = models.FloatField(null=True, blank=True)
+    model_version = models.CharField(max_length=40, blank=True)  # ml_utils.model_version() behind predicted_fit
     final_rank = models.IntegerField(null=True, blank=True)
     is_fake = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("user", "offer")
-        indexes = [models.Index(fields=["user", "offer"])]
+        indexes = [
+            models.Index(fields=["user", "offer"]),
+            models.Index(fields=["model_version"], name="application_model_version_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} -> {self.offer.title}"
@@ -202,10 +295,162 @@ class ScoreHistory(models.Model):
     points = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # covers per-user time ranges and their sums (history pages, rollup rebuilds)
+            models.Index(fields=["user", "created_at", "points"], name="scorehistory_user_time_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.email} +{self.points} ({self.reason})"
 
 
+class ScoreRollup(models.Model):
+    """Points a user earned in one day / week / month bucket (see api/score_analytics.py)."""
+    PERIOD_CHOICES = [("day", "Day"), ("week", "Week"), ("month", "Month")]
+
+    user = models.ForeignKey("api.User", on_delete=models.CASCADE, related_name="score_rollups")
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    bucket = models.DateField()  # first day of the bucket
+    points = models.IntegerField(default=0)
+    events = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "period", "bucket"], name="score_rollup_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.period} {self.bucket}: {self.points}"
+
+
+class ScoreSnapshot(models.Model):
+    """A user's ScoreHistory total up to last_event_id (see api/score_ledger.py)."""
+    user = models.OneToOneField("api.User", on_delete=models.CASCADE, primary_key=True, related_name="score_snapshot")
+    total = models.IntegerField(default=0)
+    last_event_id = models.BigIntegerField(default=0)
+    taken_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total} up to event {self.last_event_id}"
+
+
+# =========================================================
+# FEATURE STORE (derived scoring inputs, see api/feature_store.py)
+# =========================================================
+class ProfileFeatures(models.Model):
+    profile = models.OneToOneField("api.Profile", on_delete=models.CASCADE, primary_key=True, related_name="features")
+    gpa = models.FloatField(default=0)
+    score = models.IntegerField(default=0)
+    field_of_study = models.CharField(max_length=150, blank=True)
+    city = models.CharField(max_length=100, null=True, blank=True)  # lowercased; null = no university
+    skill_ids = models.JSONField(default=list)
+    cert_skill_ids = models.JSONField(default=list)  # one list of skill ids per certification
+    version = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features of profile {self.profile_id} (v{self.version})"
+
+
+class OfferFeatures(models.Model):
+    offer = models.OneToOneField("api.Offer", on_delete=models.CASCADE, primary_key=True, related_name="features")
+    field_required = models.CharField(max_length=150, blank=True)
+    location = models.CharField(max_length=150, blank=True)  # lowercased
+    deadline = models.DateField(null=True, blank=True)
+    skill_ids = models.JSONField(default=list)
+    version = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features of offer {self.offer_id} (v{self.version})"
+
+
+# =========================================================
+# OFFER SEARCH INDEX (see api/offer_search.py)
+# =========================================================
+class FullTextField(models.TextField):
+    """The searchable document of a full-text table; supports the `match` lookup."""
+
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} @@ to_tsquery('simple', {rhs})", lhs_params + rhs_params
+
+
+class OfferSearchEntry(models.Model):
+    """
+    One offer in the full-text index: an FTS5 table on SQLite, a table with a
+    weighted tsvector column on PostgreSQL. Created by migration 0004, written
+    by api.offer_search (never through this model).
+    """
+    offer = models.OneToOneField(
+        "api.Offer", on_delete=models.DO_NOTHING, primary_key=True, db_column="rowid", related_name="search_entry"
+    )
+    title = models.TextField()
+    description = models.TextField()
+    field_required = models.TextField()
+    location = models.TextField()
+    skills = models.TextField()
+    document = FullTextField(db_column="api_offer_fts")  # FTS5 hidden column / tsvector
+    rank = models.FloatField()  # FTS5 only: bm25 with the column weights set at install
+
+    class Meta:
+        managed = False
+        db_table = "api_offer_fts"
+
+
+# =========================================================
+# SCHEDULER (see api/scheduler.py)
+# =========================================================
+class JobLease(models.Model):
+    """Which scheduler process may run a job right now, and when it last ran."""
+    name = models.CharField(max_length=100, primary_key=True)
+    owner = models.CharField(max_length=200, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} held by {self.owner or 'nobody'} until {self.expires_at}"
+
+
+class RescoreJob(models.Model):
+    """Recomputation of one offer's application fits after a scoring field changed (api.rescoring)."""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    offer = models.ForeignKey("api.Offer", on_delete=models.CASCADE, related_name="rescore_jobs")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    # applications are rescored in pk order; a resumed job starts after this one
+    last_application_id = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"], name="rescore_job_queue_idx")]
+
+    def __str__(self):
+        return f"Rescore offer {self.offer_id}: {self.status} ({self.done}/{self.total})"
+
+
 class InternshipDemand(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -0,0 +1,94 @@
+# api/offer_lifecycle.py
+"""
+Closing offers, by hand (OfferViewSet.close) or once their effective deadline
+has passed (the "offer_lifecycle" job of api.scheduler, or
+python manage.py close_expired_offers).
+
+Closing an offer freezes every application's final_rank, pays the
+close-time bonus to the top 10 and the after-deadline rank points
+(gamification.rank_bonus) to everyone. Offers are processed in batches, one
+transaction per batch, with all points of a batch applied in bulk.
+Points are paid once per application: closing a closed offer is a no-op, and
+applications still holding a final_rank from before a reopen are not paid again.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from api.gamification import rank_bonus, ranked_applications
+from api.models import Application, Offer
+from api.offer_stats import company_offers_changed
+from api.score_ledger import award_points
+
+CLOSE_BONUS = {1: 15, 2: 13, 3: 11, 4: 9, 5: 7, 6: 5, 7: 4, 8: 3, 9: 2, 10: 1}
+
+
+def close_bonus_awards(offer, apps, paid=()):
+    """Close-time bonus of the top 10 (not accepted, not fake) of `apps`, best first; `paid` pks are skipped."""
+    return [
+        (app.user_id, CLOSE_BONUS[rank], f"Top {rank} in offer {offer.title} (Bonus)")
+        for rank, app in enumerate(apps[:10], start=1)
+        if app.status != 'accepted' and not app.is_fake and app.pk not in paid
+    ]
+
+
+def close_offer(offer, now=None):
+    """
+    Close one offer by hand, exactly as the expiry job would (final ranks,
+    rank and close points). Returns False, paying nothing, if it was closed already.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # the lock waits out a concurrent close, which is then seen here
+        is_closed = Offer.objects.select_for_update().filter(pk=offer.pk).values_list("is_closed", flat=True).first()
+        if is_closed is None or is_closed:
+            return False
+        _close_batch([offer], now)
+    offer.is_closed, offer.closed_at = True, now
+    return True
+
+
+def _close_batch(offers, now):
+    ranked = ranked_applications([offer.id for offer in offers])
+    Offer.objects.filter(pk__in=[offer.id for offer in offers]).update(is_closed=True, closed_at=now)
+
+    frozen, awards = [], []
+    for offer in offers:
+        apps = ranked.get(offer.id, [])
+        # applications ranked by an earlier close (before a reopen) were paid then
+        paid = {app.pk for app in apps if app.final_rank is not None}
+        awards += close_bonus_awards(offer, apps, paid)
+        for rank, app in enumerate(apps, start=1):
+            if app.pk not in paid:
+                awards.append((app.user_id, rank_bonus(rank), f"Rank {rank} in {offer.title}"))
+            app.final_rank = rank
+        frozen += apps
+
+    Application.objects.bulk_update(frozen, ["final_rank"], batch_size=settings.BULK_BATCH_SIZE)
+    award_points(awards)
+    company_offers_changed({offer.company_id for offer in offers})
+
+
+def close_expired_offers(now=None, batch_size=None, heartbeat=None):
+    """
+    Close every open offer past its effective deadline; returns the closed
+    offer ids. `heartbeat()` runs after each batch; returning False stops
+    early (e.g. when the scheduler lease was lost).
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.OFFER_LIFECYCLE_BATCH_SIZE
+    closed = []
+    while True:
+        with transaction.atomic():
+            # rows are locked until commit: a concurrent close or extension waits, then is re-checked
+            offers = list(
+                Offer.objects.select_for_update().expired(now.date())
+                .order_by("pk").only("id", "title", "company_id")[:batch_size]
+            )
+            if not offers:
+                break
+            _close_batch(offers, now)
+        closed += [offer.id for offer in offers]
+        if heartbeat is not None and heartbeat() is False:
+            break
+    return closed
@@ -0,0 +1,110 @@
+# api/offer_search.py
+"""
+Full-text search over offers.
+
+The index (api_offer_fts, see OfferSearchEntry) holds title, description,
+field_required, location and the required skill names of every offer. On
+SQLite it is an FTS5 table ranked with bm25; on PostgreSQL a weighted
+tsvector column with a GIN index, plus a trigram index on titles used as a
+typo-tolerant fallback. Rows are rewritten by the signals in api/signals.py
+whenever an offer, its skills or a skill name changes.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import F, FloatField
+from django.db.models.expressions import RawSQL
+
+from api.models import Offer
+
+INDEX_TABLE = "api_offer_fts"
+MIN_TRIGRAM_QUERY = 3
+
+
+def _supported():
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+# =========================
+# 💾 INDEXING
+# =========================
+def index_offers(offer_ids):
+    """(Re)write the index rows of these offers; ids that no longer exist are dropped."""
+    ids = list(offer_ids)
+    if not ids or not _supported():
+        return
+    offers = Offer.objects.filter(pk__in=ids).prefetch_related("required_skills")
+    rows = [
+        (
+            offer.id, offer.title, offer.description, offer.field_required, offer.location,
+            " ".join(skill.name for skill in offer.required_skills.all()),
+        )
+        for offer in offers
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {INDEX_TABLE} WHERE rowid IN ({placeholders})", chunk)
+        cursor.executemany(
+            f"INSERT INTO {INDEX_TABLE} (rowid, title, description, field_required, location, skills) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def rebuild_index(batch_size=1000):
+    """Reindex every offer; returns how many were indexed."""
+    if not _supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {INDEX_TABLE}")
+    ids = list(Offer.objects.order_by("pk").values_list("pk", flat=True))
+    for start in range(0, len(ids), batch_size):
+        index_offers(ids[start:start + batch_size])
+    return len(ids)
+
+
+# =========================
+# 🔎 QUERYING
+# =========================
+def build_query(text):
+    """
+    Backend query for free text: every word must match, as a prefix
+    ("pyth dev" finds "Python developer"). Empty when there is no word.
+    """
+    words = re.findall(r"\w+", text or "")
+    if connection.vendor == "postgresql":
+        return " & ".join(f"{word.lower()}:*" for word in words)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_offers(text, queryset=None):
+    """
+    Offers matching `text`, annotated with `search_rank` (higher is better)
+    and ordered best first. Filters and pagination go on the returned queryset.
+    """
+    queryset = Offer.objects.all() if queryset is None else queryset
+    query = build_query(text)
+    if not query or not _supported():
+        return queryset.none()
+
+    if connection.vendor == "sqlite":
+        matches = queryset.filter(search_entry__document__match=query).annotate(
+            search_rank=-F("search_entry__rank"),  # bm25: lower is better
+        )
+    else:
+        rank = RawSQL(
+            f'ts_rank("{INDEX_TABLE}"."{INDEX_TABLE}", to_tsquery(\'simple\', %s))', [query],
+            output_field=FloatField(),
+        )
+        matches = queryset.filter(search_entry__document__match=query).annotate(search_rank=rank)
+        if len(text.strip()) >= MIN_TRIGRAM_QUERY and not matches.exists():
+            # nothing matched word prefixes: fall back to fuzzy title similarity
+            similarity = RawSQL(f'similarity("{INDEX_TABLE}"."title", %s)', [text], output_field=FloatField())
+            matches = (
+                queryset.filter(search_entry__isnull=False)
+                .extra(where=[f'"{INDEX_TABLE}"."title" %% %s'], params=[text])
+                .annotate(search_rank=similarity)
+            )
+    return matches.order_by("-search_rank", "-created_at", "-pk")
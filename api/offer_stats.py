@@ -0,0 +1,97 @@
+# api/offer_stats.py
+"""
+A company's offers with their applicant statistics (OfferViewSet.my_company).
+
+Counts by status, fake count and mean / max predicted fit are aggregated in
+SQL over one join. Rendered pages are cached per company under a version
+number; any write to the company's offers or applications bumps the version
+once the transaction commits, so stale pages are simply never read again.
+Writers run in other processes too (scheduler, management commands), so the
+cache must be shared: with OFFER_STATS_CACHE_SECONDS = 0, the default without
+CACHE_REDIS_URL, pages are built on every request.
+Writes that skip model signals (bulk_create, .update(), bulk_update) call
+offers_changed / company_offers_changed themselves.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Q
+
+from api.models import Application, Offer
+
+
+def company_offers(company_id):
+    """The company's offers, newest first, annotated with applicant statistics."""
+    return (
+        Offer.objects.filter(company_id=company_id)
+        .select_related("company")
+        .prefetch_related("required_skills")
+        .annotate(
+            applicants=Count("applications"),
+            pending=Count("applications", filter=Q(applications__status="pending")),
+            accepted=Count("applications", filter=Q(applications__status="accepted")),
+            rejected=Count("applications", filter=Q(applications__status="rejected")),
+            fakes=Count("applications", filter=Q(applications__is_fake=True)),
+            mean_fit=Avg("applications__predicted_fit"),
+            max_fit=Max("applications__predicted_fit"),
+        )
+        .order_by("-created_at", "-pk")
+    )
+
+
+def company_totals(company_id, today):
+    """Company-wide figures for the offer list header."""
+    offers = Offer.objects.filter(company_id=company_id).aggregate(
+        offers=Count("pk"), open=Count("pk", filter=Q(is_closed=False)),
+    )
+    apps = Application.objects.filter(offer__company_id=company_id).aggregate(
+        applicants=Count("pk"), today=Count("pk", filter=Q(created_at__date=today)),
+    )
+    return {**offers, **apps}
+
+
+# =========================
+# 🧊 CACHE
+# =========================
+def _version_key(company_id):
+    return f"offer_stats:{company_id}:version"
+
+
+def cache_key(company_id, *parts):
+    version = cache.get(_version_key(company_id), 0)
+    return ":".join(str(part) for part in ("offer_stats", company_id, version, *parts))
+
+
+def cached(company_id, parts, build):
+    """build() once per company version and `parts` (e.g. page, page size)."""
+    if not settings.OFFER_STATS_CACHE_SECONDS:
+        return build()
+    key = cache_key(company_id, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, settings.OFFER_STATS_CACHE_SECONDS)
+    return value
+
+
+def _bump(company_ids):
+    for company_id in company_ids:
+        key = _version_key(company_id)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:  # evicted in between
+            cache.set(key, 1, None)
+
+
+def company_offers_changed(company_ids):
+    company_ids = {pk for pk in company_ids if pk is not None}
+    if company_ids:
+        transaction.on_commit(lambda: _bump(company_ids))
+
+
+def offers_changed(offer_ids):
+    """Invalidate the cached lists of the companies owning these offers."""
+    offer_ids = set(offer_ids)
+    if offer_ids:
+        company_offers_changed(Offer.objects.filter(pk__in=offer_ids).values_list("company_id", flat=True).distinct())
@@ -0,0 +1,118 @@
+# api/renderers.py
+"""
+Response renderers and request parsers (REST_FRAMEWORK defaults).
+
+ORJSONRenderer / ORJSONParser replace DRF's json-module ones: orjson writes
+datetimes, dates, UUIDs and numpy values in C, and everything else goes
+through `encode_default`, which mirrors DRF's JSONEncoder (Decimals as
+numbers, lazy strings, querysets, ...), so the output is the same as before.
+MessagePackRenderer / MessagePackParser serve application/msgpack to clients
+asking for it in Accept / Content-Type; dates and datetimes are ISO strings
+there too, so switching formats changes nothing else for a client.
+"""
+import datetime
+import decimal
+import uuid
+
+import msgpack
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _datetime_string(value):
+    representation = value.isoformat()
+    return representation[:-6] + "Z" if representation.endswith("+00:00") else representation
+
+
+def encode_default(obj):
+    """Values orjson / msgpack do not handle themselves, as DRF's JSONEncoder would write them."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.datetime):
+        return _datetime_string(obj)
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()  # numpy values orjson was not asked to handle, pandas
+    if hasattr(obj, "__getitem__") and hasattr(obj, "keys"):
+        return dict(obj)
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+# =========================
+# 🧾 JSON (orjson)
+# =========================
+class ORJSONRenderer(BaseRenderer):
+    media_type = "application/json"
+    format = "json"
+    charset = None  # always UTF-8
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        options = ORJSON_OPTIONS
+        if self._indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=options)
+
+    @staticmethod
+    def _indent(accepted_media_type, renderer_context):
+        # ?format=json in a browser / Accept: application/json; indent=4, like DRF
+        if accepted_media_type and "indent=" in accepted_media_type:
+            return True
+        return bool(renderer_context.get("indent"))
+
+
+class ORJSONParser(BaseParser):
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+# =========================
+# 📦 MESSAGEPACK
+# =========================
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, use_bin_type=True, datetime=False)
+
+
+class MessagePackParser(BaseParser):
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except (ValueError, TypeError) as exc:  # malformed, trailing data, unhashable keys
+            raise ParseError(f"MessagePack parse error - {exc}")
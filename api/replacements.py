@@ -0,0 +1,55 @@
+# api/replacements.py
+"""
+Replacing accepted candidates found to be fake (mark_fake, negative feedback).
+
+One transaction per call: the offer row is locked so replacements for the
+same offer run one after another, the fakes are rejected with a single
+UPDATE (a concurrent call finds nothing left to reject), and the best pending
+candidates are locked before being promoted. Promoted students are notified
+on their "user_<id>" channel group once the transaction commits.
+"""
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from api.models import Application, Offer
+from api.offer_stats import offers_changed
+
+
+def user_group(user_id):
+    return f"user_{user_id}"
+
+
+def _notify_promoted(offer_id, promoted):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    send = async_to_sync(channel_layer.group_send)
+    for app_id, user_id in promoted:
+        send(user_group(user_id), {"type": "application_promoted", "application": app_id, "offer": offer_id})
+
+
+def replace_fake_candidates(offer_id):
+    """Reject the offer's accepted fakes and accept as many top pending candidates; returns how many fakes."""
+    now = timezone.now()
+    with transaction.atomic():
+        list(Offer.objects.select_for_update().filter(pk=offer_id).values_list("pk"))
+        rejected = (
+            Application.objects.filter(offer_id=offer_id, status="accepted", is_fake=True)
+            .update(status="rejected", updated_at=now)
+        )
+        if not rejected:
+            return 0
+
+        promoted = list(
+            Application.objects.select_for_update()
+            .filter(offer_id=offer_id, status="pending", is_fake=False)
+            .order_by(F("predicted_fit").desc(nulls_last=True), "pk")
+            .values_list("pk", "user_id")[:rejected]
+        )
+        Application.objects.filter(pk__in=[pk for pk, _ in promoted]).update(status="accepted", updated_at=now)
+        offers_changed([offer_id])
+        transaction.on_commit(lambda: _notify_promoted(offer_id, promoted))
+    return rejected
@@ -0,0 +1,206 @@
+# api/rescoring.py
+"""
+Keeping Application.predicted_fit in step with the scoring inputs.
+
+A saved profile only rescores its applications when one of its stored
+features moved (feature_store.PROFILE_FEATURE_SOURCES); ledger score changes
+rescore every touched student in one batch once the transaction commits.
+Fits are computed from feature-store rows by id, so no profile or offer row
+is loaded: one application query, two feature reads, one model call and one
+bulk_update per batch.
+
+An offer can have thousands of applicants, so editing its scoring fields
+(feature_store.OFFER_FEATURE_SOURCES) does not rescore in the request: it
+queues a RescoreJob once the transaction commits. Jobs are worked through in
+chunks of OFFER_RESCORE_CHUNK_SIZE applications, one transaction each, with
+their progress stored on the job (GET /api/offers/<id>/rescore-status/). A
+worker thread picks them up right away when OFFER_RESCORE_IN_BACKGROUND is
+set; the scheduler's offer_rescoring job sweeps up whatever is left queued,
+and resumes jobs whose worker died, from their last chunk.
+"""
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.bulk import keyset_chunks
+from api.feature_store import ScoringContext
+from api.ml_utils import ESTIMATE_VERSION, model_version, predict_fit_ids, scored_version
+from api.models import Application, RescoreJob
+from api.offer_stats import offers_changed
+
+SCORE_FIELDS = ["predicted_fit", "model_version"]
+
+
+def _score(apps, context=None):
+    """Set predicted_fit on applications annotated with profile_id; returns the scored ones."""
+    apps = [app for app in apps if app.profile_id is not None]
+    context = context or ScoringContext()
+    fits = predict_fit_ids([(app.profile_id, app.offer_id) for app in apps], context)
+    version = scored_version(context)
+    for app, fit in zip(apps, fits):
+        app.predicted_fit, app.model_version = fit, version
+    return apps
+
+
+def scoring_rows(**filters):
+    return Application.objects.filter(**filters).annotate(profile_id=F("user__profile__id")).only("id", "offer_id")
+
+
+def rescore_users(user_ids):
+    """Recompute the fit of every application of these students; returns how many."""
+    apps = _score(scoring_rows(user_id__in=list(user_ids)))
+    Application.objects.bulk_update(apps, SCORE_FIELDS, batch_size=settings.BULK_BATCH_SIZE)
+    offers_changed({app.offer_id for app in apps})
+    return len(apps)
+
+
+def rescore_users_on_commit(user_ids):
+    user_ids = list(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: rescore_users(user_ids))
+
+
+# =========================
+# 📋 OFFER RESCORING JOBS
+# =========================
+def enqueue_offer_rescore(offer_ids):
+    """Queue a rescore of these offers' applications once the transaction commits."""
+    offer_ids = set(offer_ids)
+    if offer_ids:
+        transaction.on_commit(lambda: _enqueue(offer_ids))
+
+
+def _enqueue(offer_ids):
+    # offers nobody applied to have nothing to rescore; a job still queued will
+    # read the new features anyway, while a running one may be past them already
+    with_apps = set(
+        Application.objects.filter(offer_id__in=offer_ids).values_list("offer_id", flat=True).distinct()
+    )
+    queued = set(RescoreJob.objects.filter(offer_id__in=with_apps, status="queued").values_list("offer_id", flat=True))
+    if not with_apps - queued:
+        return
+    RescoreJob.objects.bulk_create([RescoreJob(offer_id=offer_id) for offer_id in with_apps - queued])
+    if settings.OFFER_RESCORE_IN_BACKGROUND:
+        start_worker()
+
+
+def _claimable(now):
+    stale = now - timedelta(seconds=settings.OFFER_RESCORE_STALE_SECONDS)
+    return Q(status="queued") | Q(status="running", updated_at__lt=stale)
+
+
+def claim_job():
+    """Take the oldest queued (or abandoned) job with a conditional UPDATE; None when there is none."""
+    now = timezone.now()
+    candidates = RescoreJob.objects.filter(_claimable(now)).order_by("created_at", "pk").values_list("pk", flat=True)
+    for pk in candidates[:10]:
+        if RescoreJob.objects.filter(_claimable(now), pk=pk).update(status="running", updated_at=now):
+            return RescoreJob.objects.get(pk=pk)
+    return None
+
+
+def run_job(job, heartbeat=None):
+    """Rescore a claimed job's applications chunk by chunk; False if the heartbeat was lost."""
+    if not job.total:
+        job.total = Application.objects.filter(offer_id=job.offer_id).count()
+        RescoreJob.objects.filter(pk=job.pk).update(total=job.total)
+
+    apps = scoring_rows(offer_id=job.offer_id, pk__gt=job.last_application_id)
+    for chunk in keyset_chunks(apps, settings.OFFER_RESCORE_CHUNK_SIZE):
+        # a fresh context per chunk: the offer may be edited again while the job runs
+        scored = _score(chunk, ScoringContext())
+        job.done += len(chunk)
+        job.last_application_id = chunk[-1].pk
+        with transaction.atomic():
+            Application.objects.bulk_update(scored, SCORE_FIELDS, batch_size=settings.BULK_BATCH_SIZE)
+            RescoreJob.objects.filter(pk=job.pk).update(
+                done=job.done, last_application_id=job.last_application_id, updated_at=timezone.now()
+            )
+        if heartbeat is not None and not heartbeat():
+            return False
+
+    job.status, job.finished_at = "done", timezone.now()
+    RescoreJob.objects.filter(pk=job.pk).update(status="done", finished_at=job.finished_at, updated_at=job.finished_at)
+    offers_changed([job.offer_id])
+    return True
+
+
+def process_rescore_jobs(heartbeat=None):
+    """Run queued jobs until there are none left; returns {"jobs", "failed"}."""
+    ran = failed = 0
+    while job := claim_job():
+        try:
+            finished = run_job(job, heartbeat)
+        except Exception:
+            RescoreJob.objects.filter(pk=job.pk).update(
+                status="failed", error=traceback.format_exc(), finished_at=timezone.now()
+            )
+            failed += 1
+            continue
+        ran += 1
+        if not finished:
+            break  # the lease moved to another replica, which will resume the job
+    return {"jobs": ran, "failed": failed}
+
+
+def rescore_progress(offer_id):
+    """Status of the offer's latest rescoring job, for the recruiter page."""
+    job = RescoreJob.objects.filter(offer_id=offer_id).order_by("-created_at", "-pk").first()
+    if job is None:
+        return {"status": "idle", "total": 0, "done": 0, "progress": 1.0}
+    return {
+        "status": job.status,
+        "total": job.total,
+        "done": min(job.done, job.total),
+        "progress": 1.0 if job.status == "done" else round(min(job.done, job.total) / max(job.total, 1), 3),
+        "queued_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def rescore_estimates(heartbeat=None):
+    """Replace fits stored as rules-only estimates with model scores; returns how many."""
+    if not model_version():
+        return 0  # still no model: they would only be estimated again
+    rescored = 0
+    for chunk in keyset_chunks(scoring_rows(model_version=ESTIMATE_VERSION), settings.OFFER_RESCORE_CHUNK_SIZE):
+        scored = _score(chunk)
+        with transaction.atomic():
+            Application.objects.bulk_update(scored, SCORE_FIELDS, batch_size=settings.BULK_BATCH_SIZE)
+            offers_changed({app.offer_id for app in scored})
+        rescored += len(scored)
+        if heartbeat is not None and not heartbeat():
+            break
+    return rescored
+
+
+# =========================
+# 🧵 IN-PROCESS WORKER
+# =========================
+_worker_lock = threading.Lock()
+_worker = None
+_wakeup = threading.Event()
+
+
+def _work():
+    try:
+        while _wakeup.is_set():
+            _wakeup.clear()
+            process_rescore_jobs()
+    finally:
+        connection.close()
+
+
+def start_worker():
+    """Work through the queue on a daemon thread, so the edit request returns right away."""
+    global _worker
+    _wakeup.set()
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name="offer-rescoring", daemon=True)
+            _worker.start()
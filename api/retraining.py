@@ -0,0 +1,255 @@
+# api/retraining.py
+"""
+Incremental retraining of the fit model.
+
+Each run only extracts applications written since the previous run and merges
+them into a feature table cached on disk. The live forest then grows a few
+warm-started trees on that table; it is rebuilt from scratch (with the
+estimator picked by search_model, if any) on the first run, on --full, or once
+it reaches RETRAIN_MAX_TREES. Every model is kept as a
+versioned artifact and published over ml_model.pkl / scaler.pkl with atomic
+renames, so a crash never leaves a half-written model behind.
+"""
+import json
+import os
+import shutil
+import tempfile
+import warnings
+from datetime import datetime
+
+import joblib
+import pandas as pd
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from api.bulk import keyset_chunks
+from api import ml_utils
+from api.feature_store import combine_features, get_offer_features, get_profile_features
+from api.ml_utils import FEATURE_NAMES, model_inputs
+from api.models import Application
+
+LABELS = {"accepted": 1, "rejected": 0}
+
+
+def artifact_paths():
+    root = str(settings.ML_ARTIFACTS_DIR)
+    return {
+        "root": root,
+        "features": os.path.join(root, "feature_table.pkl"),
+        "state": os.path.join(root, "state.json"),
+        "models": os.path.join(root, "models"),
+        "template": os.path.join(root, "estimator_template.pkl"),
+    }
+
+
+# =========================
+# 💾 ATOMIC FILE HELPERS
+# =========================
+def atomic_write(path, write):
+    """Call write(tmp_path) then rename over `path`; readers never see partial files."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_json(path, data):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+    atomic_write(path, write)
+
+
+def read_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+# =========================
+# 📦 FEATURE TABLE
+# =========================
+def extract_features_since(since=None):
+    """
+    Features + labels of applications written after `since` (all when None),
+    or whose student's or offer's feature-store row changed since then.
+    Returns (labelled rows as a DataFrame indexed by application id, ids of
+    applications that are no longer labelled and must leave the table).
+    """
+    queryset = (
+        Application.objects
+        .annotate(profile_id=F("user__profile__id"))
+        .only("id", "status", "offer_id")
+    )
+    if since is not None:
+        queryset = queryset.filter(
+            Q(updated_at__gt=since)
+            | Q(user__profile__features__updated_at__gt=since)
+            | Q(offer__features__updated_at__gt=since)
+        )
+
+    rows, unlabelled = [], []
+    today = timezone.now().date()
+    for apps in keyset_chunks(queryset, settings.BULK_BATCH_SIZE):
+        profiles = get_profile_features({app.profile_id for app in apps if app.profile_id})
+        offers = get_offer_features({app.offer_id for app in apps})
+        for app in apps:
+            label = LABELS.get(app.status)
+            if app.profile_id is None or label is None:
+                unlabelled.append(app.id)
+                continue
+            features = combine_features(profiles[app.profile_id], offers[app.offer_id], today)
+            rows.append([app.id, *model_inputs(features), label])
+
+    table = pd.DataFrame(rows, columns=["application_id", *FEATURE_NAMES, "label"])
+    table = table.astype({"application_id": "int64", **dict.fromkeys(FEATURE_NAMES, "float64"), "label": "int64"})
+    return table.set_index("application_id"), unlabelled
+
+
+def refresh_feature_table(full=False):
+    """Merge changed applications (or features) into the cached table; returns (table, n_changed)."""
+    paths = artifact_paths()
+    state = read_json(paths["state"], {})
+    since = None if full or not os.path.exists(paths["features"]) else state.get("last_extracted_at")
+    started_at = timezone.now()
+
+    changed, unlabelled = extract_features_since(since and datetime.fromisoformat(since))
+    if since is None:
+        table = changed
+    else:
+        cached = pd.read_pickle(paths["features"])
+        stale = changed.index.union(pd.Index(unlabelled))
+        table = pd.concat([cached.drop(index=stale, errors="ignore"), changed])
+
+    atomic_write(paths["features"], table.to_pickle)
+    state["last_extracted_at"] = started_at.isoformat()
+    write_json(paths["state"], state)
+    return table, len(changed) + len(unlabelled)
+
+
+# =========================
+# 🌲 TRAINING
+# =========================
+def holdout_split(table):
+    """Stable holdout: every 5th application id is kept out of training."""
+    test_mask = table.index.to_series() % 5 == 0
+    return table[~test_mask], table[test_mask]
+
+
+def new_model():
+    """Unfitted estimator for a full rebuild: the one picked by search_model, else the default forest."""
+    template_path = artifact_paths()["template"]
+    if os.path.exists(template_path):
+        return clone(joblib.load(template_path))
+    return RandomForestClassifier(
+        n_estimators=settings.RETRAIN_BASE_TREES,
+        max_depth=5,
+        min_samples_split=10,
+        min_samples_leaf=5,
+        random_state=42,
+        class_weight="balanced_subsample",
+        n_jobs=-1,
+        warm_start=True,
+    )
+
+
+def _holdout_auc(model, scaler, test):
+    if test["label"].nunique() < 2:
+        return None
+    proba = model.predict_proba(scaler.transform(test[FEATURE_NAMES]))[:, 1]
+    return round(float(roc_auc_score(test["label"], proba)), 4)
+
+
+def new_version():
+    return timezone.now().strftime("%Y%m%dT%H%M%S%f")
+
+
+def publish_model(model, scaler, meta):
+    """Store a versioned artifact, swap it in as the live model and record it in the state."""
+    paths = artifact_paths()
+    version_dir = os.path.join(paths["models"], meta["version"])
+    os.makedirs(version_dir, exist_ok=True)
+    atomic_write(os.path.join(version_dir, "model.pkl"), lambda tmp: joblib.dump(model, tmp))
+    atomic_write(os.path.join(version_dir, "scaler.pkl"), lambda tmp: joblib.dump(scaler, tmp))
+    write_json(os.path.join(version_dir, "meta.json"), meta)
+
+    atomic_write(ml_utils.SCALER_PATH, lambda tmp: shutil.copyfile(os.path.join(version_dir, "scaler.pkl"), tmp))
+    atomic_write(ml_utils.MODEL_PATH, lambda tmp: shutil.copyfile(os.path.join(version_dir, "model.pkl"), tmp))
+    write_json(ml_utils.MODEL_META_PATH, meta)
+
+    state = read_json(paths["state"], {})
+    state.update(version=meta["version"], base_version=meta["base_version"])
+    write_json(paths["state"], state)
+
+    versions = sorted(os.listdir(paths["models"]))
+    for old in versions[:-settings.RETRAIN_KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(paths["models"], old), ignore_errors=True)
+
+
+def retrain(full=False, log=print):
+    """Run one retraining cycle; returns the published metadata or None."""
+    paths = artifact_paths()
+    state = read_json(paths["state"], {})
+    full = full or not state.get("version")
+
+    table, n_changed = refresh_feature_table(full=full)
+    log(f"📦 {n_changed} changed applications, {len(table)} labelled rows cached")
+
+    train, test = holdout_split(table)
+    if train["label"].nunique() < 2:
+        log("❌ Need both accepted and rejected applications to train.")
+        return None
+    if not full and n_changed == 0:
+        log("✅ Nothing changed since the last run.")
+        return None
+
+    if not full:
+        model = joblib.load(ml_utils.MODEL_PATH)
+        scaler = joblib.load(ml_utils.SCALER_PATH)
+        if model.n_estimators + settings.RETRAIN_WARM_TREES > settings.RETRAIN_MAX_TREES:
+            log("♻️ Model reached RETRAIN_MAX_TREES, rebuilding from scratch")
+            full = True
+
+    if full:
+        scaler = StandardScaler().fit(train[FEATURE_NAMES])
+        model = new_model()
+    else:
+        model.warm_start = True
+        model.n_estimators += settings.RETRAIN_WARM_TREES
+
+    with warnings.catch_warnings():
+        # sklearn warns about class_weight + warm_start because new trees may see a
+        # different sample; here every fit sees the whole cached table.
+        warnings.filterwarnings("ignore", message="class_weight presets", category=UserWarning)
+        model.fit(scaler.transform(train[FEATURE_NAMES]), train["label"])
+
+    version = new_version()
+    meta = {
+        "version": version,
+        "trained_at": timezone.now().isoformat(),
+        "mode": "full" if full else "warm_start",
+        "base_version": version if full else state.get("base_version"),
+        "n_estimators": model.n_estimators,
+        "n_train": len(train),
+        "n_test": len(test),
+        "holdout_roc_auc": _holdout_auc(model, scaler, test),
+        "feature_names": FEATURE_NAMES,
+    }
+    publish_model(model, scaler, meta)
+
+    log(f"💾 Published model {version} ({meta['mode']}, {model.n_estimators} trees, "
+        f"holdout ROC-AUC={meta['holdout_roc_auc']})")
+    return meta
@@ -1,6 +1,7 @@
 from django.urls import path
-from .consumers import OfferConsumer
+from .consumers import NotificationConsumer, OfferConsumer
 
 websocket_urlpatterns = [
     path("ws/offers/", OfferConsumer.as_asgi()),
+    path("ws/notifications/", NotificationConsumer.as_asgi()),
 ]
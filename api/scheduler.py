@@ -0,0 +1,142 @@
+# api/scheduler.py
+"""
+Periodic background jobs (python manage.py run_scheduler).
+
+Every replica may run the scheduler: a job only runs in the process holding
+its JobLease row. A lease is taken with a single conditional UPDATE (free or
+expired leases only), renewed between batches, and released when the job
+finishes; a crashed holder's lease simply expires after
+SCHEDULER_LEASE_SECONDS. Time always comes from the `clock` callable, so
+tests can drive the scheduler with a fake clock.
+"""
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api.models import JobLease
+from api.offer_lifecycle import close_expired_offers
+from api.rescoring import process_rescore_jobs, rescore_estimates
+from api.score_ledger import compact_ledger
+
+
+def default_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+# =========================
+# 🔒 LEASES
+# =========================
+class Lease:
+    def __init__(self, name, owner, clock=timezone.now, ttl=None):
+        self.name = name
+        self.owner = owner
+        self.clock = clock
+        self.ttl = timedelta(seconds=ttl or settings.SCHEDULER_LEASE_SECONDS)
+
+    def acquire(self):
+        """Take the lease if it is free, expired or already ours; True on success."""
+        now = self.clock()
+        taken = JobLease.objects.filter(
+            Q(name=self.name) & (Q(owner=self.owner) | Q(expires_at__isnull=True) | Q(expires_at__lte=now))
+        ).update(owner=self.owner, expires_at=now + self.ttl)
+        if taken:
+            return True
+        try:
+            with transaction.atomic():
+                JobLease.objects.create(name=self.name, owner=self.owner, expires_at=now + self.ttl)
+            return True
+        except IntegrityError:
+            return False  # someone else holds it
+
+    def renew(self):
+        """Extend a lease we still hold; False once it was lost."""
+        now = self.clock()
+        return bool(
+            JobLease.objects.filter(name=self.name, owner=self.owner, expires_at__gt=now)
+            .update(expires_at=now + self.ttl)
+        )
+
+    def release(self, ran_at=None):
+        updates = {"expires_at": None, "owner": ""}
+        if ran_at is not None:
+            updates["last_run_at"] = ran_at
+        JobLease.objects.filter(name=self.name, owner=self.owner).update(**updates)
+
+
+# =========================
+# 🗓️ JOBS
+# =========================
+def offer_lifecycle(now, heartbeat):
+    return {"closed_offers": len(close_expired_offers(now=now, heartbeat=heartbeat))}
+
+
+def score_ledger(now, heartbeat):
+    return {"snapshots": compact_ledger()}
+
+
+def offer_rescoring(now, heartbeat):
+    return process_rescore_jobs(heartbeat)
+
+
+def fit_estimates(now, heartbeat):
+    return {"rescored": rescore_estimates(heartbeat)}
+
+
+JOBS = {
+    # name: (function(now, heartbeat), interval setting)
+    "offer_lifecycle": (offer_lifecycle, "OFFER_LIFECYCLE_INTERVAL"),
+    "score_ledger": (score_ledger, "SCORE_LEDGER_COMPACT_INTERVAL"),
+    "offer_rescoring": (offer_rescoring, "OFFER_RESCORE_INTERVAL"),
+    "fit_estimates": (fit_estimates, "FIT_ESTIMATE_RESCORE_INTERVAL"),
+}
+
+
+def run_job(name, owner=None, clock=timezone.now, force=False):
+    """
+    Run one job if it is due and the lease is free. Returns the job's result,
+    or None when it was skipped.
+    """
+    func, interval_setting = JOBS[name]
+    lease = Lease(name, owner or default_owner(), clock)
+    if not lease.acquire():
+        return None
+
+    ran_at = None
+    try:
+        last_run_at = JobLease.objects.filter(name=name).values_list("last_run_at", flat=True).first()
+        interval = timedelta(seconds=getattr(settings, interval_setting))
+        now = clock()
+        if not force and last_run_at is not None and now < last_run_at + interval:
+            return None
+        result = func(now, lease.renew)
+        ran_at = now
+        return result
+    finally:
+        lease.release(ran_at)
+
+
+def run_pending(owner=None, clock=timezone.now):
+    """Run every due job once; returns {name: result} for the jobs that ran."""
+    owner = owner or default_owner()
+    results = {}
+    for name in JOBS:
+        result = run_job(name, owner, clock)
+        if result is not None:
+            results[name] = result
+    return results
+
+
+def run_forever(owner=None, clock=timezone.now, sleep=time.sleep, log=print):
+    owner = owner or default_owner()
+    log(f"⏱️ Scheduler {owner} started ({', '.join(JOBS)})")
+    while True:
+        for name, result in run_pending(owner, clock).items():
+            log(f"✅ {name}: {result}")
+        sleep(settings.SCHEDULER_POLL_SECONDS)
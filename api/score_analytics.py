@@ -0,0 +1,99 @@
+# api/score_analytics.py
+"""
+Score time series by day, week (starting Monday) or month.
+
+ScoreRollup holds one row per (user, period, bucket) with the points and
+number of ledger rows in that bucket. Rows are bumped in place with an
+INSERT .. ON CONFLICT DO UPDATE as ScoreHistory rows are appended
+(api.score_ledger and the ScoreHistory post_save signal), so a series costs
+one row per bucket and user, however long the history is.
+"""
+from collections import Counter
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from api.models import ScoreHistory, ScoreRollup
+
+PERIODS = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+
+def bucket_start(period, day):
+    if period == "week":
+        return date.fromordinal(day.toordinal() - day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+# =========================
+# 💾 ROLLUPS
+# =========================
+def _bump(rows):
+    """rows: {(user_id, period, bucket): (points, events)} added to the stored totals."""
+    table = ScoreRollup._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (user_id, period, bucket, points, events) VALUES (%s, %s, %s, %s, %s) "
+            "ON CONFLICT (user_id, period, bucket) DO UPDATE SET "
+            f"points = {table}.points + excluded.points, events = {table}.events + excluded.events",
+            [
+                (user_id, period, connection.ops.adapt_datefield_value(bucket), points, events)
+                for (user_id, period, bucket), (points, events) in rows.items()
+            ],
+        )
+
+
+def record_events(events):
+    """Add freshly created ScoreHistory rows to the rollups (same transaction as the rows)."""
+    points, counts = Counter(), Counter()
+    for event in events:
+        day = timezone.localdate(event.created_at)
+        for period in PERIODS:
+            key = (event.user_id, period, bucket_start(period, day))
+            points[key] += event.points
+            counts[key] += 1
+    if counts:
+        _bump({key: (points[key], counts[key]) for key in counts})
+
+
+def rebuild_rollups():
+    """Recompute every rollup from ScoreHistory (one GROUP BY per period)."""
+    with transaction.atomic():
+        ScoreRollup.objects.all().delete()
+        for period, trunc in PERIODS.items():
+            buckets = (
+                ScoreHistory.objects.annotate(bucket=trunc("created_at", output_field=DateField()))
+                .values("user_id", "bucket").annotate(points=Sum("points"), events=Count("pk"))
+            )
+            ScoreRollup.objects.bulk_create([ScoreRollup(period=period, **row) for row in buckets], batch_size=1000)
+    return ScoreRollup.objects.count()
+
+
+# =========================
+# 📈 SERIES
+# =========================
+def score_series(users, period="week", start=None, end=None):
+    """
+    [{"bucket", "points", "events", "total"}] of the summed rollups of
+    `users` (a User queryset or ids), oldest first; `total` is the running
+    score change since the first ledger row, including buckets before `start`.
+    """
+    rollups = ScoreRollup.objects.filter(user__in=users, period=period)
+    before = 0
+    if start is not None:
+        start = bucket_start(period, start)
+        before = rollups.filter(bucket__lt=start).aggregate(total=Sum("points"))["total"] or 0
+        rollups = rollups.filter(bucket__gte=start)
+    if end is not None:
+        rollups = rollups.filter(bucket__lte=end)
+
+    total, rows = before, []
+    buckets = rollups.values("bucket").annotate(points=Sum("points"), events=Sum("events")).order_by("bucket")
+    for row in buckets:
+        total += row["points"]
+        rows.append({**row, "total": total})
+    return rows
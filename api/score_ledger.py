@@ -0,0 +1,195 @@
+# api/score_ledger.py
+"""
+Profile.score as an append-only ledger.
+
+Every score change is a ScoreHistory row; Profile.score is the running total
+of a user's rows, moved with F() increments in the same transaction (never
+read, changed in Python and saved back, so concurrent awards cannot overwrite
+each other). ScoreSnapshot periodically folds the ledger into per-user totals
+(compact_ledger), so checking a total only sums the rows written since
+(ledger_totals, reconcile_scores). Appended rows also feed the time-series
+rollups of api.score_analytics.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Exists, F, Max, OuterRef, Q, Subquery, Sum
+
+from api.bulk import keyset_chunks
+from api.leaderboard import scores_changed
+from api.models import Profile, ProfileFeatures, ScoreHistory, ScoreSnapshot, User
+from api.rescoring import rescore_users_on_commit
+from api.score_analytics import record_events
+
+
+def _scores_moved(user_ids):
+    """
+    Follow-ups of an F() score update, which sends no post_save: copy the
+    new scores into the feature store, then refresh the leaderboards and
+    rescore the students' applications once the transaction commits.
+    """
+    user_ids = list(user_ids)
+    ProfileFeatures.objects.filter(profile__user_id__in=user_ids).update(
+        score=Subquery(Profile.objects.filter(pk=OuterRef("profile_id")).values("score")[:1]),
+        updated_at=timezone.now(),
+    )
+    scores_changed(user_ids)
+    rescore_users_on_commit(user_ids)
+
+
+def _append(rows):
+    """Insert ScoreHistory rows and their rollups (bulk_create sends no post_save)."""
+    record_events(ScoreHistory.objects.bulk_create(rows, batch_size=settings.BULK_BATCH_SIZE))
+
+
+# =========================
+# ✍️ WRITING
+# =========================
+def award_points(awards):
+    """
+    Apply (user_id, points, reason) awards in bulk: one score UPDATE per
+    distinct per-user total (F() increments, no read-modify-write) and one
+    ScoreHistory bulk_create.
+    """
+    awards = list(awards)
+    if not awards:
+        return
+    totals = Counter()
+    for user_id, points, _ in awards:
+        totals[user_id] += points
+    users_by_total = defaultdict(list)
+    for user_id, total in totals.items():
+        users_by_total[total].append(user_id)
+    with transaction.atomic(savepoint=False):
+        for total, user_ids in users_by_total.items():
+            Profile.objects.filter(user_id__in=user_ids).update(score=F("score") + total)
+        _append([ScoreHistory(user_id=user_id, reason=reason, points=points) for user_id, points, reason in awards])
+        _scores_moved(totals)
+
+
+def deduct_points(user_id, points, reason):
+    """
+    Take up to `points` from a user without going below 0; returns the
+    points actually deducted (the amount written to the ledger).
+    """
+    with transaction.atomic():
+        # the row lock makes the floor check and the decrement one step
+        score = Profile.objects.select_for_update().filter(user_id=user_id).values_list("score", flat=True).first()
+        if score is None:
+            return 0
+        deducted = min(points, max(score, 0))
+        award_points([(user_id, -deducted, reason)])
+    return deducted
+
+
+# =========================
+# 🗜️ SNAPSHOTS
+# =========================
+def _tail(queryset):
+    """Ledger rows not folded into their user's snapshot yet."""
+    return queryset.filter(
+        Q(user__score_snapshot__isnull=True) | Q(pk__gt=F("user__score_snapshot__last_event_id"))
+    )
+
+
+def compact_ledger(batch_size=None):
+    """
+    Fold the ledger into ScoreSnapshot, users in pk order, one transaction
+    per batch. Returns how many snapshots moved.
+
+    Rows younger than SCORE_LEDGER_COMPACT_LAG seconds are left in the tail:
+    a transaction still in flight may own a lower pk than the newest
+    committed row, and would otherwise be skipped for good.
+    """
+    batch_size = batch_size or settings.SCORE_LEDGER_BATCH_SIZE
+    settled = timezone.now() - timedelta(seconds=settings.SCORE_LEDGER_COMPACT_LAG)
+    watermark = ScoreHistory.objects.filter(created_at__lte=settled).aggregate(last=Max("pk"))["last"]
+    if watermark is None:
+        return 0
+    moved = 0
+    users = User.objects.filter(Exists(ScoreHistory.objects.filter(user=OuterRef("pk"), pk__lte=watermark))).only("id")
+    for chunk in keyset_chunks(users, batch_size):
+        user_ids = [user.pk for user in chunk]
+        with transaction.atomic():
+            deltas = dict(
+                _tail(ScoreHistory.objects.filter(user_id__in=user_ids, pk__lte=watermark))
+                .values("user_id").annotate(total=Sum("points")).values_list("user_id", "total")
+            )
+            if not deltas:
+                continue
+            current = ScoreSnapshot.objects.in_bulk(list(deltas))
+            ScoreSnapshot.objects.bulk_create(
+                [
+                    ScoreSnapshot(
+                        user_id=user_id,
+                        total=(current[user_id].total if user_id in current else 0) + delta,
+                        last_event_id=watermark,
+                    )
+                    for user_id, delta in deltas.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["user"],
+                update_fields=["total", "last_event_id", "taken_at"],
+            )
+            moved += len(deltas)
+    return moved
+
+
+def ledger_totals(user_ids):
+    """{user_id: snapshot total + points written since} for these users."""
+    user_ids = list(user_ids)
+    totals = dict.fromkeys(user_ids, 0)
+    totals.update(ScoreSnapshot.objects.filter(user_id__in=user_ids).values_list("user_id", "total"))
+    tail = (
+        _tail(ScoreHistory.objects.filter(user_id__in=user_ids))
+        .values("user_id").annotate(total=Sum("points")).values_list("user_id", "total")
+    )
+    for user_id, points in tail:
+        totals[user_id] += points
+    return totals
+
+
+# =========================
+# ⚖️ RECONCILIATION
+# =========================
+def reconcile_scores(fix=None, batch_size=None):
+    """
+    Compare every Profile.score with its ledger total; returns
+    [(user_id, profile score, ledger total)] for the users that disagree.
+
+    fix="profile" resets those scores to the ledger total; fix="ledger"
+    writes an adjustment row instead (e.g. for scores set before the ledger
+    existed, or edited by hand).
+    """
+    batch_size = batch_size or settings.SCORE_LEDGER_BATCH_SIZE
+    mismatches = []
+    for chunk in keyset_chunks(Profile.objects.only("id"), batch_size):
+        # Scores and ledger are read and fixed in one transaction, with the profiles locked:
+        # award_points updates the profile row first, so it cannot commit in between.
+        with transaction.atomic():
+            profiles = Profile.objects.select_for_update().filter(pk__in=[p.pk for p in chunk]).order_by("pk")
+            profiles = list(profiles.only("id", "user_id", "score"))
+            expected = ledger_totals(profile.user_id for profile in profiles)
+            drifted = [
+                (profile.user_id, profile.score, expected[profile.user_id])
+                for profile in profiles if profile.score != expected[profile.user_id]
+            ]
+            mismatches += drifted
+            if not drifted:
+                continue
+            if fix == "profile":
+                by_total = defaultdict(list)
+                for user_id, _, total in drifted:
+                    by_total[total].append(user_id)
+                for total, ids in by_total.items():
+                    Profile.objects.filter(user_id__in=ids).update(score=total)
+                _scores_moved([user_id for user_id, _, _ in drifted])
+            elif fix == "ledger":
+                _append([
+                    ScoreHistory(user_id=user_id, reason="Ledger adjustment", points=score - total)
+                    for user_id, score, total in drifted
+                ])
+    return mismatches
@@ -0,0 +1,80 @@
+# api/scoring_batcher.py
+"""
+Micro-batching of concurrent model calls.
+
+A forest's predict_proba costs about the same for one row as for a few
+hundred, so scoring requests arriving together (applications,
+recommendations, signal rescoring on other threads) are queued, collected
+for at most `max_wait` seconds or `max_batch_size` rows, and run as a
+single call by one worker thread. Callers get a Future for their own rows.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class MicroBatcher:
+    def __init__(self, score_many, max_batch_size=512, max_wait=0.002):
+        """score_many(rows) -> one result per row, in order (list or array)."""
+        self.score_many = score_many
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="scoring-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """Future of score_many(rows), computed together with whatever else is queued."""
+        future = Future()
+        self._queue.put((list(rows), future))
+        return future
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        return {"batches": self.batches, "rows": self.rows, "mean_batch": self.rows / max(self.batches, 1)}
+
+    def _next_batch(self):
+        """The first waiting request plus everything arriving within max_wait; None once closed."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch, size = [first], len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)  # finish this batch, stop on the next one
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while (batch := self._next_batch()) is not None:
+            rows = [row for request_rows, _ in batch for row in request_rows]
+            try:
+                results = self.score_many(rows)
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.rows += len(rows)
+            start = 0
+            for request_rows, future in batch:
+                future.set_result(results[start:start + len(request_rows)])
+                start += len(request_rows)
@@ -1,9 +1,10 @@
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import Application, Offer, Profile, Skill, Certification, University, ScoreHistory, Feedback, Company, \
     InternshipDemand
+from .skills import upsert_skills
 
 User = get_user_model()
 
@@ -116,12 +117,43 @@ class OfferSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         skills_list = validated_data.pop("skills", [])
         offer = Offer.objects.create(**validated_data)
+        offer.required_skills.add(*upsert_skills(skills_list).values())
+        return offer
 
-        for s in skills_list:
-            skill, _ = Skill.objects.get_or_create(name=s.lower())
-            offer.required_skills.add(skill)
 
-        return offer
+class OfferStatsSerializer(OfferSerializer):
+    """An offer with the applicant statistics of offer_stats.company_offers()."""
+    stats = serializers.SerializerMethodField()
+
+    class Meta(OfferSerializer.Meta):
+        fields = OfferSerializer.Meta.fields + ["created_at", "stats"]
+
+    def get_stats(self, obj):
+        return {
+            "applicants": obj.applicants,
+            "pending": obj.pending,
+            "accepted": obj.accepted,
+            "rejected": obj.rejected,
+            "fakes": obj.fakes,
+            "mean_fit": round(obj.mean_fit, 3) if obj.mean_fit is not None else None,
+            "max_fit": obj.max_fit,
+        }
+
+
+class OfferImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk offer import (CSV / JSONL / JSON list)."""
+    required_skills = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        required=False
+    )
+
+    class Meta:
+        model = Offer
+        fields = [
+            "title", "description", "field_required", "level_required",
+            "location", "deadline", "required_skills"
+        ]
+        extra_kwargs = {"field_required": {"required": True, "allow_blank": False}}
 
 
 # ✅ APPLICATION (already exists)
@@ -346,14 +378,15 @@ class EmailTokenObtainPairSerializer(serializers.Serializer):
         email = attrs.get("email")
         password = attrs.get("password")
 
-        # ✅ Handle duplicates gracefully
-        user = User.objects.filter(email=email).first()
+        # ✅ Single lookup: user + profile in one query
+        user = User.objects.select_related("profile").filter(email=email).first()
         if not user:
-            raise serializers.ValidationError({"detail": "No user with this email."})
+            # Hash anyway and answer like a wrong password, so neither timing nor message reveals the email
+            User().set_password(password)
+            raise serializers.ValidationError({"detail": "Invalid credentials."})
 
-        # ✅ Authenticate using username under the hood
-        user = authenticate(email=user.email, password=password)
-        if not user:
+        # ✅ Verify in place; outdated hashes are upgraded to the preferred hasher
+        if not user.is_active or not user.check_password(password):
             raise serializers.ValidationError({"detail": "Invalid credentials."})
 
         # ✅ Check verification status
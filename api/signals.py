@@ -1,10 +1,21 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 
-from .ml_utils import predict_fit
-from .models import Profile, Application, ScoreHistory, Feedback
-from .views import replace_fake_candidates
+from .feature_store import (
+    offer_features_affected, profile_features_affected, refresh_offer_features, refresh_profile_features,
+    update_profile_features,
+)
+from .leaderboard import leaderboard, scores_changed
+from .models import Profile, Application, ScoreHistory, Feedback, Certification, Offer, Skill, University
+from .offer_search import index_offers
+from .offer_stats import company_offers_changed, offers_changed
+from .rescoring import enqueue_offer_rescore, rescore_users
+from .replacements import replace_fake_candidates
+from .score_analytics import record_events
+from .score_ledger import deduct_points
+from .skill_index import skill_index
 
 
 # ✅ Create profile once
@@ -22,18 +33,196 @@ def save_profile(sender, instance, **kwargs):
         instance.profile.save()
 
 
+# =========================
+# 🧮 FEATURE STORE
+# =========================
+# Registered before the rescoring receivers below, which read the store.
+def _m2m_owner_ids(instance, action, reverse, pk_set, accessor):
+    """Ids of the rows owning an m2m relation (Profile, Offer, Certification) touched by a change."""
+    if not reverse:
+        return {instance.pk} if action.startswith("post_") else set()
+    if action == "pre_clear":
+        # pk_set is None on clear, so remember who is about to lose the relation
+        instance._cleared_owner_ids = set(getattr(instance, accessor).values_list("pk", flat=True))
+        return set()
+    if action == "post_clear":
+        return getattr(instance, "_cleared_owner_ids", set())
+    return set(pk_set or ()) if action.startswith("post_") else set()
+
+
+def _saved_changes(instance):
+    """Fields a Profile / Offer save changed; everything when unknown (e.g. raw fixture loads)."""
+    changes = getattr(instance, "saved_changes", None)
+    return {f.name for f in instance._meta.concrete_fields} if changes is None else changes
+
+
+@receiver(post_save, sender=Profile)
+def refresh_profile_feature_row(sender, instance, **kwargs):
+    update_profile_features(instance, profile_features_affected(_saved_changes(instance)))
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+@receiver(m2m_changed, sender=Profile.certifications.through)
+def refresh_profile_features_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    ids = _m2m_owner_ids(instance, action, reverse, pk_set, "profiles")
+    if ids:
+        refresh_profile_features(ids)
+
+
+@receiver(m2m_changed, sender=Certification.skills.through)
+def refresh_profile_features_on_cert_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    cert_ids = _m2m_owner_ids(instance, action, reverse, pk_set, "certifications")
+    if cert_ids:
+        refresh_profile_features(
+            Profile.objects.filter(certifications__in=cert_ids).values_list("pk", flat=True).distinct()
+        )
+
+
+@receiver(post_save, sender=University)
+def refresh_members_features(sender, instance, created, **kwargs):
+    if not created:
+        refresh_profile_features(instance.members.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Offer)
+def refresh_offer_feature_row(sender, instance, **kwargs):
+    if offer_features_affected(_saved_changes(instance)):
+        refresh_offer_features([instance.pk])
+
+
+@receiver(m2m_changed, sender=Offer.required_skills.through)
+def refresh_offer_features_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    ids = _m2m_owner_ids(instance, action, reverse, pk_set, "offers")
+    if ids:
+        refresh_offer_features(ids)
+
+
+# =========================
+# 🔎 SKILL SEARCH INDEX
+# =========================
+SKILL_INDEX_SOURCES = {"role", "university", "field_of_study", "gpa"}
+LEADERBOARD_SOURCES = {"role", "score", "university", "field_of_study"}
+
+
+@receiver(post_save, sender=Profile)
+def mark_profile_dirty_in_skill_index(sender, instance, **kwargs):
+    if _saved_changes(instance) & SKILL_INDEX_SOURCES:
+        skill_index.mark_dirty([instance.pk])
+
+
+@receiver(post_delete, sender=Profile)
+def drop_profile_from_skill_index(sender, instance, **kwargs):
+    skill_index.mark_dirty([instance.pk])
+
+
+@receiver(m2m_changed, sender=Profile.skills.through)
+def mark_skills_dirty_in_skill_index(sender, instance, action, reverse, pk_set, **kwargs):
+    ids = _m2m_owner_ids(instance, action, reverse, pk_set, "profiles")
+    if ids:
+        skill_index.mark_dirty(ids)
+
+
+# =========================
+# 🏆 LEADERBOARDS
+# =========================
 @receiver(post_save, sender=Profile)
-def update_applications_fit(sender, instance, **kwargs):
-    for app in Application.objects.filter(user=instance.user):
-        app.predicted_fit = predict_fit(instance, app.offer)
-        app.save(update_fields=['predicted_fit'])
+def refresh_profile_on_leaderboards(sender, instance, **kwargs):
+    if _saved_changes(instance) & LEADERBOARD_SOURCES:
+        transaction.on_commit(lambda: leaderboard.refresh_profiles([instance.pk]))
+
+
+@receiver(post_delete, sender=Profile)
+def drop_profile_from_leaderboards(sender, instance, **kwargs):
+    transaction.on_commit(lambda: leaderboard.refresh_profiles([instance.pk]))
+
+
+@receiver(post_save, sender=ScoreHistory)
+def refresh_leaderboards_on_score_event(sender, instance, created, **kwargs):
+    if created:
+        scores_changed([instance.user_id])
+
+
+# =========================
+# 📈 SCORE ROLLUPS
+# =========================
+@receiver(post_save, sender=ScoreHistory)
+def roll_up_score_event(sender, instance, created, **kwargs):
+    # rows written through api.score_ledger are bulk-created and rolled up there
+    if created:
+        record_events([instance])
+
+
+# =========================
+# 📚 OFFER SEARCH INDEX
+# =========================
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def index_offer(sender, instance, **kwargs):
+    index_offers([instance.pk])
+
+
+@receiver(m2m_changed, sender=Offer.required_skills.through)
+def index_offers_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    ids = _m2m_owner_ids(instance, action, reverse, pk_set, "offers")
+    if ids:
+        index_offers(ids)
+        offers_changed(ids)  # cached company lists show the required skills
+
+
+@receiver(post_save, sender=Skill)
+def index_offers_on_skill_rename(sender, instance, created, **kwargs):
+    if not created:
+        index_offers(instance.offers.values_list("pk", flat=True))
+
+
+# =========================
+# 📋 RECRUITER OFFER LISTS
+# =========================
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def invalidate_company_offers(sender, instance, **kwargs):
+    company_offers_changed([instance.company_id])
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_offer_stats(sender, instance, **kwargs):
+    offers_changed([instance.offer_id])
+
+
+# =========================
+# 🎯 RESCORING
+# =========================
+# Runs after the feature-store receivers above, so fits see the new features.
+@receiver(post_save, sender=Profile)
+def update_applications_fit(sender, instance, created, **kwargs):
+    # a new profile has no applications; approvals, logins or other saves that
+    # move no scoring feature leave the fits alone
+    if not created and profile_features_affected(_saved_changes(instance)):
+        rescore_users([instance.user_id])
 
 
 @receiver(m2m_changed, sender=Profile.skills.through)
-def update_fit_on_skills_change(sender, instance, **kwargs):
-    for app in Application.objects.filter(user=instance.user):
-        app.predicted_fit = predict_fit(instance, app.offer)
-        app.save(update_fields=['predicted_fit'])
+@receiver(m2m_changed, sender=Profile.certifications.through)
+def update_fit_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # only post_* actions: pre_* would score the old relation, and be redone right after
+    ids = _m2m_owner_ids(instance, action, reverse, pk_set, "profiles")
+    if ids:
+        rescore_users(Profile.objects.filter(pk__in=ids).values_list("user_id", flat=True))
+
+
+@receiver(post_save, sender=Offer)
+def rescore_offer_applications(sender, instance, created, **kwargs):
+    # queued, not run here: an offer can have thousands of applicants
+    if not created and offer_features_affected(_saved_changes(instance)):
+        enqueue_offer_rescore([instance.pk])
+
+
+@receiver(m2m_changed, sender=Offer.required_skills.through)
+def rescore_offers_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    ids = _m2m_owner_ids(instance, action, reverse, pk_set, "offers")
+    if ids:
+        enqueue_offer_rescore(ids)
 
 
 @receiver(post_save, sender=Feedback)
@@ -43,23 +232,13 @@ def handle_negative_feedback(sender, instance, created, **kwargs):
 
     if instance.feedback_type == 'negative':
         app = instance.application
-        profile = app.user.profile
 
         # 1. Mark candidate as fake
         app.is_fake = True
         app.save()
 
-        # 2. Decrement score
-        decrement_points = 10
-        profile.score = max(0, profile.score - decrement_points)
-        profile.save()
-
-        # 3. Log in ScoreHistory
-        ScoreHistory.objects.create(
-            user=app.user,
-            reason="Negative feedback: fake or invalid skills",
-            points=-decrement_points
-        )
+        # 2. Decrement score (logged in ScoreHistory)
+        deduct_points(app.user_id, 10, "Negative feedback: fake or invalid skills")
 
-        # 4. Trigger replacement
+        # 3. Trigger replacement
         replace_fake_candidates(app.offer.id)
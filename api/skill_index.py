@@ -0,0 +1,190 @@
+# api/skill_index.py
+"""
+In-memory students × skills matrix for recruiter candidate search.
+
+The index is a scipy CSR matrix (one row per student, one column per skill
+id) built from Profile.skills.through, plus per-row university / field / GPA
+arrays for filtering. The match ratio of every student against a skill set is
+then a single sparse mat-vec.
+
+Writes don't rebuild it: the signals in api/signals.py mark changed profiles
+dirty, and the next search re-reads just those rows into a small overlay that
+shadows their base rows. The base matrix is rebuilt once the overlay grows past
+SKILL_INDEX_COMPACT_AT rows, or after SKILL_INDEX_MAX_AGE seconds so that
+processes which didn't see a write (other workers) catch up.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from scipy import sparse
+
+from api.models import Profile
+
+
+def _normalize_field(value):
+    return (value or "").strip().lower()
+
+
+class _Snapshot:
+    """Immutable view of the index; searches run on one without holding the lock."""
+
+    def __init__(self, matrix, profile_ids, university_ids, fields, gpas, overrides, shadowed, built_at, row_of=None):
+        self.matrix = matrix
+        self.profile_ids = profile_ids
+        self.university_ids = university_ids
+        self.fields = fields
+        self.gpas = gpas
+        self.overrides = overrides  # {profile_id: row dict, or None when no longer a student}
+        self.shadowed = shadowed  # base rows replaced by an override
+        self.built_at = built_at
+        self.row_of = row_of if row_of is not None else {pk: i for i, pk in enumerate(profile_ids.tolist())}
+
+
+def _load_rows(profile_ids=None):
+    """Student rows as {profile_id: {"skills", "university_id", "field", "gpa"}}."""
+    students = Profile.objects.filter(role="student")
+    links = Profile.skills.through.objects.filter(profile__role="student")
+    if profile_ids is not None:
+        students = students.filter(pk__in=profile_ids)
+        links = links.filter(profile_id__in=profile_ids)
+
+    rows = {
+        pk: {"skills": set(), "university_id": university_id, "field": _normalize_field(field),
+             "gpa": float(gpa) if gpa is not None else np.nan}
+        for pk, university_id, field, gpa in students.values_list("pk", "university_id", "field_of_study", "gpa")
+    }
+    for profile_id, skill_id in links.values_list("profile_id", "skill_id").iterator(chunk_size=10000):
+        if profile_id in rows:
+            rows[profile_id]["skills"].add(skill_id)
+    return rows
+
+
+class SkillIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._dirty = set()
+
+    def mark_dirty(self, profile_ids):
+        with self._lock:
+            self._dirty.update(profile_ids)
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._dirty.clear()
+
+    # =========================
+    # 🏗️ BUILD / REFRESH
+    # =========================
+    def _build(self):
+        rows = _load_rows()
+        profile_ids = np.array(sorted(rows), dtype=np.int64)
+        row_index, col_index = [], []
+        for i, pk in enumerate(profile_ids.tolist()):
+            skills = rows[pk]["skills"]
+            row_index.extend([i] * len(skills))
+            col_index.extend(skills)
+        n_cols = max(col_index, default=0) + 1
+        matrix = sparse.csr_matrix(
+            (np.ones(len(row_index), dtype=np.float32), (row_index, col_index)),
+            shape=(len(profile_ids), n_cols),
+        )
+        ordered = [rows[pk] for pk in profile_ids.tolist()]
+        return _Snapshot(
+            matrix=matrix,
+            profile_ids=profile_ids,
+            university_ids=np.array([r["university_id"] or -1 for r in ordered], dtype=np.int64),
+            fields=np.array([r["field"] for r in ordered], dtype=object),
+            gpas=np.array([r["gpa"] for r in ordered], dtype=np.float64),
+            overrides={},
+            shadowed=np.zeros(len(profile_ids), dtype=bool),
+            built_at=time.monotonic(),
+        )
+
+    def _apply_dirty(self, snapshot, dirty):
+        rows = _load_rows(dirty)
+        overrides = dict(snapshot.overrides)
+        shadowed = snapshot.shadowed.copy()
+        for pk in dirty:
+            overrides[pk] = rows.get(pk)
+            if pk in snapshot.row_of:
+                shadowed[snapshot.row_of[pk]] = True
+        return _Snapshot(
+            snapshot.matrix, snapshot.profile_ids, snapshot.university_ids, snapshot.fields, snapshot.gpas,
+            overrides, shadowed, snapshot.built_at, snapshot.row_of,
+        )
+
+    def snapshot(self):
+        """Current snapshot, rebuilt or patched with the dirty profiles first."""
+        with self._lock:
+            snapshot, dirty = self._snapshot, self._dirty
+            self._dirty = set()
+            expired = snapshot is None or time.monotonic() - snapshot.built_at > settings.SKILL_INDEX_MAX_AGE
+            if expired or len(snapshot.overrides) + len(dirty) > settings.SKILL_INDEX_COMPACT_AT:
+                snapshot = self._build()
+            elif dirty:
+                snapshot = self._apply_dirty(snapshot, dirty)
+            self._snapshot = snapshot
+            return snapshot
+
+    # =========================
+    # 🔎 SEARCH
+    # =========================
+    def search(self, skill_ids, k=20, university_id=None, field_of_study=None, min_gpa=None, min_ratio=0.0,
+               required_count=None):
+        """
+        Top-k students having at least one of `skill_ids`, ranked by the share
+        they have, as [(profile_id, match_ratio)] sorted by ratio then profile id.
+        `required_count` overrides the ratio's denominator (e.g. to count
+        required skills that don't exist yet).
+        """
+        required = sorted(set(skill_ids))
+        if not required or k <= 0:
+            return []
+        denominator = max(required_count or 0, len(required))
+        snapshot = self.snapshot()
+        field = _normalize_field(field_of_study) if field_of_study else None
+
+        vector = np.zeros(snapshot.matrix.shape[1], dtype=np.float32)
+        in_base = [skill_id for skill_id in required if skill_id < len(vector)]
+        vector[in_base] = 1.0
+        ratios = snapshot.matrix @ vector / denominator
+
+        mask = ~snapshot.shadowed & (ratios > 0) & (ratios >= min_ratio)
+        if university_id is not None:
+            mask &= snapshot.university_ids == university_id
+        if field is not None:
+            mask &= snapshot.fields == field
+        if min_gpa is not None:
+            mask &= snapshot.gpas >= min_gpa
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > k:
+            # keep everything tied with the k-th best, then order ties by profile id
+            kth = np.partition(-ratios[candidates], k - 1)[k - 1]
+            candidates = candidates[-ratios[candidates] <= kth]
+            order = np.lexsort((snapshot.profile_ids[candidates], -ratios[candidates]))
+            candidates = candidates[order[:k]]
+        results = [(int(snapshot.profile_ids[i]), float(ratios[i])) for i in candidates]
+
+        required_set = set(required)
+        for pk, row in snapshot.overrides.items():
+            if row is None:
+                continue
+            ratio = len(row["skills"] & required_set) / denominator
+            if (
+                ratio > 0
+                and ratio >= min_ratio
+                and (university_id is None or row["university_id"] == university_id)
+                and (field is None or row["field"] == field)
+                and (min_gpa is None or row["gpa"] >= min_gpa)
+            ):
+                results.append((pk, ratio))
+
+        results.sort(key=lambda r: (-r[1], r[0]))
+        return results[:k]
+
+
+skill_index = SkillIndex()
@@ -0,0 +1,49 @@
+# api/skills.py
+from django.db.models.functions import Lower
+
+from api.models import Skill
+
+
+def normalize_skill_name(name):
+    """Trim and collapse inner whitespace; case is kept for display."""
+    return " ".join(str(name).split())
+
+
+def skill_key(name):
+    """Key used to match skill names case-insensitively."""
+    return normalize_skill_name(name).lower()
+
+
+def upsert_skills(names):
+    """
+    Resolve skill names to Skill rows keyed by skill_key(), creating the
+    missing ones with a single bulk_create. Existing spellings win; new skills
+    keep the first spelling seen.
+    """
+    wanted = {}
+    for name in names:
+        name = normalize_skill_name(name)
+        if name:
+            wanted.setdefault(name.lower(), name)
+    if not wanted:
+        return {}
+
+    skills = _fetch_skills(list(wanted))
+    missing = [key for key in wanted if key not in skills]
+    if missing:
+        Skill.objects.bulk_create([Skill(name=wanted[key]) for key in missing], ignore_conflicts=True)
+        skills.update(_fetch_skills(missing))
+    return skills
+
+
+def find_skills(names):
+    """Existing Skill rows for `names`, keyed by skill_key(); unknown names are left out."""
+    keys = {skill_key(name) for name in names} - {""}
+    return _fetch_skills(list(keys)) if keys else {}
+
+
+def _fetch_skills(keys):
+    found = {}
+    for skill in Skill.objects.annotate(key=Lower("name")).filter(key__in=keys).order_by("-id"):
+        found[skill.key] = skill  # oldest row wins on case duplicates
+    return found
@@ -1,3 +1,1139 @@
-from django.test import TestCase
+import csv
+import json
+import importlib.util
+import io
+import itertools
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+
+import msgpack
+import numpy as np
+import pandas as pd
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.bulk import bulk_apply, create_offers, import_applications, read_offer_rows
+from api.corpus_rescoring import rescore_corpus
+from api import ml_utils
+from api.export_data import stream_csv, stream_parquet, iter_dataset_chunks
+from api.fit_cache import FitCache
+from api.feature_store import FEATURE_STORE_VERSION, combine_features, get_offer_features, get_profile_features
+from api.leaderboard import leaderboard
+from api.model_search import search
+from api.offer_lifecycle import close_expired_offers
+from api.scheduler import Lease, run_pending
+from api.scoring_batcher import MicroBatcher
+from api.score_analytics import rebuild_rollups, score_series
+from api.score_ledger import award_points, compact_ledger, ledger_totals, reconcile_scores
+from api.offer_search import search_offers
+from api.renderers import ORJSONRenderer
+from api.replacements import replace_fake_candidates
+from api.rescoring import process_rescore_jobs, rescore_estimates
+from api.retraining import read_json, retrain
+from api.routing import websocket_urlpatterns
+from api.ml_utils import apply_rules, extract_features, predict_fit
+from api.management.commands.bench_scoring import random_features
+from api.models import (
+    Application, Certification, Company, Offer, Profile, ProfileFeatures, RescoreJob, ScoreHistory, ScoreRollup,
+    ScoreSnapshot, Skill, University, User,
+)
+from api.serializers import EmailTokenObtainPairSerializer
+from api.skill_index import skill_index
+from api.skills import upsert_skills
+from api.ws_auth import JWTAuthMiddlewareStack
+
+
+def make_student(email, university=None, **profile_fields):
+    user = User.objects.create(email=email)
+    Profile.objects.create(user=user, role="student", university=university, is_verified=True, **profile_fields)
+    return user
+
+
+# =========================
+# 🔐 LOGIN
+# =========================
+@override_settings(PBKDF2_ITERATIONS=1000, ARGON2_MEMORY_COST=1024)
+class LoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email="student@uni.tn")
+        Profile.objects.create(user=self.user, role="student", is_verified=True)
+
+    def _login(self, password):
+        serializer = EmailTokenObtainPairSerializer(data={"email": self.user.email, "password": password})
+        return serializer.is_valid(), serializer
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password("secret", hasher="pbkdf2_sha256"))
+
+        ok, serializer = self._login("secret")
+
+        self.assertTrue(ok)
+        self.assertEqual(serializer.validated_data["user"]["role"], "student")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("argon2$"))
+
+    def test_wrong_password_is_rejected(self):
+        self.user.set_password("secret")
+        self.user.save()
+
+        ok, serializer = self._login("nope")
+
+        self.assertFalse(ok)
+        self.assertIn("detail", serializer.errors)
+        unknown = EmailTokenObtainPairSerializer(data={"email": "nobody@uni.tn", "password": "nope"})
+        self.assertFalse(unknown.is_valid())
+        self.assertEqual(unknown.errors, serializer.errors)  # an unknown email is not revealed
+
+
+# =========================
+# 📩 BULK APPLICATIONS
+# =========================
+class BulkApplicationTests(TestCase):
+    def setUp(self):
+        self.university = University.objects.create(name="ESPRIT", city="Tunis")
+        self.student = make_student("s1@uni.tn", self.university, field_of_study="CS", gpa=3.2)
+        self.student.profile.skills.add(Skill.objects.create(name="python"))
+        company = Company.objects.create(name="ACME")
+        today = date.today()
+        self.open_offer = Offer.objects.create(title="Dev", company=company, field_required="CS", location="Tunis")
+        self.extended_offer = Offer.objects.create(
+            title="Ops", company=company,
+            deadline=today - timedelta(days=3), extended_deadline=today + timedelta(days=3),
+        )
+        self.expired_offer = Offer.objects.create(title="Old", company=company, deadline=today - timedelta(days=1))
+        self.closed_offer = Offer.objects.create(title="Shut", company=company, is_closed=True)
+
+    def test_bulk_apply_validates_and_upserts(self):
+        Application.objects.create(user=self.student, offer=self.open_offer, status="rejected")
+
+        result = bulk_apply(self.student, [
+            self.open_offer.id, self.extended_offer.id, self.expired_offer.id, self.closed_offer.id, 999999,
+        ])
+
+        self.assertEqual(result["rejected"], {
+            self.expired_offer.id: "expired", self.closed_offer.id: "closed", 999999: "not_found",
+        })
+        created = {r["offer_id"]: r["created"] for r in result["applied"]}
+        self.assertEqual(created, {self.open_offer.id: False, self.extended_offer.id: True})
+        apps = Application.objects.filter(user=self.student)
+        self.assertEqual(apps.count(), 2)
+        self.assertTrue(all(a.status == "pending" and a.predicted_fit is not None for a in apps))
+
+    def test_import_applications_scoped_to_university(self):
+        outsider = make_student("s2@other.tn")
+        csv_data = (
+            "email,offer_id,status\n"
+            f"s1@uni.tn,{self.expired_offer.id},accepted\n"
+            f"s2@other.tn,{self.open_offer.id},rejected\n"
+            f"s1@uni.tn,999999,pending\n"
+        )
+
+        result = import_applications(io.StringIO(csv_data), university=self.university)
+
+        self.assertEqual(result, {"written": 1, "skipped_lines": [3, 4]})
+        app = Application.objects.get(user=self.student, offer=self.expired_offer)
+        self.assertEqual(app.status, "accepted")
+        self.assertFalse(Application.objects.filter(user=outsider).exists())
+
+
+# =========================
+# 💼 BULK OFFERS
+# =========================
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class BulkOfferTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="ACME")
+        self.python = Skill.objects.create(name="Python")
+
+    def test_upsert_skills_matches_existing_case_insensitively(self):
+        skills = upsert_skills(["python", " Machine   Learning ", "machine learning"])
+
+        self.assertEqual(skills["python"], self.python)
+        self.assertEqual(skills["machine learning"].name, "Machine Learning")
+        self.assertEqual(Skill.objects.count(), 2)
+
+    def test_create_offers_from_csv(self):
+        csv_data = io.StringIO(
+            "title,field_required,location,deadline,required_skills\n"
+            "Backend intern,CS,Tunis,,python;Django\n"
+            "Data intern,Data,Sfax,2030-01-01,PYTHON\n"
+            ",CS,Tunis,,python\n"
+        )
+
+        result = create_offers(self.company, None, read_offer_rows(csv_data, "csv"))
+
+        self.assertEqual(len(result["created"]), 2)
+        self.assertEqual([e["row"] for e in result["errors"]], [3])
+        backend = Offer.objects.get(title="Backend intern")
+        self.assertEqual(sorted(backend.required_skills.values_list("name", flat=True)), ["Django", "Python"])
+        self.assertEqual(Skill.objects.count(), 2)
+
+    @override_settings(BULK_BATCH_SIZE=1)
+    def test_parse_error_keeps_and_broadcasts_earlier_rows(self):
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)("offers", channel)
+        jsonl = io.StringIO('{"title": "Backend", "field_required": "CS"}\n{"title": "Data"\n')
+
+        result = create_offers(self.company, None, read_offer_rows(jsonl, "jsonl"))
+
+        self.assertEqual([o["title"] for o in result["created"]], ["Backend"])
+        self.assertEqual(result["errors"][0]["row"], 2)
+        self.assertIn("file", result["errors"][0]["errors"])
+        message = async_to_sync(layer.receive)(channel)
+        self.assertEqual([o["title"] for o in message["offers"]], ["Backend"])
+
+
+# =========================
+# 🧮 FEATURE STORE
+# =========================
+class FeatureStoreTests(TestCase):
+    def setUp(self):
+        self.university = University.objects.create(name="ESPRIT", city=" Tunis ")
+        self.student = make_student("s1@uni.tn", self.university, field_of_study="CS", gpa=3.2, score=120)
+        self.profile = self.student.profile
+        self.python, self.sql = Skill.objects.create(name="Python"), Skill.objects.create(name="SQL")
+        self.offer = Offer.objects.create(
+            title="Dev", company=Company.objects.create(name="ACME"), field_required="CS", location="tunis",
+        )
+        self.offer.required_skills.add(self.python, self.sql)
+
+    def _stored(self):
+        profile = get_profile_features([self.profile.pk])[self.profile.pk]
+        offer = get_offer_features([self.offer.pk])[self.offer.pk]
+        return combine_features(profile, offer)
+
+    def test_signals_keep_features_in_sync_with_source_rows(self):
+        self.profile.skills.add(self.python)
+        cert = Certification.objects.create(name="DB")
+        self.profile.certifications.add(cert)
+        self.sql.certifications.add(cert)  # reverse side of Certification.skills
+
+        self.assertEqual(self._stored(), extract_features(Profile.objects.get(pk=self.profile.pk), self.offer))
+        self.assertEqual(self._stored()["cert_ratio"], 1.0)
+
+        self.sql.offers.clear()
+        self.assertEqual(self._stored()["skill_match"], 1.0)
+
+    def test_profile_saves_only_rescore_when_scoring_fields_change(self):
+        app = Application.objects.create(user=self.student, offer=self.offer, predicted_fit=-1)
+        profile = Profile.objects.get(pk=self.profile.pk)
+
+        profile.is_verified = False
+        profile.gpa = "3.20"  # same value, other spelling
+        with self.assertNumQueries(1):  # just the UPDATE
+            profile.save()
+        self.assertEqual(profile.saved_changes, {"is_verified"})
+        app.refresh_from_db()
+        self.assertEqual(app.predicted_fit, -1)
+
+        profile.score = 300
+        with self.assertNumQueries(7):
+            # save, one-column feature UPDATE, then the rescore: apps, 2 feature reads, bulk_update, offer companies
+            profile.save()
+        self.assertEqual(ProfileFeatures.objects.get(pk=profile.pk).score, 300)
+        app.refresh_from_db()
+        self.assertEqual(app.predicted_fit, predict_fit(profile, self.offer))
+
+    def test_predict_fit_is_two_lookups_and_rebuilds_stale_rows(self):
+        predict_fit(self.profile, self.offer)
+        with self.assertNumQueries(2):
+            predict_fit(self.profile, self.offer)
+
+        ProfileFeatures.objects.filter(pk=self.profile.pk).update(version=0, gpa=0)
+        predict_fit(self.profile, self.offer)
+        row = ProfileFeatures.objects.get(pk=self.profile.pk)
+        self.assertEqual((row.version, row.gpa), (FEATURE_STORE_VERSION, 3.2))
+
+    def test_recommended_reads_student_features_once(self):
+        company = self.offer.company
+        client = APIClient()
+        client.force_authenticate(self.student)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get("/api/offers/recommended/")
+            return len(queries), response.data["total_offers"]
+
+        count_queries()  # fill the offer feature rows
+        before = count_queries()
+        for i in range(3):
+            Offer.objects.create(title=f"Extra {i}", company=company, field_required="CS")
+        after = count_queries()
+
+        self.assertEqual((before[1], after[1]), (1, 4))
+        self.assertEqual(before[0], after[0])
+
+
+# =========================
+# 🔎 SKILL SEARCH
+# =========================
+class SkillSearchTests(TestCase):
+    def setUp(self):
+        skill_index.invalidate()
+        self.addCleanup(skill_index.invalidate)
+        self.university = University.objects.create(name="ESPRIT", city="Tunis")
+        self.python, self.django, self.sql = (Skill.objects.create(name=n) for n in ("Python", "Django", "SQL"))
+        self.full = make_student("full@uni.tn", self.university, field_of_study="CS", gpa=3.5)
+        self.full.profile.skills.add(self.python, self.django)
+        self.half = make_student("half@uni.tn", field_of_study="CS", gpa=2.5)
+        self.half.profile.skills.add(self.python)
+        make_student("none@uni.tn").profile.skills.add(self.sql)
+
+    def _search(self, **kwargs):
+        return skill_index.search([self.python.id, self.django.id], **kwargs)
+
+    def test_ranks_filters_and_picks_up_changes_incrementally(self):
+        full, half = self.full.profile.pk, self.half.profile.pk
+        self.assertEqual(self._search(), [(full, 1.0), (half, 0.5)])
+        self.assertEqual(self._search(k=1), [(full, 1.0)])
+        self.assertEqual(self._search(university_id=self.university.id), [(full, 1.0)])
+        self.assertEqual(self._search(min_gpa=3, field_of_study=" cs "), [(full, 1.0)])
+        built_at = skill_index.snapshot().built_at
+
+        self.django.profiles.add(self.half.profile)  # reverse side of Profile.skills
+        self.full.profile.skills.remove(self.python)
+        newcomer = make_student("new@uni.tn")
+        newcomer.profile.skills.add(self.django)
+
+        self.assertEqual(self._search(), [(half, 1.0), (full, 0.5), (newcomer.profile.pk, 0.5)])
+        self.assertEqual(skill_index.snapshot().built_at, built_at)
+
+    def test_endpoint_is_for_recruiters(self):
+        recruiter = User.objects.create(email="hr@acme.tn")
+        Profile.objects.create(user=recruiter, role="recruiter")
+        client = APIClient()
+
+        client.force_authenticate(self.half)
+        self.assertEqual(client.get("/api/profiles/skill-search/?skills=python").status_code, 403)
+
+        client.force_authenticate(recruiter)
+        response = client.get("/api/profiles/skill-search/?skills=PYTHON,django,cobol&k=5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["unknown_skills"], ["cobol"])
+        self.assertEqual(
+            [(r["profile"]["user"]["email"], r["match_ratio"]) for r in response.data["results"]],
+            [("full@uni.tn", 0.667), ("half@uni.tn", 0.333)],
+        )
+
+
+# =========================
+# 📚 OFFER SEARCH
+# =========================
+class OfferSearchTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="ACME")
+        self.python = Skill.objects.create(name="Python")
+        self.backend = Offer.objects.create(title="Python backend intern", company=company, location="Tunis")
+        self.data = Offer.objects.create(
+            title="Data intern", description="Some python scripting", company=company, level_required="junior",
+        )
+        self.data.required_skills.add(self.python)
+        self.design = Offer.objects.create(title="Designer", company=company, is_closed=True)
+
+    def _titles(self, text, **filters):
+        return [o.title for o in search_offers(text, Offer.objects.filter(**filters))]
+
+    def test_prefix_matching_ranking_and_filters(self):
+        self.assertEqual(self._titles("pyth"), ["Python backend intern", "Data intern"])
+        self.assertEqual(self._titles("pyth", level_required="junior"), ["Data intern"])
+        self.assertEqual(self._titles("intern tunis"), ["Python backend intern"])
+        self.assertEqual(self._titles("design", is_closed=False), [])
+        self.assertEqual(self._titles("  ?! "), [])
+
+    def test_index_follows_writes(self):
+        self.python.name = "Golang"
+        self.python.save()
+        self.data.required_skills.clear()
+        self.data.required_skills.add(Skill.objects.create(name="Rust"))
+        self.backend.delete()
+
+        self.assertEqual(self._titles("rust"), ["Data intern"])
+        self.assertEqual(self._titles("golang"), [])
+        self.assertEqual(self._titles("backend"), [])
+
+    def test_endpoint_paginates(self):
+        client = APIClient()
+        client.force_authenticate(make_student("s@uni.tn"))
+
+        response = client.get("/api/offers/search/?q=intern&page_size=1&is_closed=false")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNotNone(response.data["next"])
+        self.assertEqual(client.get("/api/offers/search/?q=intern&deadline_to=soon").status_code, 400)
+
+
+# =========================
+# 🧭 OFFER WORKSPACE
+# =========================
+class OfferWorkspaceTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="ACME")
+        self.recruiter = User.objects.create(email="hr@acme.tn")
+        Profile.objects.create(user=self.recruiter, role="recruiter", company=company)
+        self.offer = Offer.objects.create(title="Backend", company=company)
+        self.python = Skill.objects.create(name="Python")
+        self.client = APIClient()
+        self.client.force_authenticate(self.recruiter)
+
+    def add_applicants(self, n, start=0):
+        university = University.objects.create(name=f"U{start}")
+        for i in range(start, start + n):
+            student = make_student(f"s{i}@uni.tn", university, gpa=3)
+            student.profile.skills.add(self.python)
+            Application.objects.create(user=student, offer=self.offer, predicted_fit=i / 100)
+
+    def fetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/offers/{self.offer.id}/workspace/?page_size=20")
+        return response, len(queries)
+
+    def test_constant_queries_and_ranked_page(self):
+        self.add_applicants(2)
+        _, few = self.fetch()
+        self.add_applicants(15, start=2)
+        response, many = self.fetch()
+
+        self.assertEqual(few, many)
+        self.assertEqual(response.data["counts"], {"pending": 17, "accepted": 0, "rejected": 0})
+        first = response.data["applicants"]["results"][0]
+        self.assertEqual((first["rank"], first["candidate"]["email"]), (1, "s16@uni.tn"))
+        self.assertEqual(first["candidate"]["skills"], ["Python"])
+
+        other = User.objects.create(email="hr@other.tn")
+        Profile.objects.create(user=other, role="recruiter", company=Company.objects.create(name="Other"))
+        self.client.force_authenticate(other)
+        self.assertEqual(self.fetch()[0].status_code, 403)
+
+    @override_settings(OFFER_RESCORE_IN_BACKGROUND=False, OFFER_STATS_CACHE_SECONDS=600)
+    def test_my_company_stats_are_cached_until_an_application_changes(self):
+        cache.clear()
+        self.add_applicants(3)
+        Application.objects.filter(predicted_fit=0.02).update(status="accepted", is_fake=True)
+
+        response = self.client.get("/api/offers/my_company/")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["totals"]["applicants"], 3)
+        self.assertEqual(response.data["results"][0]["stats"], {
+            "applicants": 3, "pending": 2, "accepted": 1, "rejected": 0, "fakes": 1, "mean_fit": 0.01, "max_fit": 0.02,
+        })
+        with self.assertNumQueries(0):  # served from the company's cache (user already authenticated)
+            self.client.get("/api/offers/my_company/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.filter(predicted_fit=0).get().delete()
+        stats = self.client.get("/api/offers/my_company/").data["results"][0]["stats"]
+        self.assertEqual((stats["applicants"], stats["pending"]), (2, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.required_skills.add(self.python)
+        self.assertEqual(len(self.client.get("/api/offers/my_company/").data["results"][0]["required_skills"]), 1)
+
+    def test_my_company_is_not_cached_without_a_shared_cache(self):
+        cache.clear()
+        self.add_applicants(1)
+        with override_settings(OFFER_STATS_CACHE_SECONDS=0):
+            self.client.get("/api/offers/my_company/")
+            Application.objects.update(status="accepted")  # no on_commit bump, e.g. another process's write
+            stats = self.client.get("/api/offers/my_company/").data["results"][0]["stats"]
+        self.assertEqual(stats["accepted"], 1)
+
+    def test_profiles_filter_by_email(self):
+        self.add_applicants(3)
+        response = self.client.get("/api/profiles/?email=s1@uni.tn")
+        self.assertEqual([p["user"]["email"] for p in response.data], ["s1@uni.tn"])
+
+    @override_settings(OFFER_RESCORE_IN_BACKGROUND=False, OFFER_RESCORE_CHUNK_SIZE=2)
+    def test_offer_edits_queue_a_chunked_rescore(self):
+        self.add_applicants(5)
+        status_url = f"/api/offers/{self.offer.id}/rescore-status/"
+        offer = Offer.objects.get(pk=self.offer.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.title = "Backend engineer"
+            offer.save()
+        self.assertEqual(self.client.get(status_url).data["status"], "idle")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            offer.location = "tunis"
+            offer.save()
+            offer.required_skills.add(self.python)
+        self.assertEqual(RescoreJob.objects.filter(status="queued").count(), 1)  # one job for both edits
+        self.assertEqual(Application.objects.filter(predicted_fit__lt=0.05).count(), 5)  # not rescored in the request
+
+        self.assertEqual(process_rescore_jobs(), {"jobs": 1, "failed": 0})
+        self.assertEqual(RescoreJob.objects.get().last_application_id, Application.objects.latest("pk").pk)
+        fits = set(Application.objects.values_list("predicted_fit", flat=True))
+        self.assertEqual(fits, {predict_fit(Profile.objects.get(user__email="s0@uni.tn"), offer)})
+        self.assertEqual(
+            {k: v for k, v in self.client.get(status_url).data.items() if k in ("status", "total", "done")},
+            {"status": "done", "total": 5, "done": 5},
+        )
+
+
+# =========================
+# ⏰ OFFER LIFECYCLE
+# =========================
+class OfferLifecycleTests(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        company = Company.objects.create(name="ACME")
+        self.expired = Offer.objects.create(title="Old", company=company, deadline=self.today - timedelta(days=1))
+        self.extended = Offer.objects.create(
+            title="Ext", company=company,
+            deadline=self.today - timedelta(days=5), extended_deadline=self.today,
+        )
+        self.open = Offer.objects.create(title="Open", company=company)
+
+    def test_effective_deadline_drives_open_queries(self):
+        self.assertEqual(self.extended.effective_deadline, self.today)
+        self.assertEqual(set(Offer.objects.open(self.today)), {self.extended, self.open})
+        self.assertEqual(list(Offer.objects.expired(self.today)), [self.expired])
+
+        self.expired.extended_deadline = self.today + timedelta(days=2)
+        self.expired.save(update_fields=["extended_deadline"])
+        self.assertEqual(Offer.objects.get(pk=self.expired.pk).effective_deadline, self.today + timedelta(days=2))
+
+    def test_close_expired_offers_freezes_ranks_and_rewards_in_bulk(self):
+        top, fake = make_student("top@uni.tn", score=10), make_student("fake@uni.tn")
+        Application.objects.create(user=fake, offer=self.expired, predicted_fit=0.9, is_fake=True)
+        Application.objects.create(user=top, offer=self.expired, predicted_fit=0.8)
+
+        # per batch: lock offers, ranks, close, final_rank, one score UPDATE per distinct total, history,
+        # rollups, feature-store scores (+ savepoints and the final empty batch)
+        with self.assertNumQueries(14):
+            self.assertEqual(close_expired_offers(batch_size=5), [self.expired.pk])
+        self.assertEqual(close_expired_offers(), [])
+
+        self.expired.refresh_from_db()
+        self.assertTrue(self.expired.is_closed)
+        self.assertEqual(
+            list(Application.objects.filter(offer=self.expired).order_by("final_rank").values_list("user", flat=True)),
+            [fake.pk, top.pk],
+        )
+        self.assertEqual(Profile.objects.get(user=top).score, 10 + 70 + 13)  # rank 2 points + close bonus
+        self.assertEqual(Profile.objects.get(user=fake).score, 100)
+        self.assertEqual(ScoreHistory.objects.filter(user=top).count(), 2)
+
+    def test_manual_close_freezes_ranks_like_the_job(self):
+        first, second = make_student("first@uni.tn"), make_student("second@uni.tn")
+        Application.objects.create(user=second, offer=self.open, predicted_fit=0.4)
+        Application.objects.create(user=first, offer=self.open, predicted_fit=0.9)
+        client = APIClient()
+        client.force_authenticate(first)
+
+        response = client.post(f"/api/offers/{self.open.id}/close/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Offer.objects.get(pk=self.open.pk).is_closed)
+        self.assertEqual(
+            list(Application.objects.filter(offer=self.open).order_by("final_rank").values_list("user", flat=True)),
+            [first.pk, second.pk],
+        )
+        self.assertEqual(Profile.objects.get(user=first).score, 100 + 15)  # rank 1 points + close bonus
+
+        self.assertEqual(client.post(f"/api/offers/{self.open.id}/close/").status_code, 400)
+        self.assertEqual(close_expired_offers(), [self.expired.pk])  # not self.open again
+        self.assertEqual(Profile.objects.get(user=first).score, 100 + 15)
+
+    def test_reopen_needs_a_future_deadline_and_never_pays_twice(self):
+        student = make_student("s@uni.tn")
+        Application.objects.create(user=student, offer=self.expired, predicted_fit=0.5)
+        close_expired_offers()
+        client = APIClient()
+        client.force_authenticate(student)
+
+        self.assertEqual(client.post(f"/api/offers/{self.expired.id}/reopen/").status_code, 400)
+        tomorrow = (self.today + timedelta(days=1)).isoformat()
+        response = client.post(f"/api/offers/{self.expired.id}/reopen/", {"extended_deadline": tomorrow})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Offer.objects.get(pk=self.expired.pk).is_closed)
+
+        newcomer = make_student("new@uni.tn")
+        Application.objects.create(user=newcomer, offer=self.expired, predicted_fit=0.9)
+        self.assertEqual(client.post(f"/api/offers/{self.expired.id}/close/").status_code, 200)
+        self.assertEqual(Profile.objects.get(user=student).score, 100 + 15)  # rank 1 at the first close, paid once
+        self.assertEqual(Profile.objects.get(user=newcomer).score, 100 + 15)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **kwargs):
+        self.now += timedelta(**kwargs)
+
+
+@override_settings(SCHEDULER_LEASE_SECONDS=60, OFFER_LIFECYCLE_INTERVAL=300, OFFER_RESCORE_INTERVAL=300)
+class SchedulerTests(TestCase):
+    def setUp(self):
+        self.clock = FakeClock(timezone.make_aware(datetime(2030, 1, 10, 12, 0)))
+
+    def test_lease_is_exclusive_until_it_expires(self):
+        first, second = Lease("job", "a", self.clock), Lease("job", "b", self.clock)
+
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.clock.advance(seconds=30)
+        self.assertTrue(first.renew())
+        self.clock.advance(seconds=61)
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.renew())
+
+    def test_offer_lifecycle_runs_when_due(self):
+        offer = Offer.objects.create(
+            title="Dev", company=Company.objects.create(name="ACME"), deadline=date(2030, 1, 10),
+        )
+
+        self.assertEqual(run_pending("a", self.clock)["offer_lifecycle"], {"closed_offers": 0})
+        self.clock.advance(minutes=1)
+        self.assertEqual(run_pending("b", self.clock), {})  # not due yet
+        self.clock.advance(days=1)
+        self.assertEqual(run_pending("b", self.clock)["offer_lifecycle"], {"closed_offers": 1})
+
+        offer.refresh_from_db()
+        self.assertEqual(offer.closed_at, self.clock.now)
+
+
+# =========================
+# 🏆 LEADERBOARDS
+# =========================
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        leaderboard.backend.clear()
+        self.addCleanup(leaderboard.backend.clear)
+        self.esprit = University.objects.create(name="ESPRIT", city="Tunis")
+        self.a = make_student("a@uni.tn", self.esprit, field_of_study="CS", score=50).profile
+        self.b = make_student("b@uni.tn", self.esprit, field_of_study="Math", score=80).profile
+        self.c = make_student("c@uni.tn", field_of_study="cs ", score=50).profile
+
+    def test_ranks_and_incremental_updates(self):
+        uni = f"university:{self.esprit.id}"
+        self.assertEqual(
+            leaderboard.page("global", 0, 10),
+            (3, [(1, self.b.pk, 80), (2, self.a.pk, 50), (2, self.c.pk, 50)]),
+        )
+        self.assertEqual(leaderboard.rank("field:cs", self.c.pk), (1, 50))
+        self.assertEqual(leaderboard.page(uni, 1, 1), (2, [(2, self.a.pk, 50)]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            award_points([(self.c.user_id, 40, "bonus")])
+            self.a.university = None
+            self.a.save()
+
+        self.assertEqual(leaderboard.rank("global", self.c.pk), (1, 90))
+        self.assertEqual(leaderboard.rank(uni, self.b.pk), (1, 80))
+        self.assertIsNone(leaderboard.rank(uni, self.a.pk))
+        self.assertEqual(leaderboard.page(uni, 0, 10)[0], 1)
+
+    def test_endpoints(self):
+        client = APIClient()
+        client.force_authenticate(self.a.user)
+
+        response = client.get("/api/leaderboard/?scope=university&page_size=1")
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual([(r["rank"], r["email"]) for r in response.data["results"]], [(1, "b@uni.tn")])
+
+        ranks = client.get("/api/leaderboard/me/").data["ranks"]
+        self.assertEqual(ranks["global"], {"rank": 2, "score": 50, "of": 3})
+        self.assertEqual(ranks["field:cs"]["of"], 2)
+
+
+# =========================
+# 🕵️ FAKE REPLACEMENT
+# =========================
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class FakeReplacementTests(TransactionTestCase):
+    def setUp(self):
+        self.offer = Offer.objects.create(title="Backend", company=Company.objects.create(name="ACME"))
+        self.accepted = [
+            Application.objects.create(user=make_student(f"a{i}@uni.tn"), offer=self.offer, status="accepted")
+            for i in range(6)
+        ]
+        self.pending = [
+            Application.objects.create(
+                user=make_student(f"p{i}@uni.tn"), offer=self.offer, status="pending", predicted_fit=i / 10,
+            )
+            for i in range(10)
+        ]
+
+    def test_parallel_mark_fake_storm_promotes_each_candidate_once(self):
+        barrier, replaced, errors = threading.Barrier(len(self.accepted)), [], []
+
+        def mark_fake(app):
+            barrier.wait()
+            try:
+                for attempt in range(50):
+                    try:
+                        Application.objects.filter(pk=app.pk).update(is_fake=True)
+                        replaced.append(replace_fake_candidates(self.offer.id))
+                        return
+                    except OperationalError:
+                        # shared-cache SQLite reports "table is locked" instead of waiting on the lock
+                        if connection.vendor != "sqlite":
+                            raise
+                        time.sleep(0.01 * (attempt + 1))
+                raise AssertionError("still locked after 50 attempts")
+            except Exception as exc:  # a thread would swallow it
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=mark_fake, args=(app,)) for app in self.accepted]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(replaced), 6)
+        accepted = set(Application.objects.filter(offer=self.offer, status="accepted").values_list("pk", flat=True))
+        self.assertEqual(accepted, {app.pk for app in self.pending[4:]})  # the six best pending, once each
+
+    def test_promoted_students_are_notified(self):
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        layer = get_channel_layer()
+        best = self.pending[-1]
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"user_{best.user_id}", channel)
+        Application.objects.filter(pk=self.accepted[0].pk).update(is_fake=True)
+
+        self.assertEqual(replace_fake_candidates(self.offer.id), 1)
+        message = async_to_sync(layer.receive)(channel)
+        self.assertEqual(message, {"type": "application_promoted", "application": best.pk, "offer": self.offer.id})
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class WebsocketAuthTests(TransactionTestCase):
+    def setUp(self):
+        self.student = make_student("ws@uni.tn")
+        self.application = JWTAuthMiddlewareStack(URLRouter(websocket_urlpatterns))
+
+    async def connect(self, query=""):
+        # channels.testing.WebsocketCommunicator without its daphne import
+        communicator = ApplicationCommunicator(self.application, {
+            "type": "websocket", "path": "/ws/notifications/", "query_string": query.encode(),
+            "headers": [], "subprotocols": [],
+        })
+        await communicator.send_input({"type": "websocket.connect"})
+        response = await communicator.receive_output()
+        return communicator, response["type"] == "websocket.accept"
+
+    async def test_access_token_authenticates_notifications(self):
+        token = str(AccessToken.for_user(self.student))
+        communicator, connected = await self.connect(f"token={token}")
+        self.assertTrue(connected)
+
+        await get_channel_layer().group_send(
+            f"user_{self.student.id}", {"type": "application_promoted", "application": 1, "offer": 2},
+        )
+        message = await communicator.receive_output()
+        self.assertEqual(json.loads(message["text"]), {"type": "application_promoted", "application": 1, "offer": 2})
+        await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+        await communicator.wait()
+
+    async def test_invalid_or_missing_token_is_rejected(self):
+        for query in ("token=garbage", ""):
+            communicator, connected = await self.connect(query)
+            self.assertFalse(connected)
+
+
+# =========================
+# 📒 SCORE LEDGER
+# =========================
+@override_settings(SCORE_LEDGER_COMPACT_LAG=0)
+class ScoreLedgerTests(TestCase):
+    def setUp(self):
+        self.student = make_student("s@uni.tn", score=4)
+        self.offer = Offer.objects.create(title="Backend", company=Company.objects.create(name="ACME"))
+        self.app = Application.objects.create(user=self.student, offer=self.offer, status="accepted")
+
+    def score(self):
+        return Profile.objects.get(user=self.student).score
+
+    def test_penalties_are_ledgered_and_floored(self):
+        client = APIClient()
+        client.force_authenticate(self.student)
+        response = client.post(f"/api/applications/{self.app.id}/mark_fake/")
+
+        self.assertEqual(response.data["score_decrement"], 4)  # only 4 points left to take
+        self.assertEqual(self.score(), 0)
+        self.assertEqual(list(ScoreHistory.objects.values_list("points", flat=True)), [-4])
+        self.assertEqual(ProfileFeatures.objects.get(profile__user=self.student).score, 0)
+
+    def test_snapshots_and_reconciliation(self):
+        # the starting 4 points predate the ledger
+        self.assertEqual(reconcile_scores(), [(self.student.id, 4, 0)])
+        reconcile_scores(fix="ledger")
+
+        award_points([(self.student.id, 10, "bonus"), (self.student.id, 5, "bonus")])
+        self.assertEqual(compact_ledger(), 1)
+        self.assertEqual(ScoreSnapshot.objects.get(user=self.student).total, 19)
+        award_points([(self.student.id, -2, "penalty")])
+        self.assertEqual(ledger_totals([self.student.id]), {self.student.id: 17})
+        self.assertEqual(reconcile_scores(), [])
+
+        Profile.objects.filter(user=self.student).update(score=100)  # a write around the ledger
+        self.assertEqual(reconcile_scores(fix="profile"), [(self.student.id, 100, 17)])
+        self.assertEqual(self.score(), 17)
+
+
+# =========================
+# 📈 SCORE ANALYTICS
+# =========================
+class ScoreAnalyticsTests(TestCase):
+    def setUp(self):
+        esprit = University.objects.create(name="ESPRIT", city="Tunis")
+        self.a = make_student("a@uni.tn", esprit)
+        self.b = make_student("b@uni.tn", esprit)
+        self.university = esprit
+
+    def award_on(self, day, awards):
+        with mock.patch("django.utils.timezone.now", return_value=timezone.make_aware(datetime.combine(day, datetime.min.time()))):
+            award_points(awards)
+
+    def test_rollups_follow_appends_and_match_a_rebuild(self):
+        self.award_on(date(2026, 3, 2), [(self.a.id, 10, "x"), (self.b.id, 5, "y")])  # a Monday
+        self.award_on(date(2026, 3, 4), [(self.a.id, 3, "x")])
+        ScoreHistory.objects.create(user=self.a, reason="manual", points=1)  # signal path
+        self.award_on(date(2026, 4, 1), [(self.a.id, -4, "z")])
+
+        weeks = score_series([self.a.id], "week", end=date(2026, 3, 31))
+        self.assertEqual(weeks[0], {"bucket": date(2026, 3, 2), "points": 13, "events": 2, "total": 13})
+        months = score_series(User.objects.filter(profile__university=self.university), "month", start=date(2026, 4, 15))
+        self.assertEqual(months[0], {"bucket": date(2026, 4, 1), "points": -4, "events": 1, "total": 14})
+
+        incremental = set(ScoreRollup.objects.values_list("user_id", "period", "bucket", "points", "events"))
+        rebuild_rollups()
+        self.assertEqual(set(ScoreRollup.objects.values_list("user_id", "period", "bucket", "points", "events")), incremental)
+
+    def test_endpoints_scope_rows_to_the_requester(self):
+        award_points([(self.a.id, 10, "x"), (self.b.id, 5, "y")])
+        client = APIClient()
+        client.force_authenticate(self.a)
+
+        response = client.get(f"/api/score-history/?user={self.b.id}")  # students only see their own
+        self.assertEqual([row["points"] for row in response.data["results"]], [10])
+        series = client.get(f"/api/score-history/series/?period=month&university={self.university.id}").data
+        self.assertEqual(series["series"][0]["points"], 15)
+        self.assertEqual(client.get("/api/score-history/series/?period=year").status_code, 400)
+
+
+# =========================
+# 📤 DATASET EXPORT
+# =========================
+class DatasetExportTests(TestCase):
+    def setUp(self):
+        company = Company.objects.create(name="ACME")
+        python, django_skill = Skill.objects.create(name="Python"), Skill.objects.create(name="Django")
+        for i in range(5):
+            student = make_student(f"s{i}@uni.tn", gpa=3)
+            student.profile.skills.add(python)
+            offer = Offer.objects.create(title=f"Offer, #{i}\nline", company=company)
+            offer.required_skills.add(python, django_skill)
+            Application.objects.create(user=student, offer=offer, status="accepted" if i % 2 else "rejected")
+
+    def test_chunks_use_constant_queries(self):
+        with self.assertNumQueries(4):  # apps + 2 prefetches, then the empty page
+            chunks = list(iter_dataset_chunks(chunk_size=10))
+        self.assertEqual([len(c) for c in chunks], [5])
+        self.assertEqual(chunks[0][0]["skill_match_ratio"], 1.0)
+
+    def test_stream_csv(self):
+        rows = list(csv.DictReader(io.StringIO("".join(stream_csv(iter_dataset_chunks(chunk_size=2))))))
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1]["email"], "s1@uni.tn")
+        self.assertEqual(rows[1]["offer_title"], "Offer, #1\nline")
+        self.assertEqual(rows[1]["status"], "1")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_stream_parquet(self):
+        import pyarrow.parquet as pq
+
+        data = b"".join(stream_parquet(iter_dataset_chunks(chunk_size=2)))
+        table = pq.read_table(io.BytesIO(data))
+
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(pq.ParquetFile(io.BytesIO(data)).num_row_groups, 3)
+
+
+# =========================
+# 🌲 RETRAINING
+# =========================
+@override_settings(RETRAIN_BASE_TREES=5, RETRAIN_WARM_TREES=2, RETRAIN_MAX_TREES=8)
+class RetrainingTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        for name, value in [
+            ("MODEL_PATH", os.path.join(self.dir, "ml_model.pkl")),
+            ("SCALER_PATH", os.path.join(self.dir, "scaler.pkl")),
+            ("MODEL_META_PATH", os.path.join(self.dir, "ml_model.json")),
+        ]:
+            patcher = mock.patch(f"api.ml_utils.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        override = override_settings(ML_ARTIFACTS_DIR=os.path.join(self.dir, "artifacts"))
+        override.enable()
+        self.addCleanup(override.disable)
+
+        company = Company.objects.create(name="ACME")
+        offer = Offer.objects.create(title="Dev", company=company, field_required="CS")
+        self.apps = []
+        for i in range(40):
+            student = make_student(f"s{i}@uni.tn", gpa=2 + (i % 3), field_of_study="CS" if i % 2 else "Art")
+            status = "accepted" if i % 2 else "rejected"
+            self.apps.append(Application.objects.create(user=student, offer=offer, status=status))
+
+    def test_full_then_warm_start_then_rebuild(self):
+        first = retrain(log=lambda msg: None)
+        self.assertEqual((first["mode"], first["n_estimators"]), ("full", 5))
+        self.assertEqual(read_json(os.path.join(self.dir, "ml_model.json"))["version"], first["version"])
+
+        self.assertIsNone(retrain(log=lambda msg: None))  # nothing changed
+
+        self.apps[0].status = "accepted"
+        self.apps[0].save()
+        second = retrain(log=lambda msg: None)
+        self.assertEqual((second["mode"], second["n_estimators"]), ("warm_start", 7))
+        self.assertEqual(second["base_version"], first["version"])
+
+        self.apps[1].status = "pending"
+        self.apps[1].save()
+        third = retrain(log=lambda msg: None)
+        self.assertEqual((third["mode"], third["n_estimators"]), ("full", 5))
+        self.assertEqual(third["n_train"] + third["n_test"], 39)
+
+    def test_feature_changes_refresh_cached_rows(self):
+        retrain(log=lambda msg: None)
+        profile = self.apps[3].user.profile
+        profile.gpa = 4
+        profile.save()
+
+        second = retrain(log=lambda msg: None)
+
+        self.assertEqual(second["mode"], "warm_start")
+        table = pd.read_pickle(os.path.join(self.dir, "artifacts", "feature_table.pkl"))
+        self.assertEqual(table.loc[self.apps[3].id, "gpa"], 1.0)  # 4 / 4, was 2 / 4
+
+    def test_search_publishes_best_candidate_as_template(self):
+        meta = search(sample=3, n_jobs=2, log=lambda msg: None)
+
+        self.assertEqual(len(meta["leaderboard"]), 3)
+        self.assertTrue(all(c["latency_ms_single_row"] > 0 for c in meta["leaderboard"]))
+        self.assertEqual(read_json(os.path.join(self.dir, "ml_model.json"))["family"], meta["family"])
+
+        rebuilt = retrain(full=True, log=lambda msg: None)
+        self.assertEqual(rebuilt["n_estimators"], meta["params"]["n_estimators"])
+
+
+class CorpusRescoringTests(TestCase):
+    def test_rescores_stale_applications_once_and_reranks_closed_offers(self):
+        offer = Offer.objects.create(title="Dev", company=Company.objects.create(name="ACME"), field_required="CS")
+        apps = [
+            Application.objects.create(
+                user=make_student(f"s{i}@uni.tn", gpa=2 + i, field_of_study="CS"), offer=offer,
+                predicted_fit=0.5, final_rank=i + 1,
+            )
+            for i in range(3)
+        ]
+        Offer.objects.filter(pk=offer.pk).update(is_closed=True)
+
+        with mock.patch.dict("api.ml_utils.model_meta", {"version": "v2"}):
+            result = rescore_corpus(workers=1, chunk_size=2, log=lambda msg: None)
+            self.assertEqual(result, {"model_version": "v2", "rescored": 3, "final_ranks": 2})
+            self.assertEqual(rescore_corpus(workers=1, log=lambda msg: None)["rescored"], 0)  # checkpointed
+
+        rows = Application.objects.order_by("final_rank")
+        self.assertEqual([app.pk for app in rows], [apps[2].pk, apps[1].pk, apps[0].pk])
+        self.assertEqual({app.model_version for app in rows}, {"v2"})
+        self.assertEqual(rows[0].predicted_fit, predict_fit(apps[2].user.profile, offer))
+
+
+class MicroBatcherTests(TestCase):
+    def test_concurrent_requests_share_one_call(self):
+        calls, release = [], threading.Event()
+
+        def score_many(rows):
+            calls.append(list(rows))
+            release.wait(1)  # hold the first call while the others queue up
+            return [row * 10 for row in rows]
+
+        batcher = MicroBatcher(score_many, max_batch_size=100, max_wait=0.05)
+        self.addCleanup(batcher.close)
+        first = batcher.submit([1])
+        time.sleep(0.1)  # first batch is taken
+        futures = [batcher.submit([i, i + 1]) for i in range(2, 8, 2)]
+        release.set()
+
+        self.assertEqual(first.result(1), [10])
+        self.assertEqual([f.result(1) for f in futures], [[20, 30], [40, 50], [60, 70]])
+        self.assertEqual(calls, [[1], [2, 3, 4, 5, 6, 7]])
+
+    def test_errors_reach_every_caller_of_the_batch(self):
+        batcher = MicroBatcher(lambda rows: 1 / 0, max_wait=0)
+        self.addCleanup(batcher.close)
+        with self.assertRaises(ZeroDivisionError):
+            batcher.submit([1]).result(1)
+
+
+class FitCacheTests(TestCase):
+    def test_lru_and_ttl(self):
+        clock = FakeClock(0)
+        cache = FitCache(maxsize=2, ttl=10, clock=clock)
+        cache.set_many({"a": 1, "b": 2})
+        cache.get_many(["a"])  # b is now the least recently used
+        cache.set_many({"c": 3})
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+        clock.now = 10
+        self.assertEqual(cache.get_many(["a", "c"]), {})
+
+    def test_identical_inputs_reach_the_model_once_until_it_reloads(self):
+        features = {
+            "gpa": 3.2, "score": 120.0, "skill_match": 1 / 3, "field_match": 1, "cert_ratio": 0.0,
+            "cert_count": 0, "location_match": 0, "deadline_passed": 0,
+        }
+        rows = [features, dict(features, skill_match=0.3333), dict(features, gpa=2.0)]
+        ml_utils.load_model()
+        before = ml_utils.probability_cache.stats()
+
+        with mock.patch("api.ml_utils.model_probabilities", wraps=ml_utils.model_probabilities) as model_call:
+            probs = ml_utils.cached_probabilities(rows)
+            self.assertEqual(ml_utils.cached_probabilities(rows[:1]), probs[:1])
+        self.assertEqual([len(call.args[0]) for call in model_call.call_args_list], [2])
+        self.assertEqual(probs[0], probs[1])
+        after = ml_utils.probability_cache.stats()
+        self.assertEqual((after["hits"] - before["hits"], after["misses"] - before["misses"], after["size"]), (2, 2, 2))
+
+        ml_utils.load_model()
+        self.assertEqual(ml_utils.probability_cache.stats()["size"], 0)
+
+
+class DegradedScoringTests(TestCase):
+    def setUp(self):
+        self.student = make_student("s1@uni.tn", gpa=3.6, field_of_study="CS", score=80)
+        self.offer = Offer.objects.create(title="Dev", company=Company.objects.create(name="ACME"), field_required="CS")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_vectorized_rules_match_apply_rules(self):
+        rng = random.Random(0)
+        rows = [random_features(rng) for _ in range(200)]
+        rows[0]["deadline_passed"] = 1
+        probs = [rng.random() for _ in rows]
+        columns = {name: np.array([row[name] for row in rows], dtype=float) for name in rows[0]}
+        expected = [apply_rules(row, prob) for row, prob in zip(rows, probs)]
+        self.assertTrue(np.allclose(ml_utils.apply_rules_many(columns, np.array(probs)), expected))
+
+    def test_vectorized_rules_match_apply_rules_at_every_threshold(self):
+        names = ["gpa", "skill_match", "cert_count", "field_match", "location_match", "deadline_passed", "score"]
+        grid = itertools.product(
+            [2.9, 3.0, 3.49, 3.5], [0.69, 0.7, 1.0], [0, 1, 3, 5], [0, 1], [0, 1], [0, 1], [0, 400], [0.0, 0.5, 0.9],
+        )
+        rows, probs = [], []
+        for *values, prob in grid:
+            rows.append(dict(zip(names, values), cert_ratio=0))
+            probs.append(prob)
+        columns = {name: np.array([row[name] for row in rows], dtype=float) for name in rows[0]}
+        expected = [apply_rules(row, prob) for row, prob in zip(rows, probs)]
+        self.assertTrue(np.allclose(ml_utils.apply_rules_many(columns, np.array(probs)), expected))
+
+    def test_missing_model_estimates_then_scheduler_recomputes(self):
+        with mock.patch("api.ml_utils.model", None):
+            response = self.client.post("/api/applications/", {"offer_id": self.offer.id}, format="json")
+            self.assertEqual(response.status_code, 201)
+            self.assertTrue(response.data["fit_is_estimate"])
+            self.assertEqual(rescore_estimates(), 0)
+
+        app = Application.objects.get()
+        self.assertEqual(app.model_version, ml_utils.ESTIMATE_VERSION)
+        self.assertEqual(rescore_estimates(), 1)
+        app.refresh_from_db()
+        self.assertEqual(app.model_version, ml_utils.model_version())
+        self.assertEqual(app.predicted_fit, predict_fit(self.student.profile, self.offer))
+
+    def test_budget_overrun_falls_back_to_estimates(self):
+        ml_utils.probability_cache.clear()
+        with mock.patch.dict("api.ml_utils._call_seconds", {1: 1.0}):
+            response = self.client.get("/api/offers/recommended/")
+        self.assertTrue(response.data["fit_is_estimate"])
+        self.assertEqual(response.data["total_offers"], 1)
+
+    def test_call_timing_is_kept_per_batch_size(self):
+        with mock.patch.dict("api.ml_utils._call_seconds", {1: 0.001}, clear=True):
+            ml_utils.base_probabilities([random_features(random.Random(0))] * 1000)  # a background batch
+
+            self.assertEqual(ml_utils.expected_call_seconds(1), 0.001)
+            self.assertEqual(sorted(ml_utils._call_seconds), [1, 10])
+            self.assertEqual(ml_utils.expected_call_seconds(2000), ml_utils._call_seconds[10])  # closest smaller
+
+    @override_settings(SCORING_MICROBATCH=False)
+    def test_slow_spell_wears_off(self):
+        row = random_features(random.Random(0))
+        with mock.patch.dict("api.ml_utils._call_seconds", {1: 0.5}, clear=True):  # e.g. one GC pause
+            self.assertIsNone(ml_utils.model_probabilities([row], timeout=0.2))
+            results = [ml_utils.model_probabilities([row], timeout=0.2) for _ in range(10)]
+
+            self.assertIsNotNone(results[-1])  # the model was called again...
+            self.assertLess(ml_utils.expected_call_seconds(1), 0.2)  # ...and timed
+
+
+# =========================
+# 🧾 RENDERERS
+# =========================
+class RendererTests(TestCase):
+    def setUp(self):
+        self.student = make_student("s1@uni.tn", gpa=3.5, field_of_study="CS")
+        self.offer = Offer.objects.create(
+            title="Dév", company=Company.objects.create(name="ACME"), deadline=date(2030, 1, 1),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_json_output_matches_drf_and_msgpack_is_negotiated(self):
+        data = {"gpa": Decimal("3.50"), "at": timezone.make_aware(datetime(2030, 1, 2, 3, 4)), "day": date(2030, 1, 1)}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+        as_json = self.client.get("/api/offers/")
+        as_msgpack = self.client.get("/api/offers/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(as_msgpack["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(as_msgpack.content), json.loads(as_json.content))
+
+    def test_msgpack_request_bodies(self):
+        response = self.client.post(
+            "/api/applications/", msgpack.packb({"offer_id": self.offer.id}), content_type="application/msgpack",
+        )
+        self.assertEqual(response.status_code, 201)
+        bad = self.client.post("/api/applications/", b"\xc1", content_type="application/msgpack")
+        self.assertEqual(bad.status_code, 400)
 
-# Create your tests here.
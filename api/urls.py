@@ -6,7 +6,7 @@ from api.views import (
     CertificationViewSet, UniversityViewSet, ScoreHistoryViewSet,
     replace_fakes_api, FeedbackViewSet, RegisterView, EmailTokenObtainPairView,
     approve_user, pending_users, html_jwt_login, html_jwt_register, CompanyViewSet, html_logout, SkillViewSet,
-    InternshipDemandViewSet
+    InternshipDemandViewSet, export_training_dataset, leaderboard_view, my_leaderboard_ranks, scoring_stats
 )
 
 router = DefaultRouter()
@@ -29,6 +29,10 @@ urlpatterns = [
     path('offers/<int:offer_id>/replace_fakes/', replace_fakes_api),
     path("approve-user/<int:user_id>/", approve_user),
     path("pending-users/", pending_users),
+    path("export/training-dataset/", export_training_dataset),
+    path("scoring/stats/", scoring_stats),
+    path("leaderboard/", leaderboard_view),
+    path("leaderboard/me/", my_leaderboard_ranks),
     path("offers/my-company/", OfferViewSet.as_view({"get": "my_company"})),
 
     path("register/", RegisterView.as_view(), name="register"),
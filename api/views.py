@@ -1,11 +1,16 @@
+import codecs
+import importlib.util
 from datetime import date, datetime
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
+from django.conf import settings
 from django.core.mail import EmailMessage
 from io import BytesIO
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.contrib import messages
+from django.db.models import Count, F
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.utils import timezone
 from django.contrib.auth.models import User
@@ -13,7 +18,7 @@ from django.contrib.auth import get_user_model, logout, login
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
 #from api import serializers
 from rest_framework import serializers
 
@@ -23,6 +28,7 @@ User = get_user_model()
 from rest_framework import viewsets, status, mixins, permissions
 from rest_framework.decorators import api_view, action, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny , IsAdminUser
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
@@ -32,12 +38,28 @@ from api.models import (
     University, ScoreHistory, Feedback, Company, InternshipDemand
 )
 from api.serializers import (
-    ApplicationSerializer, ProfileSerializer, OfferSerializer,
+    ApplicationSerializer, ProfileSerializer, OfferSerializer, OfferStatsSerializer,
     SkillSerializer, CertificationSerializer, UniversitySerializer,
     ScoreHistorySerializer, FeedbackSerializer, RegisterSerializer, EmailTokenObtainPairSerializer, CompanySerializer,
     InternshipDemandSerializer
 )
-from api.ml_utils import predict_fit
+from api.feature_store import ScoringContext
+from api import ml_utils
+from api.ml_utils import predict_fit, predict_fit_many, scored_version
+from api.bulk import (
+    BULK_APPLY_MAX_OFFERS, bulk_apply, create_offers, import_applications, offer_broadcast_payload, read_offer_rows
+)
+from api.leaderboard import leaderboard, scopes_for
+from api.offer_lifecycle import close_offer
+from api.score_analytics import PERIODS, score_series
+from api.score_ledger import deduct_points
+from api.offer_search import search_offers
+from api.offer_stats import cached, company_offers, company_totals
+from api.replacements import replace_fake_candidates
+from api.rescoring import rescore_progress
+from api.skill_index import skill_index
+from api.skills import find_skills, skill_key, upsert_skills
+from api.export_data import stream_csv, stream_parquet
 
 
 # =========================
@@ -65,16 +87,7 @@ class ApplicationViewSet(viewsets.GenericViewSet,
         app.is_fake = True
         app.save()
 
-        profile = app.user.profile
-        decrement_points = 10
-        profile.score = max(0, profile.score - decrement_points)
-        profile.save()
-
-        ScoreHistory.objects.create(
-            user=app.user,
-            reason="Fake profile or skills detected",
-            points=-decrement_points
-        )
+        decrement_points = deduct_points(app.user_id, 10, "Fake profile or skills detected")
 
         count = replace_fake_candidates(app.offer.id)
         return Response({
@@ -98,21 +111,21 @@ class ApplicationViewSet(viewsets.GenericViewSet,
         except Offer.DoesNotExist:
             return Response({"error": f"Offer {offer_id} not found"}, status=404)
 
-        today = date.today()
         if offer.is_closed:
             return Response({"error": "This offer is closed"}, status=400)
 
-        if offer.deadline and today > offer.deadline:
-            if not (offer.extended_deadline and today <= offer.extended_deadline):
-                return Response({"error": "This offer is expired"}, status=400)
+        if offer.is_expired():
+            return Response({"error": "This offer is expired"}, status=400)
 
         profile = user.profile
-        fit_score = predict_fit(profile, offer)
+        # past the budget the fit is a rules-only estimate, recomputed later by the scheduler
+        context = ScoringContext(budget_ms=settings.SCORING_BUDGET_MS)
+        fit_score = predict_fit(profile, offer, context)
 
         app, created = Application.objects.update_or_create(
             user=user,
             offer=offer,
-            defaults={"predicted_fit": fit_score, "status": "pending"}
+            defaults={"predicted_fit": fit_score, "model_version": scored_version(context), "status": "pending"}
         )
 
         return Response({
@@ -120,9 +133,46 @@ class ApplicationViewSet(viewsets.GenericViewSet,
             "user":  user.email,
             "offer": offer.title,
             "predicted_fit": round(fit_score, 3),
+            "fit_is_estimate": context.estimated,
             "id": app.id
         }, status=201 if created else 200)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """Apply to many offers at once: {"offer_ids": [1, 2, ...]}."""
+        profile = getattr(request.user, "profile", None)
+        if not profile or profile.role != "student":
+            return Response({"error": "Only students can apply to offers."}, status=403)
+
+        offer_ids = request.data.get("offer_ids")
+        if not isinstance(offer_ids, list) or not offer_ids:
+            return Response({"error": "offer_ids must be a non-empty list"}, status=400)
+        if len(offer_ids) > BULK_APPLY_MAX_OFFERS:
+            return Response({"error": f"At most {BULK_APPLY_MAX_OFFERS} offers per request"}, status=400)
+        if not all(str(i).isdigit() for i in offer_ids):
+            return Response({"error": "offer_ids must be integers"}, status=400)
+
+        result = bulk_apply(request.user, offer_ids)
+        return Response(result, status=201 if result["applied"] else 400)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated], url_path='import')
+    def import_csv(self, request):
+        """Import historical applications from an uploaded CSV (email, offer_id[, status])."""
+        profile = getattr(request.user, "profile", None)
+        if request.user.is_staff:
+            university = None
+        elif profile and profile.role == "university" and profile.university:
+            university = profile.university
+        else:
+            return Response({"error": "Only universities and admins can import applications."}, status=403)
+
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "file is required"}, status=400)
+
+        result = import_applications(codecs.iterdecode(upload, "utf-8-sig"), university=university)
+        return Response(result, status=200)
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_applications(self, request):
         user = request.user
@@ -223,10 +273,18 @@ class ProfileSerializer(serializers.ModelSerializer):
             "is_verified",
         ]
 class ProfileViewSet(viewsets.ModelViewSet):
-    queryset = Profile.objects.select_related('user').prefetch_related('skills', 'certifications')
+    queryset = Profile.objects.select_related('user', 'university', 'company').prefetch_related('skills', 'certifications')
     serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        email = self.request.query_params.get("email")
+        if email:
+            # exact match on the unique (indexed) User.email
+            queryset = queryset.filter(user__email=email.strip())
+        return queryset
+
    
     def create(self, request, *args, **kwargs):
         user = request.user
@@ -276,8 +334,7 @@ class ProfileViewSet(viewsets.ModelViewSet):
         profile.save()
 
         if "skills" in data:
-            skills = [Skill.objects.get_or_create(name=s)[0] for s in data["skills"]]
-            profile.skills.set(skills)
+            profile.skills.set(upsert_skills(data["skills"]).values())
 
         if "certifications" in data:
             certs = [Certification.objects.get_or_create(name=c)[0] for c in data["certifications"]]
@@ -329,6 +386,49 @@ class ProfileViewSet(viewsets.ModelViewSet):
         profiles_qs = Profile.objects.all()
         serializer = self.get_serializer(profiles_qs, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='skill-search')
+    def skill_search(self, request):
+        """
+        Top students for a skill set, from the in-memory skill index:
+        ?skills=python,django[&k=20&university=<id>&field_of_study=..&min_gpa=..&min_ratio=..]
+        """
+        profile = getattr(request.user, "profile", None)
+        if not request.user.is_staff and (not profile or profile.role != "recruiter"):
+            raise PermissionDenied("Only recruiters can search candidates.")
+
+        names = [n for n in request.query_params.get("skills", "").split(",") if n.strip()]
+        if not names:
+            return Response({"error": "skills is required"}, status=400)
+        try:
+            k = min(int(request.query_params.get("k", 20)), settings.SKILL_SEARCH_MAX_RESULTS)
+            university_id = request.query_params.get("university")
+            university_id = int(university_id) if university_id else None
+            min_gpa = request.query_params.get("min_gpa")
+            min_gpa = float(min_gpa) if min_gpa else None
+            min_ratio = float(request.query_params.get("min_ratio", 0))
+        except ValueError:
+            return Response({"error": "k, university, min_gpa and min_ratio must be numbers"}, status=400)
+
+        skills = find_skills(names)
+        unknown = sorted({skill_key(n) for n in names} - skills.keys())
+        hits = skill_index.search(
+            [s.id for s in skills.values()], k=k, university_id=university_id,
+            field_of_study=request.query_params.get("field_of_study"), min_gpa=min_gpa, min_ratio=min_ratio,
+            required_count=len(skills) + len(unknown),  # nobody has an unknown skill, it still counts
+        )
+
+        profiles = Profile.objects.select_related("user", "university", "company").prefetch_related(
+            "skills", "certifications"
+        ).in_bulk([pk for pk, _ in hits])
+        return Response({
+            "skills": sorted(s.name for s in skills.values()),
+            "unknown_skills": unknown,
+            "results": [
+                {"match_ratio": round(ratio, 3), "profile": self.get_serializer(profiles[pk]).data}
+                for pk, ratio in hits if pk in profiles
+            ],
+        })
 # =========================
 # 📊 RANKING / REPLACEMENTS
 # =========================
@@ -368,34 +468,6 @@ def ranked_candidates(request, offer_id):
     })
 
 
-def replace_fake_candidates(offer_id):
-    fake_apps = Application.objects.filter(
-        offer_id=offer_id,
-        status='accepted',
-        is_fake=True
-    )
-
-    count_fakes = fake_apps.count()
-    if count_fakes == 0:
-        return 0
-
-    for fake in fake_apps:
-        fake.status = 'rejected'
-        fake.save()
-
-    replacements = (
-        Application.objects
-        .filter(offer_id=offer_id, status='pending', is_fake=False)
-        .order_by('-predicted_fit')[:count_fakes]
-    )
-
-    for app in replacements:
-        app.status = 'accepted'
-        app.save()
-
-    return count_fakes
-
-
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])  
 def replace_fakes_api(request, offer_id):
@@ -413,6 +485,34 @@ class FeedbackViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]  
 0
 
+class OfferSearchPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class WorkspacePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+def workspace_candidate(user):
+    """The profile fields shown next to an applicant on the recruiter pages."""
+    profile = getattr(user, "profile", None)
+    data = {"id": user.id, "email": user.email, "first_name": user.first_name, "last_name": user.last_name}
+    if profile:
+        data.update({
+            "profile_id": profile.id,
+            "field_of_study": profile.field_of_study,
+            "gpa": profile.gpa,
+            "score": profile.score,
+            "university": profile.university.name if profile.university else None,
+            "skills": [skill.name for skill in profile.skills.all()],
+        })
+    return data
+
+
 class OfferViewSet(viewsets.ModelViewSet):
     queryset = Offer.objects.prefetch_related('required_skills').all()
     serializer_class = OfferSerializer
@@ -447,27 +547,10 @@ class OfferViewSet(viewsets.ModelViewSet):
             created_by=user
         )
 
-        skills = []
-        for name in skills_list:
-            skill, _ = Skill.objects.get_or_create(name=name)
-            skills.append(skill)
-
+        skills = list(upsert_skills(skills_list).values())
         offer.required_skills.set(skills)
 
-        offer_data = {
-            "id": offer.id,
-            "title": offer.title,
-            "description": offer.description,
-            "field_required": offer.field_required,
-            "level_required": offer.level_required,
-            "location": offer.location,
-            "company": profile.company.name,  # Send company name as string
-            "company_id": profile.company.id,
-            "is_closed": offer.is_closed,
-            "deadline": offer.deadline.isoformat() if offer.deadline else None,
-            "created_at": offer.created_at.isoformat(),
-            "required_skills": [skill.name for skill in skills]
-        }
+        offer_data = offer_broadcast_payload(offer, [skill.name for skill in skills])
         channel_layer = get_channel_layer()
         async_to_sync(channel_layer.group_send)(
             "offers",
@@ -484,8 +567,42 @@ class OfferViewSet(viewsets.ModelViewSet):
             "skills": [s.name for s in skills]
         }, status=201)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        Create many offers for the recruiter's company, either as JSON
+        {"offers": [...]} or as an uploaded .csv / .jsonl file.
+        """
+        profile = request.user.profile
+
+        if profile.role != "recruiter":
+            return Response({"error": "Only recruiters can create offers."}, status=403)
+
+        if not profile.company:
+            return Response({"error": "Recruiter must belong to a company."}, status=400)
+
+        upload = request.FILES.get("file")
+        if upload:
+            fmt = "jsonl" if upload.name.lower().endswith(".jsonl") else "csv"
+            rows = read_offer_rows(codecs.iterdecode(upload, "utf-8-sig"), fmt)
+        elif isinstance(request.data.get("offers"), list):
+            rows = request.data["offers"]
+        else:
+            return Response({"error": "Provide an offers list or a csv/jsonl file"}, status=400)
+
+        result = create_offers(profile.company, request.user, rows)
+        return Response({
+            "message": f"{len(result['created'])} offers created",
+            "ids": [o["id"] for o in result["created"]],
+            "errors": result["errors"],
+        }, status=201 if result["created"] else 400)
+
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def my_company(self, request):
+        """
+        The recruiter's company offers, newest first, with applicant counts by
+        status, fake count and mean / max predicted fit. ?page=&page_size=
+        """
         profile = request.user.profile
 
         if profile.role != "recruiter":
@@ -494,10 +611,110 @@ class OfferViewSet(viewsets.ModelViewSet):
         if not profile.company:
             return Response({"detail": "You are not assigned to any company."}, status=400)
 
-        offers = Offer.objects.filter(company=profile.company)
+        params = request.query_params
+        paginator = WorkspacePagination()
+        company_id = profile.company_id
+
+        def build():
+            page = paginator.paginate_queryset(company_offers(company_id), request, view=self)
+            data = paginator.get_paginated_response(OfferStatsSerializer(page, many=True).data).data
+            data["totals"] = company_totals(company_id, date.today())
+            return data
+
+        # cached per company until one of its offers or applications changes
+        return Response(cached(company_id, (date.today(), params.get("page", 1), params.get("page_size", "")), build))
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def search(self, request):
+        """
+        Full-text offer search, best match first:
+        ?q=python dev[&level=intern&is_closed=false&deadline_from=YYYY-MM-DD&deadline_to=..&page=&page_size=]
+        """
+        params = request.query_params
+        if not params.get("q", "").strip():
+            return Response({"error": "q is required"}, status=400)
+
+        filters = {}
+        if params.get("level"):
+            filters["level_required"] = params["level"]
+        if params.get("is_closed") in ("true", "false"):
+            filters["is_closed"] = params["is_closed"] == "true"
+        try:
+            if params.get("deadline_from"):
+                filters["effective_deadline__gte"] = date.fromisoformat(params["deadline_from"])
+            if params.get("deadline_to"):
+                filters["effective_deadline__lte"] = date.fromisoformat(params["deadline_to"])
+        except ValueError:
+            return Response({"error": "deadline_from / deadline_to must be YYYY-MM-DD"}, status=400)
+
+        offers = search_offers(
+            params["q"],
+            Offer.objects.filter(**filters).select_related("company").prefetch_related("required_skills"),
+        )
+        paginator = OfferSearchPagination()
+        page = paginator.paginate_queryset(offers, request, view=self)
+        results = [
+            {**OfferSerializer(offer).data, "search_rank": round(offer.search_rank, 6)}
+            for offer in page
+        ]
+        return paginator.get_paginated_response(results)
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def workspace(self, request, pk=None):
+        """
+        Everything the recruiter offer page needs, in a constant number of
+        queries: the offer, applicant counts by status and one page of
+        applicants ranked by predicted fit, with their profile fields.
+        ?status=pending|accepted|rejected&page=&page_size=
+        """
+        offer = Offer.objects.select_related("company").prefetch_related("required_skills").filter(pk=pk).first()
+        if offer is None:
+            return Response({"error": "Offer not found"}, status=404)
+        profile = getattr(request.user, "profile", None)
+        if not request.user.is_staff and (not profile or profile.company_id != offer.company_id):
+            return Response({"error": "You are not allowed to manage this offer."}, status=403)
+
+        apps = Application.objects.filter(offer=offer)
+        counts = dict(apps.values_list("status").annotate(n=Count("pk")).order_by())
+        if request.query_params.get("status"):
+            apps = apps.filter(status=request.query_params["status"])
+        apps = (
+            apps.select_related("user__profile__university")
+            .prefetch_related("user__profile__skills")
+            .order_by(F("predicted_fit").desc(nulls_last=True), "pk")
+        )
+
+        paginator = WorkspacePagination()
+        page = paginator.paginate_queryset(apps, request, view=self)
+        first_rank = (paginator.page.number - 1) * paginator.page.paginator.per_page + 1
+        applicants = [
+            {
+                "id": app.id,
+                "rank": rank,
+                "status": app.status,
+                "predicted_fit": app.predicted_fit,
+                "is_fake": app.is_fake,
+                "final_rank": app.final_rank,
+                "candidate": workspace_candidate(app.user),
+            }
+            for rank, app in enumerate(page, start=first_rank)
+        ]
+        return Response({
+            "offer": OfferSerializer(offer).data,
+            "counts": {status: counts.get(status, 0) for status, _ in Application.STATUS_CHOICES},
+            "applicants": paginator.get_paginated_response(applicants).data,
+        })
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated], url_path='rescore-status')
+    def rescore_status(self, request, pk=None):
+        """Progress of the background rescoring queued by the offer's last scoring edit."""
+        offer = Offer.objects.filter(pk=pk).only("id", "company_id").first()
+        if offer is None:
+            return Response({"error": "Offer not found"}, status=404)
+        profile = getattr(request.user, "profile", None)
+        if not request.user.is_staff and (not profile or profile.company_id != offer.company_id):
+            return Response({"error": "You are not allowed to manage this offer."}, status=403)
+        return Response(rescore_progress(offer.pk))
 
-        serializer = OfferSerializer(offers, many=True)
-        return Response(serializer.data)
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def recommended(self, request):
 
@@ -510,55 +727,48 @@ class OfferViewSet(viewsets.ModelViewSet):
         today = date.today()
         applied_offer_ids = Application.objects.filter(user=user).values_list("offer_id", flat=True)
 
-        offers = Offer.objects.filter(is_closed=False).exclude(id__in=applied_offer_ids)
-
-        results = []
-        for offer in offers:
-            if offer.deadline and today > offer.deadline:
-                if not (offer.extended_deadline and today <= offer.extended_deadline):
-                    continue
-            serialized_offer = OfferSerializer(offer).data  
-            fit = predict_fit(profile, offer)
-            results.append({
-                "offer": serialized_offer,
-                "predicted_fit": round(fit, 3),
-            })
+        open_offers = list(
+            Offer.objects.open(today).exclude(id__in=applied_offer_ids)
+            .select_related("company").prefetch_related("required_skills")
+        )
+
+        # one scoring context: the student's features are read once for all offers
+        context = ScoringContext(today, budget_ms=settings.SCORING_BUDGET_MS)
+        fits = predict_fit_many([(profile, offer) for offer in open_offers], context)
+        results = [
+            {"offer": OfferSerializer(offer).data, "predicted_fit": round(fit, 3)}
+            for offer, fit in zip(open_offers, fits)
+        ]
 
         results.sort(key=lambda x: x["predicted_fit"], reverse=True)
 
         return Response({
             "student": user.email,
             "total_offers": len(results),
+            "fit_is_estimate": context.estimated,
             "offers": results
         })
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def close(self, request, pk=None):
         offer = self.get_object()
-        offer.is_closed = True
-        offer.closed_at = timezone.now()
-        offer.save()
-
-        applications = Application.objects.filter(offer=offer).order_by('-predicted_fit')[:10]
-        rank_to_points = {1: 15, 2: 13, 3: 11, 4: 9, 5: 7, 6: 5, 7: 4, 8: 3, 9: 2, 10: 1}
-
-        for rank, app in enumerate(applications, start=1):
-            if app.status != 'accepted' and not app.is_fake:
-                bonus_points = rank_to_points.get(rank, 0)
-                profile = app.user.profile
-                profile.score += bonus_points
-                profile.save()
-
-                ScoreHistory.objects.create(
-                    user=app.user,
-                    reason=f"Top {rank} in offer {offer.title} (Bonus)",
-                    points=bonus_points
-                )
-
+        if not close_offer(offer):
+            return Response({"error": f"Offer {offer.title} is already closed."}, status=400)
         return Response({"message": f"Offer {offer.title} closed and bonus distributed."}, status=200)
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def reopen(self, request, pk=None):
+        """Reopen a closed offer; past its deadline, a future extended_deadline (YYYY-MM-DD) is required."""
         offer = self.get_object()
+        new_deadline = request.data.get('extended_deadline')
+        if new_deadline:
+            try:
+                offer.extended_deadline = datetime.strptime(new_deadline, "%Y-%m-%d").date()
+            except ValueError:
+                return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+        deadline = Offer.compute_effective_deadline(offer.deadline, offer.extended_deadline)
+        if deadline is not None and deadline < date.today():
+            # the expiry job would close it again right away
+            return Response({"error": "The deadline has passed: reopen with a future extended_deadline."}, status=400)
         offer.is_closed = False
         offer.closed_at = None
         offer.save()
@@ -592,10 +802,83 @@ class CertificationViewSet(viewsets.ModelViewSet):
 
 
 
-class ScoreHistoryViewSet(viewsets.ModelViewSet):
-    queryset = ScoreHistory.objects.all()
+class ScoreHistoryPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+def _date_params(params, *names):
+    """Parse optional YYYY-MM-DD query params; raises ValidationError on bad input."""
+    try:
+        return [date.fromisoformat(params[name]) if params.get(name) else None for name in names]
+    except ValueError:
+        raise ValidationError({"error": f"{' / '.join(names)} must be YYYY-MM-DD"})
+
+
+class ScoreHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Score ledger, newest first: students see their own rows, staff and other
+    roles may pass ?user=<id>. Filters: ?since=YYYY-MM-DD&until=YYYY-MM-DD.
+    """
+    # append-only ledger: points are written through api.score_ledger, never by hand
     serializer_class = ScoreHistorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ScoreHistoryPagination
+
+    def _sees_others(self):
+        user = self.request.user
+        return user.is_staff or getattr(getattr(user, "profile", None), "role", "student") != "student"
+
+    def _user_id(self):
+        user_id = self.request.query_params.get("user")
+        if not user_id or not self._sees_others():
+            return self.request.user.id
+        if not user_id.isdigit():
+            raise ValidationError({"error": "user must be an id"})
+        return int(user_id)
+
+    def get_queryset(self):
+        since, until = _date_params(self.request.query_params, "since", "until")
+        queryset = ScoreHistory.objects.filter(user_id=self._user_id())
+        if since:
+            queryset = queryset.filter(created_at__date__gte=since)
+        if until:
+            queryset = queryset.filter(created_at__date__lte=until)
+        return queryset.order_by("-created_at", "-pk")
+
+    @action(detail=False, methods=['get'])
+    def series(self, request):
+        """
+        Score time series from the rollups:
+        ?period=day|week|month[&user=<id> | &university=<id> | &field_of_study=..][&since=&until=]
+        Without a cohort, the series of the requester (or ?user).
+        """
+        params = request.query_params
+        period = params.get("period", "week")
+        if period not in PERIODS:
+            return Response({"error": "period must be day, week or month"}, status=400)
+        since, until = _date_params(params, "since", "until")
+
+        if params.get("university"):
+            if not params["university"].isdigit():
+                return Response({"error": "university must be an id"}, status=400)
+            scope = f"university:{params['university']}"
+            users = User.objects.filter(profile__role="student", profile__university_id=params["university"])
+        elif params.get("field_of_study", "").strip():
+            field = params["field_of_study"].strip().lower()
+            scope = f"field:{field}"
+            users = User.objects.filter(profile__role="student", profile__field_of_study__iexact=field)
+        else:
+            user_id = self._user_id()
+            scope = f"user:{user_id}"
+            users = [user_id]
+
+        return Response({
+            "period": period,
+            "scope": scope,
+            "series": score_series(users, period, since, until),
+        })
 
 
 
@@ -647,6 +930,101 @@ def pending_users(request):
     ]
     return Response(data)
 
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def export_training_dataset(request):
+    """Stream the training dataset as CSV (default) or Parquet (?file_format=parquet)."""
+    if request.query_params.get("file_format") == "parquet":
+        if not importlib.util.find_spec("pyarrow"):
+            return Response({"error": "Parquet export requires pyarrow."}, status=400)
+        response = StreamingHttpResponse(stream_parquet(), content_type="application/vnd.apache.parquet")
+        response["Content-Disposition"] = 'attachment; filename="training_dataset.parquet"'
+    else:
+        response = StreamingHttpResponse(stream_csv(), content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="training_dataset.csv"'
+    return response
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def scoring_stats(request):
+    """Loaded model version, this process's probability cache hit rate and rules-only estimates."""
+    return Response({
+        "model_version": ml_utils.model_version(),
+        "fit_cache": ml_utils.probability_cache.stats(),
+        "estimated_rows": ml_utils.estimated_rows,
+    })
+
+# =========================
+# 🏆 LEADERBOARDS
+# =========================
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def leaderboard_view(request):
+    """
+    One page of a leaderboard:
+    ?scope=global|university|field[&university=<id>&field_of_study=..&page=1&page_size=20]
+    University / field default to the requester's own.
+    """
+    params = request.query_params
+    profile = getattr(request.user, "profile", None)
+    kind = params.get("scope", "global")
+    if kind == "global":
+        scope = "global"
+    elif kind == "university":
+        university_id = params.get("university") or (profile and profile.university_id)
+        if not str(university_id or "").isdigit():
+            return Response({"error": "university is required"}, status=400)
+        scope = f"university:{university_id}"
+    elif kind == "field":
+        field = (params.get("field_of_study") or (profile and profile.field_of_study) or "").strip().lower()
+        if not field:
+            return Response({"error": "field_of_study is required"}, status=400)
+        scope = f"field:{field}"
+    else:
+        return Response({"error": "scope must be global, university or field"}, status=400)
+
+    try:
+        page = max(int(params.get("page", 1)), 1)
+        page_size = min(max(int(params.get("page_size", 20)), 1), settings.LEADERBOARD_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({"error": "page and page_size must be integers"}, status=400)
+
+    total, entries = leaderboard.page(scope, (page - 1) * page_size, page_size)
+    profiles = Profile.objects.select_related("user", "university").in_bulk([pk for _, pk, _ in entries])
+    return Response({
+        "scope": scope,
+        "count": total,
+        "page": page,
+        "page_size": page_size,
+        "results": [
+            {
+                "rank": rank,
+                "score": score,
+                "profile_id": pk,
+                "email": profiles[pk].user.email,
+                "university": profiles[pk].university.name if profiles[pk].university else None,
+                "field_of_study": profiles[pk].field_of_study,
+            }
+            for rank, pk, score in entries if pk in profiles
+        ],
+    })
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def my_leaderboard_ranks(request):
+    """The requesting student's rank on each of their leaderboards."""
+    profile = getattr(request.user, "profile", None)
+    if not profile or profile.role != "student":
+        return Response({"error": "Only students are ranked."}, status=403)
+    ranks = {}
+    for scope in scopes_for(profile.university_id, profile.field_of_study):
+        found = leaderboard.rank(scope, profile.pk)
+        if found:
+            ranks[scope] = {"rank": found[0], "score": found[1], "of": leaderboard.backend.count(scope)}
+    return Response({"profile_id": profile.pk, "ranks": ranks})
+
+
 def html_jwt_login(request):
     return render(request, "api/login.html")
 
@@ -0,0 +1,40 @@
+# api/ws_auth.py
+"""
+Websocket authentication with the API's JWT access tokens.
+
+Browsers cannot set an Authorization header on a websocket, so the frontend
+passes its access token as ?token=. A valid token sets scope["user"]; an
+invalid or expired one leaves the connection anonymous. Without ?token= the
+session user of AuthMiddlewareStack is kept.
+"""
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@database_sync_to_async
+def token_user(raw_token):
+    try:
+        return JWTAuthentication().get_user(AccessToken(raw_token))
+    except (TokenError, InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        tokens = parse_qs(scope.get("query_string", b"").decode()).get("token")
+        if tokens:
+            scope = dict(scope, user=await token_user(tokens[0]))
+        return await super().__call__(scope, receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    """Session auth first, then ?token= on top of it."""
+    return AuthMiddlewareStack(JWTAuthMiddleware(inner))
@@ -7,18 +7,20 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-import api.routing  # <-- make sure api/routing.py exists
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 
-# First, create the normal Django ASGI app
+# First, create the normal Django ASGI app (sets up the app registry before the imports below)
 django_asgi_app = get_asgi_application()
 
+import api.routing  # noqa: E402  <-- make sure api/routing.py exists
+from api.ws_auth import JWTAuthMiddlewareStack  # noqa: E402
+
 # Then wrap it in ProtocolTypeRouter for HTTP + WebSocket
+# (session or ?token=<JWT access token> authentication)
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    "websocket": AuthMiddlewareStack(
+    "websocket": JWTAuthMiddlewareStack(
         URLRouter(api.routing.websocket_urlpatterns)
     ),
 })
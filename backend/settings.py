@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 from datetime import timedelta
 from pathlib import Path
+import importlib.util
 from dotenv import load_dotenv
 import os
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -130,6 +131,18 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson for JSON, MessagePack on Accept: application/msgpack (api.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.renderers.ORJSONParser',
+        'api.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=3),
@@ -143,6 +156,25 @@ SIMPLE_JWT = {
 AUTH_PASSWORD_VALIDATORS = [
 
 ]
+
+# Password hashing
+# The first hasher is used for new hashes; the others only verify older ones,
+# which are re-hashed with the preferred hasher on the next successful login.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "argon2")
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 19456))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 1))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 10))
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", 1_000_000))
+
+_AVAILABLE_HASHERS = {"pbkdf2": "api.hashers.TunablePBKDF2PasswordHasher"}
+if importlib.util.find_spec("argon2"):
+    _AVAILABLE_HASHERS["argon2"] = "api.hashers.TunableArgon2PasswordHasher"
+if importlib.util.find_spec("bcrypt"):
+    _AVAILABLE_HASHERS["bcrypt"] = "api.hashers.TunableBCryptSHA256PasswordHasher"
+
+PASSWORD_HASHERS = [_AVAILABLE_HASHERS.get(PASSWORD_HASHER, _AVAILABLE_HASHERS["pbkdf2"])]
+PASSWORD_HASHERS += [h for h in _AVAILABLE_HASHERS.values() if h not in PASSWORD_HASHERS]
 ALLOWED_HOSTS = ["*", "django.local", "127.0.0.1", "localhost"]
 CORS_ALLOW_ALL_ORIGINS = True
 
@@ -167,3 +199,63 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Rows per chunk/transaction for bulk imports and rescoring jobs
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 500))
+
+# Fit model retraining (python manage.py retrain_model)
+ML_ARTIFACTS_DIR = BASE_DIR / "ml_artifacts"
+RETRAIN_BASE_TREES = 100     # trees of a freshly built forest
+RETRAIN_WARM_TREES = 20      # trees added by each incremental run
+RETRAIN_MAX_TREES = 300      # rebuild from scratch once the forest would exceed this
+RETRAIN_KEEP_VERSIONS = 5
+MODEL_SEARCH_MAX_LATENCY_MS = 10  # single-row predict_proba budget for search_model
+CORPUS_RESCORE_CHUNK_SIZE = 2000  # applications per model call in rescore_applications
+CORPUS_RESCORE_WORKERS = int(os.getenv("CORPUS_RESCORE_WORKERS", 0))  # 0 = one per CPU
+SCORING_BUDGET_MS = int(os.getenv("SCORING_BUDGET_MS", 200))  # apply / recommend: rules-only estimates past this
+FIT_CACHE_SIZE = int(os.getenv("FIT_CACHE_SIZE", 100_000))  # cached model probabilities, 0 = off (api.fit_cache)
+FIT_CACHE_TTL = 3600  # seconds
+# Merge concurrent predict_proba calls into one (api.scoring_batcher); worth it on threaded/ASGI servers
+SCORING_MICROBATCH = os.getenv("SCORING_MICROBATCH") == "1"
+SCORING_MICROBATCH_MAX_ROWS = 512  # rows per merged call; larger requests are scored on their own
+SCORING_MICROBATCH_MAX_WAIT_MS = 2  # how long the first request of a batch waits for company
+
+# Recruiter skill search (api.skill_index)
+SKILL_INDEX_MAX_AGE = int(os.getenv("SKILL_INDEX_MAX_AGE", 300))  # seconds before a full rebuild
+SKILL_INDEX_COMPACT_AT = 1000  # changed profiles kept in the overlay before a rebuild
+SKILL_SEARCH_MAX_RESULTS = 200
+
+# Background jobs (python manage.py run_scheduler)
+SCHEDULER_POLL_SECONDS = int(os.getenv("SCHEDULER_POLL_SECONDS", 30))
+SCHEDULER_LEASE_SECONDS = 300  # a crashed replica's jobs are picked up after this
+OFFER_LIFECYCLE_INTERVAL = int(os.getenv("OFFER_LIFECYCLE_INTERVAL", 300))
+OFFER_LIFECYCLE_BATCH_SIZE = 100  # offers closed per transaction
+SCORE_LEDGER_COMPACT_INTERVAL = int(os.getenv("SCORE_LEDGER_COMPACT_INTERVAL", 3600))
+OFFER_RESCORE_INTERVAL = int(os.getenv("OFFER_RESCORE_INTERVAL", 60))
+FIT_ESTIMATE_RESCORE_INTERVAL = int(os.getenv("FIT_ESTIMATE_RESCORE_INTERVAL", 300))
+
+# Offer rescoring jobs (api.rescoring)
+OFFER_RESCORE_IN_BACKGROUND = os.getenv("OFFER_RESCORE_IN_BACKGROUND", "1") == "1"  # start a worker thread on enqueue
+OFFER_RESCORE_CHUNK_SIZE = 1000  # applications per transaction
+OFFER_RESCORE_STALE_SECONDS = 300  # a running job untouched this long is resumed by the next worker
+
+# Leaderboards (api.leaderboard): Redis sorted sets when a URL is set, in-process otherwise
+LEADERBOARD_REDIS_URL = os.getenv("LEADERBOARD_REDIS_URL") or None
+LEADERBOARD_REDIS_PREFIX = "leaderboard"
+LEADERBOARD_MEMORY_MAX_AGE = 300  # seconds before the in-process boards are rebuilt
+LEADERBOARD_MAX_PAGE_SIZE = 100
+
+# Shared cache: Redis when a URL is set. Without one each process has its own local-memory
+# cache, which other processes' writes (scheduler jobs, management commands, other web
+# workers) cannot invalidate, so caches that must stay fresh are turned off.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL") or None
+if CACHE_REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_REDIS_URL}}
+
+# Recruiter offer lists (api.offer_stats): per-company pages, dropped on any offer / application write.
+# Needs the shared cache: 0 (off) without CACHE_REDIS_URL.
+OFFER_STATS_CACHE_SECONDS = int(os.getenv("OFFER_STATS_CACHE_SECONDS", 600 if CACHE_REDIS_URL else 0))
+
+# Score ledger (api.score_ledger)
+SCORE_LEDGER_BATCH_SIZE = 1000  # users per snapshot / reconciliation transaction
+SCORE_LEDGER_COMPACT_LAG = 60  # seconds a ledger row waits before it is folded into a snapshot
@@ -1,4 +1,7 @@
+import json
 import os
+from datetime import datetime
+
 import django
 import joblib
 import numpy as np
@@ -114,7 +117,6 @@ def run_train():
     print(f"⚖️ Balanced dataset: {len(df_balanced)} samples ({min_len} each class)")
 
     X = df_balanced.drop("label", axis=1)
-    import json
 
     # Save feature column order
     FEATURE_COLS_PATH = os.path.join(os.getcwd(), "feature_columns.json")
@@ -183,7 +185,11 @@ def run_train():
     # Save model & scaler
     joblib.dump(model, MODEL_PATH)
     joblib.dump(scaler, SCALER_PATH)
-    print(f"💾 Model and scaler saved to:\n  {MODEL_PATH}\n  {SCALER_PATH}")
+    # the version is stored with every score (python manage.py rescore_applications)
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    with open(os.path.join(os.getcwd(), "ml_model.json"), "w") as f:
+        json.dump({"version": version, "trained_at": datetime.now().isoformat(), "mode": "train_model"}, f)
+    print(f"💾 Model {version} and scaler saved to:\n  {MODEL_PATH}\n  {SCALER_PATH}")
 
 
 # Run training if file executed directly